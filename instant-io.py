@@ -1,19 +1,56 @@
+import abc
+import argparse
+import array
+import asyncio
+import base64
+import bisect
 import collections
+import concurrent.futures
+import contextlib
+import email.utils
+import errno
+import functools
+import glob
+import hashlib
+import hmac
+import http.server
+import itertools
 import json
 import logging
+import math
+import multiprocessing
 import os
+import queue
+import random
 import re
+import secrets
+import selectors
+import signal
+import socket
+import statistics
 import sys
+import threading
 import time
-from subprocess import PIPE, Popen
+import types
+import urllib.parse
+from subprocess import PIPE, Popen, TimeoutExpired
+from xml.etree import ElementTree
 
 import boto
 import boto.s3.connection
 
+try:
+    # python bindings of librados and librbd ( python3-rados, python3-rbd ), only needed by the native engines
+    import rados
+    import rbd
+except ImportError:
+    rados = rbd = None
+
 with open("config.json", "r") as fd:
     config = json.loads(fd.read())
 log = logging.getLogger(__name__)
-unique_id = time.strftime("%Y%m%d%H%M%S")
+# the processes running the workloads of a distributed run are given the run ID by their agent
+unique_id = os.environ.get("INSTANT_IO_RUN_ID") or time.strftime("%Y%m%d%H%M%S")
 log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 logging.basicConfig(
     level=config["logging"], filename=f"log_IO_{unique_id}.txt", format=log_format
@@ -22,14 +59,408 @@ stdout_handler = logging.StreamHandler(sys.stdout)
 log.addHandler(stdout_handler)
 
 
-def cmdline(command):
+class CommandError(Exception):
+    """
+    Raised when a command exits with a non zero status, times out or can not be started
+    """
+
+
+class CommandResult:
+    """
+    Outcome of a command run by run_command
+    """
+
+    __slots__ = ("argv", "returncode", "stdout", "stderr", "elapsed", "timed_out")
+
+    def __init__(self, argv, returncode, stdout, stderr, elapsed, timed_out=False):
+        self.argv = argv
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.elapsed = elapsed
+        self.timed_out = timed_out
+
+    @property
+    def ok(self):
+        """
+        :return: True if the command completed with exit status 0
+        """
+        return self.returncode == 0 and not self.timed_out
+
+
+def run_command(argv, workload="admin", timeout=None, check=False):
+    """
+    Executes the command without a shell, capturing its stdout, stderr, exit status and wall clock time.
+
+    The time taken is recorded in the metrics of the workload as the operation "cmd <command>", so that the
+    time taken by the cluster control plane operations under load is reported along with the IO. Commands still
+    running after the timeout are killed.
+    :param argv: command as a list of arguments. Eg : ["ceph", "osd", "pool", "create", "pool_1", "64", "64"]
+    :param workload: name of the workload the command is run for
+    :param timeout: seconds after which the command is killed. Defaults to "command_timeout" of the Scheduler section
+    :param check: If true, raises CommandError when the command fails, otherwise the failure is only logged
+    :return: CommandResult object
+    """
+    argv = [str(arg) for arg in argv]
+    if timeout is None:
+        timeout = config.get("Scheduler", {}).get("command_timeout", 600)
+    # naming the operation after the command and its sub commands. Eg : cmd ceph osd pool create
+    words = [arg for arg in argv if arg != "sudo"]
+    op = " ".join(
+        words[:1]
+        + list(
+            itertools.takewhile(lambda arg: re.fullmatch(r"[a-z-]+", arg), words[1:4])
+        )
+    )
+    command = " ".join(argv)
+    log.debug(f"Running the command : {command}")
+    start = time.time()
+    timed_out = False
+    try:
+        process = Popen(args=argv, stdout=PIPE, stderr=PIPE)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except TimeoutExpired:
+            process.kill()
+            stdout, stderr = process.communicate()
+            timed_out = True
+        result = CommandResult(
+            argv,
+            process.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+            time.time() - start,
+            timed_out,
+        )
+    except OSError as err:
+        result = CommandResult(argv, None, "", str(err), time.time() - start)
+    metrics.op_stats(workload, f"cmd {op}").record(
+        start, start + result.elapsed, error=not result.ok
+    )
+    log.debug(
+        f"Command {command} exited with status {result.returncode} in {result.elapsed:.3f} secs"
+    )
+    if not result.ok:
+        if timed_out:
+            reason = f"timed out after {timeout} secs"
+        elif result.returncode is None:
+            reason = "could not be started"
+        else:
+            reason = f"failed with exit status {result.returncode}"
+        message = f"Command {command} {reason}. Error : {result.stderr.strip()}"
+        if check:
+            raise CommandError(message)
+        log.error(message)
+    return result
+
+
+def run_commands(commands, workload="admin", timeout=None, check=False):
+    """
+    Runs the independent commands at the same time, with run_command
+    :param commands: list of commands, each as a list of arguments
+    :param workload: name of the workload the commands are run for
+    :param timeout: seconds after which each command is killed
+    :param check: If true, raises CommandError when any of the commands fail
+    :return: list of CommandResult objects, in the order of the commands
+    """
+    if not commands:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(commands)) as executor:
+        return list(
+            executor.map(
+                lambda argv: run_command(argv, workload, timeout, check), commands
+            )
+        )
+
+
+def stream_cmdline(argv, on_line=None, run_time=0):
+    """
+    Executes the command without a shell, handing every line of its output to the callback as soon as it is
+    printed, so that the progress of long running tools can be followed. Lines ended by a carriage return are
+    handed over too.
+
+    The command is killed once it runs for "command_timeout" of the Scheduler section past its expected run
+    time. The output of a command that fails is not returned, so that no metrics are parsed from a partial run
+    :param argv: command as a list of arguments
+    :param on_line: callback called with every line of the output
+    :param run_time: seconds the command is expected to run for. Eg : duration of the rados bench run
+    :return: output of the command
+    :raises CommandError: when the command exits with a non zero status, times out or can not be started
+    """
+    argv = [str(arg) for arg in argv]
+    command = " ".join(argv)
+    timeout = run_time + config.get("Scheduler", {}).get("command_timeout", 600)
+    log.debug(f"Running the command : {command}")
+    try:
+        process = Popen(args=argv, stdout=PIPE, stderr=PIPE)
+    except OSError as err:
+        raise CommandError(f"Command {command} could not be started. Error : {err}")
+    deadline = time.time() + timeout
+    timed_out = False
+    output = {process.stdout.fileno(): [], process.stderr.fileno(): []}
+    partial = b""
+    with selectors.DefaultSelector() as selector:
+        for fd in output:
+            os.set_blocking(fd, False)
+            selector.register(fd, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                process.kill()
+                timed_out = True
+                break
+            for key, _ in selector.select(remaining):
+                try:
+                    data = os.read(key.fd, 65536)
+                except BlockingIOError:
+                    continue
+                if not data:
+                    selector.unregister(key.fd)
+                    continue
+                output[key.fd].append(data)
+                if key.fd != process.stdout.fileno():
+                    continue
+                *lines, partial = re.split(rb"\r\n|\r|\n", partial + data)
+                for line in lines:
+                    if on_line and line:
+                        on_line(line.decode(errors="replace"))
+    if on_line and partial and not timed_out:
+        on_line(partial.decode(errors="replace"))
+    stdout = b"".join(output[process.stdout.fileno()]).decode(errors="replace")
+    stderr = b"".join(output[process.stderr.fileno()]).decode(errors="replace")
+    process.stdout.close()
+    process.stderr.close()
+    process.wait()
+    if timed_out:
+        reason = f"timed out after {timeout} secs"
+    elif process.returncode:
+        reason = f"failed with exit status {process.returncode}"
+    else:
+        return stdout
+    raise CommandError(f"Command {command} {reason}. Error : {stderr.strip()}")
+
+
+class SetupStep:
+    """
+    Step setting up a resource used by a workload, run by the ResourceManager
+    """
+
+    __slots__ = ("name", "argv", "teardown", "after")
+
+    def __init__(self, name, argv, teardown=None, after=()):
+        """
+        :param name: name of the resource set up by the step. Eg : pool rbd_io_pool_1_20200913090428
+        :param argv: command setting up the resource, as a list of arguments
+        :param teardown: command removing the resource, None if the resource is to be kept
+        :param after: names of the steps that need to be completed before this step
+        """
+        self.name = name
+        self.argv = argv
+        self.teardown = teardown
+        self.after = list(after)
+
+
+class ResourceManager:
     """
-    handy method to execute the Shell commands
-    :param command: shell command to be executed
-    :return:
+    Sets up the pools, images and mounts used by the workloads, and tears them down once the workload ends.
+
+    The setup steps form a dependency graph, and every step is started as soon as all the steps it depends on
+    are completed, so that the independent steps run at the same time. Teardown walks the graph the other way,
+    removing a resource once all the resources depending on it are removed. Every resource created is recorded
+    in the manifest file resources_IO_<timestamp>.jsonl, which is used to tear down the resources left behind by
+    a crashed run. The time taken to set up and tear down every resource is recorded in the results of its workload.
     """
-    process = Popen(args=command, stdout=PIPE, shell=True)
-    return process.communicate()[0].decode()
+
+    def __init__(self):
+        """
+        Initializing the empty manifest of the run
+        """
+        self.manifest = f"resources_IO_{unique_id}.jsonl"
+        self.created = []
+        self.lock = threading.Lock()
+
+    def record(self, event, **entry):
+        """
+        Appends an event to the manifest file. The lines are appended, so that the workload processes can
+        share the manifest file of the run
+        :param event: "created" or "removed"
+        :param entry: details of the resource
+        :return: None
+        """
+        with self.lock:
+            with open(self.manifest, "a") as fd:
+                fd.write(json.dumps(dict(entry, event=event)) + "\n")
+
+    @staticmethod
+    def load(manifest):
+        """
+        Reads the resources created and not yet removed from a manifest file
+        :param manifest: path of the manifest file
+        :return: list of the resources, in the order they were created
+        """
+        entries = {}
+        with open(manifest, "r") as fd:
+            for line in fd:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.pop("event") == "created":
+                    entries[entry["name"]] = entry
+                else:
+                    entries.pop(entry["name"], None)
+        return list(entries.values())
+
+    def setup(self, workload, steps):
+        """
+        Runs the setup steps of the workload, every step as soon as all the steps it depends on are completed.
+        Once a step fails, no more steps are started
+        :param workload: name of the workload the resources are set up for
+        :param steps: list of SetupStep objects
+        :return: None
+        :raises CommandError: if any of the steps failed
+        """
+        steps = {step.name: step for step in steps}
+        for step in steps.values():
+            unknown = set(step.after) - set(steps)
+            if unknown:
+                raise ValueError(
+                    f"Setup step {step.name} depends on unknown steps {unknown}"
+                )
+        if not steps:
+            return
+
+        def ancestors(name):
+            # all the steps the step depends on, directly or through other steps
+            after = steps[name].after
+            return set(after).union(*(ancestors(dep) for dep in after))
+
+        pending = dict(steps)
+        done = set()
+        error = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            running = {}
+            while True:
+                if error is None:
+                    for name, step in list(pending.items()):
+                        if done.issuperset(step.after):
+                            future = executor.submit(
+                                self.run_step, workload, step, ancestors(name)
+                            )
+                            running[future] = name
+                            del pending[name]
+                if not running:
+                    break
+                finished, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        future.result()
+                        done.add(name)
+                    except CommandError as err:
+                        error = error or err
+        if error:
+            raise error
+
+    def run_step(self, workload, step, ancestors):
+        """
+        Runs the setup step, recording the resource created in the manifest
+        :param workload: name of the workload
+        :param step: SetupStep object
+        :param ancestors: names of all the steps the step depends on
+        :return: None
+        """
+        start = time.time()
+        run_command(step.argv, workload=workload, check=True)
+        elapsed = round(time.time() - start, 3)
+        if step.teardown:
+            entry = {
+                "name": step.name,
+                "workload": workload,
+                "teardown": [str(arg) for arg in step.teardown],
+                "after": sorted(ancestors),
+            }
+            with self.lock:
+                self.created.append(entry)
+            self.record("created", **entry)
+        metrics.record_result(workload, "setup", step.name, {"seconds": elapsed})
+
+    def teardown(self, workload):
+        """
+        Tears down all the resources created for the workload, unless disabled with "teardown" in the
+        Scheduler section
+        :param workload: name of the workload
+        :return: None
+        """
+        with self.lock:
+            entries = [entry for entry in self.created if entry["workload"] == workload]
+        if not entries:
+            return
+        if not config.get("Scheduler", {}).get("teardown", True):
+            log.info(
+                f"Keeping the resources created for {workload}. They can be removed with the command :"
+                f" python3 instant-io.py teardown {self.manifest}"
+            )
+            return
+        with self.lock:
+            self.created = [entry for entry in self.created if entry not in entries]
+        log.info(f"Tearing down {len(entries)} resources created for {workload}")
+        self.remove(entries)
+
+    def remove(self, entries):
+        """
+        Removes the resources, every resource as soon as all the resources depending on it are removed.
+        The resources that failed to be removed are kept in the manifest
+        :param entries: list of the resources, as recorded in the manifest
+        :return: number of resources that failed to be removed
+        """
+        remaining = {entry["name"]: entry for entry in entries}
+        if not remaining:
+            return 0
+        failed = 0
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(remaining)
+        ) as executor:
+            running = {}
+            while remaining or running:
+                for name, entry in list(remaining.items()):
+                    others = list(remaining.values()) + list(running.values())
+                    if not any(name in other["after"] for other in others):
+                        running[executor.submit(self.remove_resource, entry)] = entry
+                        del remaining[name]
+                if not running:
+                    # can not happen with the graph of a setup, guarding against edited manifests
+                    failed += len(remaining)
+                    break
+                finished, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in finished:
+                    running.pop(future)
+                    failed += 0 if future.result() else 1
+        return failed
+
+    def remove_resource(self, entry):
+        """
+        Runs the teardown command of the resource
+        :param entry: details of the resource, as recorded in the manifest
+        :return: True if the resource was removed
+        """
+        start = time.time()
+        result = run_command(entry["teardown"], workload=entry["workload"])
+        if result.ok:
+            self.record("removed", name=entry["name"])
+            metrics.record_result(
+                entry["workload"],
+                "teardown",
+                entry["name"],
+                {"seconds": round(time.time() - start, 3)},
+            )
+        return result.ok
+
+
+resources = ResourceManager()
 
 
 def count(func):
@@ -52,918 +483,5790 @@ def collect_hostname():
     Collects the FQDN of the given host using Hostname -A
     :return: FQDN of the given host
     """
-    cmd = "hostname -A"
-    op = cmdline(cmd)
+    op = run_command(["hostname", "-A"]).stdout
     log.debug(f"The o/p of all Hostnames : {op}")
     for name in op.split(" "):
         if re.search(r"\.com", name):
             return name.strip()
     # if no FQDN name was found, returning the IP of the host
-    op = cmdline("hostname -I | awk '{print $1}'").strip()
+    op = run_command(["hostname", "-I"]).stdout.split()
     log.debug(f"The o/p of the IP's : {op}")
-    return op
+    return op[0] if op else ""
 
 
-class RgwIoTools:
+class LatencyHistogram:
     """
-    This class implements the methods required to trigger the Object IO for RGW
+    Streaming latency histogram with fixed memory, similar to HDR histogram.
+
+    Values are recorded in microseconds into log-linear buckets: every power of two range is split into
+    2^(significant_bits - 1) buckets, which keeps the error of any percentile within 1/2^(significant_bits - 1)
+    of the value, irrespective of the number of values recorded.
     """
 
+    significant_bits = 7
+    # values above 2^40 microseconds (~12 days) are clamped
+    max_bits = 40
+
     def __init__(self):
         """
-        Initializing the connection for the objects
+        Initializing all the bucket counts to 0
         """
-        # self.host = collect_hostname()
-        self.host = config["RGW"]["rgw_host"]
-        if config["RGW"]["create_rgw_user"]:
-            log.debug(
-                "User creation is set to true, creating a radosgw admin user with keys"
-            )
-            user = f"operator_{unique_id}"
-            disp_name = f"s3 {user}"
-            email = f"{user}@example.com"
-            self.access_key = unique_id
-            self.secret_key = f"{unique_id}0000"
-
-            admin_create_command = f"""radosgw-admin user create --uid="{user}" --display-name="{disp_name}" \
---email="{email}" --access_key="{self.access_key}" --secret="{self.secret_key}" """
-            cmdline(admin_create_command)
-            log.info(f"admin user for RGW : {user} created successfully")
-        else:
-            log.debug(
-                "User creation is set to false, creating a radosgw admin user provided with keys"
-            )
-            self.access_key = config["RGW"]["access_key"]
-            self.secret_key = config["RGW"]["secret_key"]
+        self.sub_buckets = 1 << self.significant_bits
+        self.half = self.sub_buckets // 2
+        size = self.sub_buckets + self.half * (self.max_bits - self.significant_bits)
+        self.counts = array.array("q", bytes(8 * size))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
 
-        try:
-            self.conn = boto.connect_s3(
-                aws_access_key_id=self.access_key,
-                aws_secret_access_key=self.secret_key,
-                host=self.host,
-                port=80,
-                is_secure=False,  # comment if you are using ssl
-                calling_format=boto.s3.connection.OrdinaryCallingFormat(),
-            )
-        except AttributeError as err:
-            log.error(
-                f"Please enter the access key and Secret key as string. Error message : {err}"
-            )
-        except Exception as err:
-            log.error(
-                f"An exception occurred during connecting with S3 . Error message : {err}"
-            )
-        log.debug(
-            "successfully created a connection with the Host for IO using BOTO tool"
-        )
+    def index(self, value):
+        """
+        Finds the bucket for the given value
+        :param value: value in microseconds
+        :return: index of the bucket
+        """
+        if value < self.sub_buckets:
+            return value
+        shift = value.bit_length() - self.significant_bits
+        return self.sub_buckets + (shift - 1) * self.half + (value >> shift) - self.half
 
-    def list_buckets(self):
+    def bucket_bounds(self, index):
         """
-        lists all the buckets created by the given user
-        :return: dictionary of all the buckets with the timestamp
+        Finds the range of values held by the given bucket
+        :param index: index of the bucket
+        :return: tuple of the lowest and highest value of the bucket, in microseconds
         """
-        bucket_dictionary = {}
-        log.debug("listing all the buckets on the host")
-        for bucket in self.conn.get_all_buckets():
-            log.info(f"{bucket.name}\t{bucket.creation_date}")
-            bucket_dictionary[bucket.name] = bucket.creation_date
-        log.debug(f"all the buckets on the host are : {str(bucket_dictionary)}")
-        return bucket_dictionary
+        if index < self.sub_buckets:
+            return index, index
+        shift, mantissa = divmod(index - self.sub_buckets, self.half)
+        shift += 1
+        mantissa += self.half
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
 
-    def create_buckets(self, quantity):
+    def record(self, seconds, count=1):
         """
-        Creates the buckets as many as specified in the
-        :param quantity: no of buckets to be created
-        :return: Returns the list of buckets created
+        Records a latency value
+        :param seconds: latency in seconds
+        :param count: number of times the value was observed
+        :return: None
         """
-        buckets_list = []
-        log.debug("creating buckets for RGW IO")
-        for no in range(int(quantity)):
-            name = f"my-bucket-{unique_id}-no-{no}"
-            log.debug(f"creating bucket : {name}")
-            try:
-                bucket = self.conn.create_bucket(name)
-                buckets_list.append(bucket.name)
-            except Exception as err:
-                log.error(
-                    f"An error occurred when creating the bucket {name}. Error message : \n {err}"
-                )
-        log.debug(f"all the buckets created are : {str(buckets_list)}")
-        return buckets_list
+        value = min(max(int(seconds * 1e6), 0), (1 << self.max_bits) - 1)
+        self.counts[self.index(value)] += count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
 
-    def list_bucket_content(self, bucket=None):
+    def percentile(self, percent):
         """
-        Lists the content of the bucket.
+        Calculates the given percentile of the recorded values
+        :param percent: percentile to be calculated. Eg : 99.9
+        :return: value in microseconds
+        """
+        if not self.count:
+            return 0
+        target = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.bucket_bounds(index)[1], self.max)
+        return self.max
 
-        When a bucket name is provided, returns the contents of that particular bucket,
-        else lists the contents of all the buckets created by the particular user
-        :param bucket: Name of the bucket whose contents need to be listed.
-        :return: dictionary of the objects with bucket name with key
+    def mean(self):
         """
-        objects_dictionary = {}
-        bktobjects = collections.namedtuple("bktobjects", ["name", "size", "modified"])
-        log.debug("Listing the objects inside the specified bucket(s)")
-        if bucket:
-            bucket = self.conn.get_bucket(bucket)
-            log.debug(f"Indivudial bucket name given. Bucket {bucket.name}")
-            key_list = []
-            for key in bucket.list():
-                log.info(
-                    f"bucket : {bucket.name}\t{key.name}\t{key.size}\t{key.last_modified}"
-                )
-                key_list.append(bktobjects(key.name, key.size, key.last_modified))
-            objects_dictionary[bucket.name] = key_list
-        else:
-            log.debug("listing contents of all the buckets created by user")
-            for bucket in self.conn.get_all_buckets():
-                # bucket = self.conn.get_bucket(bucket)
-                key_list = []
-                for key in bucket.list():
-                    log.info(
-                        f"bucket : {bucket.name}\t{key.name}\t{key.size}\t{key.last_modified}"
-                    )
-                    key_list.append(bktobjects(key.name, key.size, key.last_modified))
-                objects_dictionary[bucket.name] = key_list
-        log.debug(f"the objects are : {str(objects_dictionary)}")
-        return objects_dictionary
+        :return: mean of the recorded values in microseconds
+        """
+        return self.total / self.count if self.count else 0
 
-    def create_bucket_object(self, bucket, quantity):
+    def merge(self, other):
         """
-        creates the given number of objects inside the given bucket
-        :param bucket: name of the bucket where the object needs to be created
-        :param quantity: number of objects to be created
-        :return: list of all the keys of objects created
+        Adds all the values recorded in the other histogram into this histogram
+        :param other: LatencyHistogram object
+        :return: None
         """
-        obj_key_list = []
-        log.info(f"creating {quantity} objects inside bucket {bucket}")
-        bucket = self.conn.get_bucket(bucket)
-        for no in range(int(quantity)):
-            ukey = f"obj_{unique_id}_no{no}"
-            log.debug(f"creating the object no : {no} with key : {ukey}")
-            try:
-                key = bucket.new_key(ukey)
-                copy_string = f"""
-                This is a test object being written for the key : {ukey}
-                This python script can be used to write IO into the given host.
-                """
-                key.set_contents_from_string(copy_string)
-                obj_key_list.append(ukey)
-            except Exception as err:
-                log.error(
-                    f"An error occurred when creating the object {ukey} in bucket {bucket}."
-                    f" Error message : \n {err}"
-                )
-        log.debug(f"All the keys created are : {str(obj_key_list)}")
-        return obj_key_list
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
 
-    def delete_boto_object(self, bucket, key=None, delete_all=False):
+    def latency_ms(self):
         """
-        Deletes the given object from the bucket.
+        Summarizes the recorded values
+        :return: dictionary of the mean, p50, p90, p99, p99.9 and max latencies in ms
+        """
+        return {
+            "mean": round(self.mean() / 1000, 3),
+            "p50": self.percentile(50) / 1000,
+            "p90": self.percentile(90) / 1000,
+            "p99": self.percentile(99) / 1000,
+            "p99.9": self.percentile(99.9) / 1000,
+            "max": self.max / 1000,
+        }
 
-        If the Key is specified, deletes only the object from the bucket, otherwise deletes all the objects from
-        the given bucket
-        :param bucket: name of the bucket from where the object needs to be deleted
-        :param key: name of the key to be deleted.
-        :param delete_all: If true, deletes all the objects in the given bucket
-        :return: None
+    def cumulative_counts(self, bounds):
         """
-        log.info(f"Deleting the object(s) present in the given bucket {bucket}")
-        key_list = [
-            key,
-        ]
-        bucket = self.conn.get_bucket(bucket)
-        if delete_all:
-            log.debug(f"selected to delete all the objects in bucket {bucket.name}")
-            key_list_dict = self.list_bucket_content(bucket)
-            key_list = [ob.name for ob in key_list_dict[bucket]]
-            log.debug(f"the keys obtained for bucket {bucket.name} are : {key_list}")
+        Counts the values recorded at or below each of the given bounds, as needed for Prometheus histogram buckets.
+        A bound falling inside a bucket counts the whole bucket
+        :param bounds: sorted list of bounds in seconds
+        :return: list of the counts, one per bound
+        """
+        counts = []
+        seen = 0
+        start = 0
+        for bound in bounds:
+            value = min(int(bound * 1e6), (1 << self.max_bits) - 1)
+            end = self.index(value) + 1
+            seen += sum(self.counts[start:end])
+            start = end
+            counts.append(seen)
+        return counts
 
-        for key in key_list:
-            try:
-                bucket.delete_key(key)
-            except Exception as err:
-                log.error(
-                    f"An error occurred when deleting the object {key} in bucket {bucket.name}."
-                    f" Error message : \n {err}"
-                )
-            log.debug(f"Delete the object {key} in bucket {bucket.name}")
-        log.info(f"done with deleting object(s) in bucket {bucket.name}")
+    def to_dict(self):
+        """
+        Serializes the histogram, with only the non-empty buckets
+        :return: dictionary of the histogram
+        """
+        return {
+            "unit": "us",
+            "significant_bits": self.significant_bits,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min or 0,
+            "max": self.max,
+            "buckets": {
+                str(index): bucket_count
+                for index, bucket_count in enumerate(self.counts)
+                if bucket_count
+            },
+        }
 
-    def delete_boto_bucket(self, bucket):
+    @classmethod
+    def from_dict(cls, data):
         """
-        Deletes the empty bucket. If the bucket is not empty, deletes all the objects and then delets bucket
-        :param bucket: Name of the bucket to be deleted.
-        :return: None
+        Creates a histogram from its serialized form
+        :param data: dictionary generated by to_dict
+        :return: LatencyHistogram object
         """
-        bucket = self.conn.get_bucket(bucket)
-        log.info(f"Bucket provided to be deleted : {bucket.name}")
-        contents = self.list_bucket_content(bucket.name)
-        if len(contents[bucket.name]) >= 1:
-            log.info(
-                f"Bucket {bucket.name} is not empty. Deleting objects before deleting"
-            )
-            self.delete_boto_object(bucket=bucket.name, delete_all=True)
-        try:
-            self.conn.delete_bucket(bucket.name)
-        except Exception as err:
-            log.error(
-                f"An error occurred when deleting bucket {bucket.name}."
-                f" Error message : \n {err}"
-            )
-        log.info(f"completed deleting bucket {bucket.name}")
+        hist = cls()
+        for index, bucket_count in data["buckets"].items():
+            hist.counts[int(index)] = bucket_count
+        hist.count = data["count"]
+        hist.total = data["total"]
+        hist.min = data["min"] if data["count"] else None
+        hist.max = data["max"]
+        return hist
 
-    def download_boto_objects(self, bucket, key=None):
+
+class OpStats:
+    """
+    Collects the latency histogram, bytes moved and errors of one type of operation
+    """
+
+    def __init__(self):
         """
-        Used to download the object on to local file system simulating read option.
+        Initializing the counters
+        """
+        self.hist = LatencyHistogram()
+        self.bytes = 0
+        self.errors = 0
+        self.first_start = None
+        self.last_end = None
+        # operations recorded since the last interval was taken, used for the timeline
+        self.interval = LatencyHistogram()
+        self.interval_bytes = 0
+        self.interval_errors = 0
+        self.lock = threading.Lock()
 
-        If Key is specified along with bucket name, only that object will be downloaded, Otherwise all the objects in
-        the bucket will be downloaded. Creates a folder called boto_objects and downloads them in the folder.
-        :param bucket: Name of the bucket from where to download a object
-        :param key: Name of the object to be downloaded
+    def record(self, start, end, nbytes=0, error=False):
+        """
+        Records one operation
+        :param start: wall clock time at which the operation started
+        :param end: wall clock time at which the operation ended
+        :param nbytes: number of bytes moved by the operation
+        :param error: If true, the operation is counted as failed
         :return: None
         """
+        with self.lock:
+            if error:
+                self.errors += 1
+                self.interval_errors += 1
+            else:
+                self.hist.record(end - start)
+                self.bytes += nbytes
+                self.interval.record(end - start)
+                self.interval_bytes += nbytes
+            if self.first_start is None or start < self.first_start:
+                self.first_start = start
+            self.last_end = end if self.last_end is None else max(self.last_end, end)
 
-        bucket = self.conn.get_bucket(bucket)
-        # creating a folder for downloading the files
-        folder_name = f"object_downloads_{unique_id}"
-        if not os.path.isdir(folder_name):
-            folder_create_cmd = f"mkdir {folder_name}"
-            log.debug(
-                f"Creating the folder : {folder_name} via the command : {folder_create_cmd}"
-            )
-            cmdline(folder_create_cmd)
-        log.info(f"Downloading object(s) from the bucket {bucket.name}")
-        keys = [
-            key,
-        ]
-        if not key:
-            log.debug(f"Downloading all the objects from the bucket {bucket.name}")
-            bkt_content = self.list_bucket_content(bucket=bucket.name)
-            log.debug(
-                f"\n\nDownloading The contents of bucket : {bucket.name}. The list of objects obtained"
-                f" is :\n{str(bkt_content)}\n\n and number of objects is/are {len(bkt_content[bucket.name])}"
-            )
-            keys = [
-                bkt_content[bucket.name][cnt].name
-                for cnt in range(len(bkt_content[bucket.name]))
-            ]
-            log.debug(f"All the keys obtained for downloading are : {keys}")
-
-        # Proceeding to download all the keys provided
-        keys = [ky for ky in keys if ky[-1] != "/"]
-        for key in keys:
-            log.debug(f"Downloading the objects {key} from the bucket {bucket.name}")
-            # creating a file to download the contents of the object
-            file_name = f"object_{bucket.name}_{key}.txt"
-            file_create_cmd = f"touch {folder_name}/{file_name}"
-            cmdline(file_create_cmd)
-            log.debug(
-                f"the name of the download file is {file_name}, creating file via command : {file_create_cmd}"
-            )
-            try:
-                key = bucket.get_key(key)
-                key.get_contents_to_filename(f"{folder_name}/{file_name}")
-            except Exception as err:
-                log.error(
-                    f"An error occurred when downloading the object {key} in bucket {bucket.name}."
-                    f" Error message : \n {err}"
+    def merge(self, other):
+        """
+        Adds the operations recorded by the other OpStats. Eg : in a process of the file engine
+        :param other: OpStats object
+        :return: None
+        """
+        with self.lock:
+            self.hist.merge(other.hist)
+            self.interval.merge(other.hist)
+            self.bytes += other.bytes
+            self.interval_bytes += other.bytes
+            self.errors += other.errors
+            self.interval_errors += other.errors
+            if other.first_start is not None:
+                if self.first_start is None or other.first_start < self.first_start:
+                    self.first_start = other.first_start
+                self.last_end = (
+                    other.last_end
+                    if self.last_end is None
+                    else max(self.last_end, other.last_end)
                 )
 
-    def generate_boto_obj_url(self, bucket, key=None):
+    def __getstate__(self):
+        # the lock can not be pickled, OpStats are sent back from the processes of the file engine
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def take_interval(self):
         """
-        Used to create download URL for the object simulating read option.
+        Collects the operations recorded since the last call, and starts a new interval
+        :return: tuple of the latency histogram, bytes and errors of the interval
+        """
+        with self.lock:
+            interval = (self.interval, self.interval_bytes, self.interval_errors)
+            self.interval = LatencyHistogram()
+            self.interval_bytes = 0
+            self.interval_errors = 0
+        return interval
 
-        If Key is specified along with bucket name, only for that object the URL will be generated,
-         Otherwise all the objects in the bucket will have the download URL's.
-        :param bucket: Name of the bucket from where to download a object
-        :param key: Name of the object for which URL should be generated
-        :return: Returns the list of objects URL's
+    def summary(self):
         """
-        bucket = self.conn.get_bucket(bucket)
-        log.info(f"Creating URL's for object(s) from the bucket {bucket.name}")
-        all_url = []
-        keys = [
-            key,
-        ]
-        if not key:
-            log.debug(f"Downloading all the objects from the bucket {bucket.name}")
-            bkt_content = self.list_bucket_content(bucket=bucket.name)
-            keys = [
-                bkt_content[bucket.name][cnt].name
-                for cnt in range(len(bkt_content[bucket.name]))
-            ]
-
-        # Proceeding to download all the keys provided
-        keys = [ky for ky in keys if ky[-1] != "/"]
-        for key in keys:
-            log.debug(f"Downloading the objects {key} from the bucket {bucket.name}")
-            try:
-                key_name = bucket.get_key(key)
-                obj_url = key_name.generate_url(0, query_auth=False, force_http=True)
-                log.debug(
-                    f"The URL generated is : {str(obj_url)} of type {type(obj_url)}"
-                )
-                all_url.append(obj_url)
-            except Exception as err:
-                log.error(
-                    f"An error occurred when generating URI the object {key} in bucket {bucket.name}."
-                    f" Error message : \n {err}"
-                )
-        return all_url
+        Summarizes the operations recorded
+        :return: dictionary of the ops, errors, latency percentiles in ms, ops/sec and MB/s
+        """
+        elapsed = (self.last_end - self.first_start) if self.first_start else 0
+        hist = self.hist
+        return {
+            "ops": hist.count,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "elapsed_secs": round(elapsed, 3),
+            "ops_per_sec": round(hist.count / elapsed, 2) if elapsed else 0,
+            "mb_per_sec": round(self.bytes / elapsed / 2**20, 2) if elapsed else 0,
+            "latency_ms": hist.latency_ms(),
+        }
 
 
-class RadosIoTools:
+class MetricsRegistry:
     """
-    This class implements the methods required to trigger the Object IO via Rados Bench tool
+    Registry of the results of the run, organised as workload -> phase -> operation.
+
+    Holds the OpStats of every operation timed in-process, and the metrics parsed from the output of the
+    external tools (rados bench, fio, smallfile). At the end of each phase the stats are reported in the log,
+    and the results document, holding the config used along with all the stats and the raw histograms,
+    is written into the results file results_IO_<timestamp>.json next to the log file.
     """
 
-    @count
     def __init__(self):
         """
-        Initializing class object by creating a pool for triggering Rados bench
+        Initializing the empty registry
         """
-        self.pool_name = f"instant_io_pool_{self.__init__.calls}_{unique_id}"
-        # pool_create_cmd = f"sudo ceph osd pool create {self.pool_name} 256 256"
-        pool_create_cmd = f"sudo ceph osd pool create {self.pool_name} 64 64"
-        log.debug(
-            f"Creating pool : {self.pool_name} using the command : {pool_create_cmd}"
-        )
-        cmdline(pool_create_cmd)
-        enable_app_cmd = f"sudo ceph osd pool application enable {self.pool_name} rados"
-        log.debug(
-            f"Enabling rbd application on pool : {self.pool_name} using the command : {enable_app_cmd}"
-        )
-        cmdline(enable_app_cmd)
-        # checking if the pool creation was successful
-        all_pools = cmdline("ceph df")
-        log.debug(f"All the pools in the cluster : {all_pools}")
-        if not all_pools.find(self.pool_name):
-            # log.error("failed to create admin user for rados gateway... Exiting")
-            log.error(
-                f"failed to create pool {self.pool_name} for rados bench... Exiting"
-            )
-            exit(100)
-        log.info(f"Created pool {self.pool_name} for Rados Bench successfully")
+        self.stats = collections.defaultdict(dict)
+        self.results = collections.defaultdict(dict)
+        self.current_phase = {}
+        self.timeline = []
+        self.started = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        self.start_time = time.time()
+        # seconds between two interval metrics, and where they are sent. The workload processes started by the
+        # scheduler send them to the scheduler, otherwise they are reported here
+        self.interval_secs = config.get("Scheduler", {}).get("timeline_interval", 5)
+        self.interval_sink = None
+        self.last_saved = 0
+        # latest interval metrics of every operation, and the stats received from the workload processes,
+        # served by the metrics exporter
+        self.last_intervals = {}
+        self.snapshot_sink = None
+        self.remote_stats = {}
+        # cluster side metrics sampled during the run, stored as the first sample followed by the changes
+        self.cluster = {}
+        self.cluster_last = {}
+        # callbacks called with every interval metrics row of this process, and its latency histogram if any
+        self.interval_observers = []
+        # results of every client of a distributed run, keyed by the address of its agent
+        self.clients = {}
+        # maximum number of rows kept in every time series, None to keep all of them
+        self.series_limit = None
+        # the workload processes started by the scheduler do not write the results file,
+        # their results are sent to the scheduler instead
+        self.persist = True
+        self.lock = threading.Lock()
 
-    def bench_write_ops(self, bsize, duration):
+    def op_stats(self, workload, op):
         """
-        Method to trigger Write operation via the Rados Bench tool
-        :param bsize: block size to write
-        :param duration: no of seconds to write the bench objects
+        Collects the OpStats of the operation in the current phase of the workload
+        :param workload: name of the workload. Eg : RGW
+        :param op: name of the operation. Eg : put
+        :return: OpStats object
+        """
+        phase = self.current_phase.get(workload, "default")
+        with self.lock:
+            ops = self.stats[workload].setdefault(phase, {})
+            if op not in ops:
+                ops[op] = OpStats()
+            return ops[op]
+
+    @contextlib.contextmanager
+    def timer(self, workload, op, nbytes=0):
+        """
+        Times the operation run inside the context. Failures are counted as errors and re-raised.
+        The number of bytes can also be set on the yielded sample once known. Eg : sample.nbytes = size
+        :param workload: name of the workload
+        :param op: name of the operation
+        :param nbytes: number of bytes moved by the operation
+        :return: sample object holding the number of bytes
+        """
+        sample = types.SimpleNamespace(nbytes=nbytes)
+        start = time.time()
+        try:
+            yield sample
+        except BaseException:
+            self.op_stats(workload, op).record(start, time.time(), error=True)
+            raise
+        self.op_stats(workload, op).record(start, time.time(), sample.nbytes)
+
+    @contextlib.contextmanager
+    def phase(self, workload, name):
+        """
+        Marks the operations of the workload run inside the context as part of the given phase.
+        The phase is reported and the results file is updated once the phase ends.
+        :param workload: name of the workload
+        :param name: name of the phase. Eg : put objects
         :return: None
         """
-        # dropping the cache from the system before triggering the test
-        cmd = "sudo echo 3 | sudo tee /proc/sys/vm/drop_caches && sudo sync"
-        cmdline(cmd)
-        log.debug("Performing Normal writes.")
-        bench_write_cmd = (
-            f"sudo rados --no-log-to-stderr -b {int(bsize)} -p {self.pool_name} "
-            f"bench {duration} write --no-cleanup"
-        )
-        op = cmdline(bench_write_cmd)
-        log.debug(
-            f"Performed Write on pool {self.pool_name} using command : {cmd} \n  Output :: \n {op} \n"
-        )
-        log.info(
-            f"finished performing write operation via Rados Bench tool on pool {self.pool_name}"
-        )
+        self.current_phase[workload] = name
+        try:
+            yield
+        finally:
+            self.current_phase.pop(workload, None)
+            self.report(workload, name)
+            self.save()
 
-    def bench_read_ops(self, duration):
+    def report(self, workload, phase):
         """
-        Method to perform sequential and Random reads on using the rados bench tool
-        :param duration: no of seconds to read the bench objects
+        Logs the summary of all the operations of the phase
+        :param workload: name of the workload
+        :param phase: name of the phase
         :return: None
         """
-        log.info(f"Performing read operations on the pool {self.pool_name}")
-        if config["Rados_Bench"]["sequential_read"]:
+        for op, stats in self.stats[workload].get(phase, {}).items():
+            summary = stats.summary()
+            lat = summary["latency_ms"]
             log.info(
-                f"Performing sequental read operation on the pool {self.pool_name}"
-            )
-            cmd = f"rados --no-log-to-stderr -p {self.pool_name} bench {duration} seq"
-            log.debug(
-                f"Performing sequential read operations on the pool {self.pool_name} using {cmd}"
-            )
-            op = cmdline(cmd)
-            log.debug(
-                f"Performed sequential read on pool {self.pool_name} using command :{cmd} \nOutput :: \n{op}\n"
+                f"{workload} : {phase} : {op} : {summary['ops']} ops, {summary['errors']} errors, "
+                f"{summary['ops_per_sec']} ops/sec, {summary['mb_per_sec']} MB/s, latency(ms) "
+                f"p50 {lat['p50']} p90 {lat['p90']} p99 {lat['p99']} p99.9 {lat['p99.9']} max {lat['max']}"
             )
 
-        if config["Rados_Bench"]["random_read"]:
-            log.info(
-                f"Performing sequental read operation on the pool {self.pool_name}"
-            )
-            cmd = f"rados --no-log-to-stderr -p {self.pool_name} bench {duration} rand"
-            log.debug(
-                f"Performing Random read operations on the pool {self.pool_name} using {cmd}"
-            )
-            op = cmdline(cmd)
-            log.debug(
-                f"Performed sequential read on pool {self.pool_name} using command :{cmd} \nOutput :: \n{op}\n"
-            )
+    def record_result(self, workload, phase, name, result):
+        """
+        Records the metrics parsed from the output of an external tool, and updates the results file
+        :param workload: name of the workload. Eg : CephFS
+        :param phase: name of the phase. Eg : create
+        :param name: name of the tool or the resource the metrics belong to. Eg : smallfile
+        :param result: dictionary of the metrics
+        :return: None
+        """
+        with self.lock:
+            self.results[workload].setdefault(phase, {})[name] = result
+        log.info(f"{workload} : {phase} : {name} : {result.get('summary', result)}")
+        self.save()
 
-        else:
-            log.info("Read operations not specified in the config file... Exiting ....")
+    def to_dict(self):
+        """
+        Serializes the summary and raw histogram of every operation, along with the tool results
+        :return: dictionary of workload -> phase -> operation -> stats
+        """
+        workloads = collections.defaultdict(dict)
+        for workload, phases in self.results.items():
+            for phase, results in phases.items():
+                workloads[workload].setdefault(phase, {}).update(results)
+        for workload, phases in self.stats.items():
+            for phase, ops in phases.items():
+                workloads[workload].setdefault(phase, {}).update(
+                    {
+                        op: dict(stats.summary(), histogram=stats.hist.to_dict())
+                        for op, stats in ops.items()
+                    }
+                )
+        return dict(workloads)
 
-    def bench_cleanup(self):
+    def stats_snapshot(self, workload):
         """
-        Removes the data created by the rados bench command
+        Serializes the counters and histograms of the operations of the workload recorded so far
+        :param workload: name of the workload
+        :return: dictionary of phase -> operation -> ops, errors, bytes and histogram
+        """
+        with self.lock:
+            phases = {phase: dict(ops) for phase, ops in self.stats[workload].items()}
+        snapshot = {}
+        for phase, ops in phases.items():
+            for op, stats in ops.items():
+                with stats.lock:
+                    snapshot.setdefault(phase, {})[op] = {
+                        "ops": stats.hist.count,
+                        "errors": stats.errors,
+                        "bytes": stats.bytes,
+                        "histogram": stats.hist.to_dict(),
+                    }
+        return snapshot
+
+    def live_stats(self):
+        """
+        Collects the counters and histograms of all the operations recorded so far, in this process
+        and in the workload processes
+        :return: dictionary of workload -> phase -> operation -> ops, errors, bytes and histogram
+        """
+        with self.lock:
+            workloads = list(self.stats)
+            live = dict(self.remote_stats)
+        for workload in workloads:
+            live[workload] = self.stats_snapshot(workload)
+        return live
+
+    def merge_results(self, workloads):
+        """
+        Adds the serialized results of workloads run elsewhere. Eg : in a workload process
+        :param workloads: dictionary of workload -> phase -> operation -> stats
         :return: None
         """
-        log.info(f"Deleting the objects created in the pool : {self.pool_name}")
-        cmd = f"rados -p {self.pool_name} cleanup"
-        op = cmdline(cmd)
-        log.debug(
-            f"Performed cleanup of pool {self.pool_name} using command : {cmd} \n  Output :: \n {op} \n"
-        )
-        # cmd = f"ceph osd pool delete {self.pool_name} --yes-i-really-really-mean-it"
-        # cmdline(cmd)
+        with self.lock:
+            for workload, phases in workloads.items():
+                for phase, results in phases.items():
+                    self.results[workload].setdefault(phase, {}).update(results)
 
+    def take_intervals(self, workload, interval_secs):
+        """
+        Summarizes the operations of the workload recorded since the last call
+        :param workload: name of the workload
+        :param interval_secs: length of the interval in seconds
+        :return: list of dictionaries with the ops, errors, ops/sec, MB/s and latencies of every operation
+        """
+        with self.lock:
+            all_stats = [
+                (phase, op, stats)
+                for phase, ops in self.stats[workload].items()
+                for op, stats in ops.items()
+            ]
+        rows = []
+        for phase, op, stats in all_stats:
+            hist, nbytes, errors = stats.take_interval()
+            if not hist.count and not errors:
+                continue
+            row = {
+                "workload": workload,
+                "phase": phase,
+                "op": op,
+                "ops": hist.count,
+                "errors": errors,
+                "ops_per_sec": round(hist.count / interval_secs, 2),
+                "mb_per_sec": round(nbytes / interval_secs / 2**20, 2),
+                "p50_ms": hist.percentile(50) / 1000,
+                "p99_ms": hist.percentile(99) / 1000,
+                "time": round(time.time() - self.start_time, 3),
+            }
+            for observer in list(self.interval_observers):
+                observer(row, hist)
+            rows.append(row)
+        return rows
 
-class RbdFioTools:
-    """
-    Class containing modules for running File IO for Rados block devices
-    """
+    def add_intervals(self, rows):
+        """
+        Reports the interval metrics, logging one line per operation and adding them to the timeline.
+        The results file is updated at most once a second, so that the metrics collected so far survive
+        if the run is killed
+        :param rows: list of dictionaries of the interval metrics, as returned by take_intervals
+        :return: None
+        """
+        if self.interval_sink:
+            for row in rows:
+                self.interval_sink(row)
+            return
+        for row in rows:
+            latency = ""
+            if "p50_ms" in row:
+                latency = f", p50 {row['p50_ms']} ms, p99 {row['p99_ms']} ms"
+            elif row.get("lat_ms") is not None:
+                latency = f", latency {row['lat_ms']} ms"
+            client = f"{row['client']} : " if "client" in row else ""
+            log.info(
+                f"[{row['time']:>8.1f}s] {client}{row['workload']} : {row['phase']} : {row['op']} : "
+                f"{row['ops_per_sec']} ops/sec, {row['mb_per_sec']} MB/s{latency}, {row.get('errors', 0)} errors"
+            )
+        with self.lock:
+            self.timeline.extend(rows)
+            for row in rows:
+                self.last_intervals[(row["workload"], row["phase"], row["op"])] = row
+        if rows and time.time() - self.last_saved >= 1:
+            self.save()
 
-    @count
-    def __init__(self):
+    def interval(self, workload, phase, op, **values):
         """
-        Performs all the pre-requsits fro running FIO on for testing.
+        Reports the interval metrics of an external tool, parsed from its progress output
+        :param workload: name of the workload. Eg : Rados_Bench
+        :param phase: name of the phase
+        :param op: name of the operation, or of the resource the metrics belong to. Eg : write
+        :param values: ops_per_sec, mb_per_sec and optionally lat_ms of the interval
+        :return: None
+        """
+        row = {"workload": workload, "phase": phase, "op": op}
+        row.update(values, time=round(time.time() - self.start_time, 3))
+        for observer in list(self.interval_observers):
+            observer(row, None)
+        self.add_intervals([row])
 
-        Steps performed in init:
-        1. Create a pool for testing
-        2. Create a rbd image in the test pool
-        3. Map image to a block device
-        4. Make file system
-        5. Mount the Ceph rbd image image
+    def add_cluster_sample(self, name, values):
         """
-        log.debug("Performing pre-requisites for running FIO on the given host")
-        # Create a pool for testing
-        self.pool_name = f"rbd_io_pool_{self.__init__.calls}_{unique_id}"
-        pool_create_cmd = f"sudo ceph osd pool create {self.pool_name} 256 256"
-        log.debug(
-            f"Creating pool : {self.pool_name} using the command : {pool_create_cmd}"
-        )
-        cmdline(pool_create_cmd)
+        Adds a sample of the cluster side metrics. The first sample is stored in full, and the later ones
+        only as the values that changed or were removed since the previous sample
+        :param name: name of the command sampled. Eg : df
+        :param values: dictionary of the flattened output of the command, as returned by flatten_json
+        :return: None
+        """
+        elapsed = round(time.time() - self.start_time, 3)
+        with self.lock:
+            last = self.cluster_last.get(name)
+            self.cluster_last[name] = values
+            if last is None:
+                self.cluster[name] = {"time": elapsed, "base": values, "deltas": []}
+            else:
+                delta = {
+                    "time": elapsed,
+                    "changed": {
+                        key: value
+                        for key, value in values.items()
+                        if key not in last or last[key] != value
+                    },
+                }
+                removed = [key for key in last if key not in values]
+                if removed:
+                    delta["removed"] = removed
+                samples = self.cluster[name]
+                samples["deltas"].append(delta)
+                if self.series_limit and len(samples["deltas"]) > self.series_limit:
+                    # folding the oldest change into the first sample, which then holds the state at that time
+                    oldest = samples["deltas"].pop(0)
+                    samples["base"] = dict(samples["base"], **oldest["changed"])
+                    for key in oldest.get("removed", []):
+                        samples["base"].pop(key, None)
+                    samples["time"] = oldest["time"]
+        if time.time() - self.last_saved >= 1:
+            self.save()
 
-        enable_app_cmd = f"sudo ceph osd pool application enable {self.pool_name} rbd"
-        log.debug(
-            f"Enabling rbd application on pool : {self.pool_name} using the command : {enable_app_cmd}"
-        )
-        cmdline(enable_app_cmd)
+    def limit_series(self, rows):
+        """
+        Keeps only the latest rows of the timeline and of the cluster samples, so that the memory used stays
+        flat over long runs. The older cluster samples are folded into the first sample
+        :param rows: maximum number of rows kept in every time series
+        :return: None
+        """
+        with self.lock:
+            self.series_limit = rows
+            self.timeline = collections.deque(self.timeline, maxlen=rows)
 
-        # Creating a image on the given pool
-        self.image_name = f"rbd_io_image_{self.__init__.calls}_{unique_id}"
-        image_create = f"sudo rbd create {self.image_name} --size 4096 --pool {self.pool_name} --image-feature layering"
-        log.debug(
-            f"Creating image : {self.image_name} using the command : {image_create}"
-        )
-        cmdline(image_create)
+    @contextlib.contextmanager
+    def interval_sampler(self, workload):
+        """
+        Reports the interval metrics of the operations of the workload every "timeline_interval" seconds,
+        while the context runs
+        :param workload: name of the workload
+        :return: None
+        """
+        stopped = threading.Event()
 
-        # Mapping the image create to the client
-        image_map_cmd = f"sudo rbd map {self.image_name} --pool {self.pool_name} --name client.admin"
-        log.debug(
-            f"Mapping image : {self.image_name} to client using the command : {image_map_cmd}"
-        )
-        cmdline(image_map_cmd)
+        def sample():
+            while not stopped.wait(self.interval_secs):
+                self.add_intervals(self.take_intervals(workload, self.interval_secs))
+                if self.snapshot_sink:
+                    self.snapshot_sink(workload, self.stats_snapshot(workload))
 
-        # Creating file system on the image created
-        create_fs_cmd = (
-            f"sudo mkfs.ext4 -m0 /dev/rbd/{self.pool_name}/{self.image_name}"
-        )
-        log.debug(
-            f"Creating the File system on the image: {self.image_name} using cmd command : {create_fs_cmd}"
-        )
-        cmdline(create_fs_cmd)
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            sampler.join()
 
-        # Mounting the image on /mnt/ceph-block-device
-        mount_image_cmd = f"sudo mount /dev/rbd/{self.pool_name}/{self.image_name} /mnt/ceph-block-device"
-        log.debug(
-            f"Mounting the image: {self.image_name} using cmd command : {mount_image_cmd}"
-        )
-        cmdline(create_fs_cmd)
+    def save(self):
+        """
+        Writes the results document into the results file
+        :return: None
+        """
+        if not self.persist:
+            return
+        file_name = f"results_IO_{unique_id}.json"
+        with self.lock:
+            document = {
+                "run_id": unique_id,
+                "host": socket.gethostname(),
+                "started": self.started,
+                "config": config,
+                "workloads": self.to_dict(),
+            }
+            if self.timeline:
+                document["timeline"] = list(self.timeline)
+            if self.clients:
+                document["clients"] = self.clients
+            if self.cluster:
+                document["cluster"] = {
+                    name: dict(samples, deltas=list(samples["deltas"]))
+                    for name, samples in self.cluster.items()
+                }
+            self.last_saved = time.time()
+        # written into a temporary file first, so that the results file is never left half written. Every thread
+        # has its own temporary file, as the setup steps and the pools of a workload save from parallel threads
+        tmp_name = f"{file_name}.{threading.get_ident()}.tmp"
+        with open(tmp_name, "w") as fd:
+            json.dump(document, fd, indent=2)
+        os.replace(tmp_name, file_name)
+        log.debug(f"Updated the results file : {file_name}")
 
-        # Performing a small write using rbd-bench
-        bench_cmd = f"sudo rbd bench-write {self.image_name} --pool={self.pool_name}"
-        log.debug(
-            f"Running rbd-bench the image: {self.image_name} using cmd command : {bench_cmd}"
-        )
-        cmdline(bench_cmd)
 
-        # Capturning image details :
-        details_cmd = f"rbd info {self.pool_name}/{self.image_name}"
-        log.debug(
-            f"image details for: {self.image_name} is : \n {cmdline(details_cmd)}"
-        )
+metrics = MetricsRegistry()
 
-        # collecting config specified in the JSON file
-        self.num_loops = config["RBD"]["num_loops"]
-        self.num_jobs = config["RBD"]["num_parallel_jobs"]
-        self.block_size = config["RBD"]["block_size"]
-        self.write_size = config["RBD"]["write_size"]
-        self.run_time = config["RBD"]["run_time"]
-        delete = 0 if config["RBD"]["delete_file_data"] else 1
 
-        self.gen_fio_cmd = (
-            f"sudo fio --name=global --ioengine=rbd --clientname=admin --pool={self.pool_name}"
-            f" --rbdname={self.image_name} --bs={self.block_size} --size={self.write_size}"
-            f" --direct=0 --iodepth=32 --runtime={self.run_time} --numjobs={self.num_jobs}"
-            f" --loops={self.num_loops} --cgroup_nodelete={delete} --group_reporting "
-        )
+def flatten_json(value, path=""):
+    """
+    Flattens a JSON document into its leaf values
+    :param value: parsed JSON document
+    :param path: path of the value being flattened
+    :return: generator of tuples of the path of the leaf, with the keys and list indexes separated by "/",
+        and its value. Eg : ("pools/0/stats/stored", 1024)
+    """
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        yield path, value
+        return
+    for key, item in items:
+        yield from flatten_json(item, f"{path}/{key}" if path else str(key))
 
-        log.debug(f"Base command for triggering FIO is : {self.gen_fio_cmd}")
 
-    @staticmethod
-    def complete_prereqs():
-        """
-        Completes pre-reqs of creating a mount directory and installing the FIO rpms on the node
-        :return: None
-        """
-        # cmd to install the FIO RPM on the given node for running File IO
-        output = cmdline("sudo rpm -qa")
-        if "fio" not in output:
-            cmd = "sudo yum install fio -y"
-            log.debug(f"Installing the fio rpms using the cmd {cmd}")
-            cmdline(cmd)
+class ClusterSampler:
+    """
+    Samples the cluster side metrics in the background while the workloads run.
 
-        # Creating a mount directory for mounting RBD images created
-        folder_name = f"/mnt/ceph-block-device"
-        if not os.path.isdir(folder_name):
-            cmd = "sudo mkdir /mnt/ceph-block-device"
-            log.debug(f"Creating a mount directory using the cmd {cmd}")
-            cmdline(cmd)
+    Every "cluster_sample_interval" seconds, the ceph commands below are run with JSON output and their
+    output is added to the "cluster" section of the results file, as the changes since the previous sample.
+    The time taken by the commands is reported under the workload "Cluster".
+    """
 
-        log.info(
-            "Completing the pre-reqs of installing the FIO rpm and creating the mount directory"
-        )
+    commands = {
+        "osd_perf": ["ceph", "osd", "perf", "--format", "json"],
+        "pool_stats": ["ceph", "osd", "pool", "stats", "--format", "json"],
+        "df": ["ceph", "df", "--format", "json"],
+        "status": ["ceph", "-s", "--format", "json"],
+    }
 
-    def fio_write_ops(self):
+    def __init__(self, interval):
         """
-        Method triggers sequential and Random writes on the given pool.
+        :param interval: seconds between two samples
         """
-        log.info(
-            f"Performing Random and Sequential write on the image : {self.image_name}"
-        )
-        fio_write_cmd = f"{self.gen_fio_cmd} --name=seq_write --rw=write --name=rand_write --rw=randwrite"
-        try:
-            op = cmdline(fio_write_cmd)
-            log.debug(
-                f"Performed the Write actions. \n Output collected :\n\n {op}\n\n"
-            )
-        except Exception as err:
-            log.error(f"Encountered error during fio write operations. Error : \n{err}")
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
 
-        # Capturing image details :
-        details_cmd = f"rbd info {self.pool_name}/{self.image_name}"
-        log.debug(
-            f"image details after write operations for: {self.image_name} is : \n {cmdline(details_cmd)}"
-        )
+    def sample(self):
+        """
+        Runs all the commands at the same time, and adds their output to the metrics
+        :return: False if the ceph command is not available on the host, True otherwise
+        """
+        results = run_commands(list(self.commands.values()), workload="Cluster")
+        if all(result.returncode is None for result in results):
+            log.error(
+                "ceph command is not available on the host, stopping the cluster sampler"
+            )
+            return False
+        for name, result in zip(self.commands, results):
+            if not result.ok:
+                continue
+            try:
+                values = dict(flatten_json(json.loads(result.stdout)))
+            except ValueError as err:
+                log.debug(f"Could not parse the output of {name} sample. Error : {err}")
+                continue
+            metrics.add_cluster_sample(name, values)
+        return True
 
-    def fio_read_ops(self):
+    def run(self):
         """
-        Method triggers sequential and Random reads on the given pool.
+        Takes the samples till the sampler is stopped
+        :return: None
         """
-        log.info(
-            f"Performing Random and Sequential reads on the image : {self.image_name}"
-        )
-        fio_read_cmd = f"{self.gen_fio_cmd} --name=seq_read --rw=read --name=rand_read --rw=randread"
-        try:
-            op = cmdline(fio_read_cmd)
-            log.debug(f"Performed the Read actions. \n Output collected :\n\n {op}\n\n")
-        except Exception as err:
-            log.error(f"Encountered error during fio read operations. Error : \n{err}")
+        while True:
+            started = time.time()
+            if not self.sample():
+                self.stopped.set()
+                return
+            if self.stopped.wait(max(0, self.interval - (time.time() - started))):
+                return
 
-        # Capturning image details :
-        details_cmd = f"rbd info {self.pool_name}/{self.image_name}"
-        log.debug(
-            f"image details after read operations for: {self.image_name} is : \n {cmdline(details_cmd)}"
-        )
+    def start(self):
+        """
+        Starts sampling in the background
+        :return: None
+        """
+        log.info(f"Sampling the cluster metrics every {self.interval} secs")
+        self.thread.start()
 
-    def fio_readwrite_ops(self):
+    def stop(self):
         """
-        Method triggers sequential and Random reads on the given pool.
+        Stops sampling, taking a last sample of the cluster at the end of the run
+        :return: None
         """
-        log.info(
-            f"Performing Random and Sequential reads on the image : {self.image_name}"
-        )
-        fio_read_cmd = f"{self.gen_fio_cmd} --name=seq_readwrite --rw=readwrite --name=rand_readwrite --rw=randrw"
-        try:
-            op = cmdline(fio_read_cmd)
-            log.debug(
-                f"Performed the Read & write actions. \n Output collected :\n\n {op}\n\n"
-            )
-        except Exception as err:
-            log.error(
-                f"Encountered error during fio Read/Write operations. Error : \n{err}"
-            )
+        if self.stopped.is_set():
+            return
+        self.stopped.set()
+        self.thread.join()
+        self.sample()
 
-        # Capturning image details :
-        details_cmd = f"rbd info {self.pool_name}/{self.image_name}"
-        log.debug(
-            f"image details after read/write operations for: {self.image_name} is : \n {cmdline(details_cmd)}"
+
+def prometheus_labels(**labels):
+    """
+    Formats the labels of a Prometheus sample
+    :param labels: label names and values
+    :return: labels in the Prometheus text format. Eg : {workload="RGW",op="put"}
+    """
+    escaped = []
+    for name, value in labels.items():
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
         )
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
 
 
-class SmallFileTools:
+def format_prometheus_metrics():
     """
-    Class containing all the methods required for running IO from small files.
+    Formats the live metrics of the run in the Prometheus text exposition format.
+
+    The operations timed by the script are exported as counters of ops, errors and bytes along with a latency
+    histogram, per workload, phase and operation. The latest interval metrics of every workload, including the
+    ones parsed from the progress of rados bench and fio, are exported as gauges
+    :return: metrics as text
     """
+    bounds = MetricsExporter.latency_buckets
+    lines = [
+        "# HELP instant_io_run_info Run of instant-io being served",
+        "# TYPE instant_io_run_info gauge",
+        f"instant_io_run_info{prometheus_labels(run_id=unique_id, host=socket.gethostname())} 1",
+    ]
+    counters = {"ops": [], "errors": [], "bytes": []}
+    latency = []
+    for workload, phases in sorted(metrics.live_stats().items()):
+        for phase, ops in phases.items():
+            for op, stats in ops.items():
+                labels = dict(workload=workload, phase=phase, op=op)
+                for name, samples in counters.items():
+                    samples.append(
+                        f"instant_io_{name}_total{prometheus_labels(**labels)} {stats[name]}"
+                    )
+                hist = LatencyHistogram.from_dict(stats["histogram"])
+                for bound, bucket_count in zip(bounds, hist.cumulative_counts(bounds)):
+                    latency.append(
+                        f"instant_io_latency_seconds_bucket{prometheus_labels(**labels, le=bound)} {bucket_count}"
+                    )
+                latency.append(
+                    f"instant_io_latency_seconds_bucket{prometheus_labels(**labels, le='+Inf')} {hist.count}"
+                )
+                latency.append(
+                    f"instant_io_latency_seconds_sum{prometheus_labels(**labels)} {hist.total / 1e6}"
+                )
+                latency.append(
+                    f"instant_io_latency_seconds_count{prometheus_labels(**labels)} {hist.count}"
+                )
+    helps = {
+        "ops": "Operations completed",
+        "errors": "Operations failed",
+        "bytes": "Bytes moved by the operations",
+    }
+    for name, samples in counters.items():
+        lines.append(f"# HELP instant_io_{name}_total {helps[name]}")
+        lines.append(f"# TYPE instant_io_{name}_total counter")
+        lines.extend(samples)
+    lines.append("# HELP instant_io_latency_seconds Latency of the operations")
+    lines.append("# TYPE instant_io_latency_seconds histogram")
+    lines.extend(latency)
 
-    def __init__(self):
-        """
-        Initializes the class objects by creating
-        1. Checking if cephfs_data and cephfs_metadata pools are present
-        2. Creating a mount point for file IO to be run
-        3. Mounting the share using client admin keyring
-        """
-        # 1. Checking if cephfs_data and cephfs_metadata pools are present
-        op = cmdline("ceph osd lspools")
-        log.debug(f"the op of all the pools are : \n{op}")
-        if "cephfs_data" not in op and "cephfs_metadata" not in op:
-            pool_create_cmd = (
-                f"sudo ceph osd pool create cephfs_data 64 64;"
-                f"sudo ceph osd pool create cephfs_metadata 64 64"
-            )
-            log.debug(
-                f"Creating pool for ceph file using the command : {pool_create_cmd}"
-            )
-            cmdline(pool_create_cmd)
-            enable_app_cmd = (
-                f"sudo ceph osd pool application enable cephfs_data cephfs;"
-                f"sudo ceph osd pool application enable cephfs_metadata cephfs"
-            )
-            log.debug(
-                f"Enabling rbd application on pool using the command : {enable_app_cmd}"
+    with metrics.lock:
+        intervals = list(metrics.last_intervals.values())
+    for name, unit in (
+        ("ops_per_sec", "operations per second"),
+        ("mb_per_sec", "MB per second"),
+    ):
+        lines.append(f"# HELP instant_io_interval_{name} {unit} in the latest interval")
+        lines.append(f"# TYPE instant_io_interval_{name} gauge")
+        for row in intervals:
+            labels = prometheus_labels(
+                workload=row["workload"], phase=row["phase"], op=row["op"]
             )
-            cmdline(enable_app_cmd)
+            lines.append(f"instant_io_interval_{name}{labels} {row.get(name, 0)}")
+    return "\n".join(lines) + "\n"
 
-        # 2. Creating a mount point for file IO to be run
-        self.mnt_pnt = "/mnt/mycephfs"
-        if not os.path.isdir(self.mnt_pnt):
-            cmdline("mkdir /mnt/mycephfs")
 
-        # 3. Mounting the share using client admin keyring if not already mounted
-        op = cmdline("mount -l | grep ceph")
-        log.debug(f"O/P of the mount command : {op}")
-        if "/mnt/mycephfs type ceph" not in op:
-            cmd = r"mount -t ceph :/ /mnt/mycephfs -o name=admin"
-            cmdline(cmd)
+class MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves the live metrics on the /metrics path
+    """
 
-    @staticmethod
-    def complete_prereqs():
+    def do_GET(self):
         """
-        checks the pre-reqs by :
-        1. presence MDS daemon. ( atleast 1 active )
-        2. Presence of admin keyring in client node at /etc/ceph
-        3. Smallfile repo successfully cloned and ready to be used.
-        4. checking IS MOUNT HELPER IS PRESENT?
-        :return: Returns 1 if every pre-req is satisfied, otherwise returns 0 for fail
+        Responds with the metrics in the Prometheus text format
+        :return: None
         """
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = format_prometheus_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
-        # 1 checking if MDS daemon is up and active
-        op = cmdline(command="ceph mds stat")
-        log.debug(f"O/P of command ceph mds stat is : {op}")
-        if "up:active" not in op:
-            log.error(
-                f"No up and active MDS server was found to be running on the cluster. Unable to trigger FIO"
-            )
-            return 0
-        log.debug("At least 1 MDS daemon is up and active")
+    def log_message(self, format, *args):
+        """
+        Sends the access log of the scrapes to the debug log instead of stderr
+        """
+        log.debug(f"metrics exporter : {self.address_string()} : {format % args}")
 
-        # 2. checking presence of admin keyring
-        if not os.path.isfile("/etc/ceph/ceph.client.admin.keyring"):
-            log.error(
-                f"No Admin keyring was found on the client node. Won't be able to "
-            )
-            return 0
-        log.debug("Admin Keyring is present in the client node")
 
-        # 3. Smallfile repo successfully cloned and ready to be used.
-        op = cmdline(command="python smallfile/smallfile_cli.py --help")
-        log.debug(f"ottput of the smallfile help cli is {op}")
-        if "usage: smallfile_cli.py" not in op:
-            log.error("failed to execute smallfile_cli.py --help... Exiting")
-            return 0
+class MetricsExporter:
+    """
+    Optional HTTP endpoint serving the live metrics of the run for Prometheus, enabled by the "metrics_port"
+    param of the Scheduler section. The server runs in a background thread for the whole run
+    """
 
-        # 4. checking IS MOUNT HELPER IS PRESENT?
-        op = cmdline("stat /sbin/mount.ceph")
-        log.debug(f"the op of mount helper is: \n{op}")
-        if "/sbin/mount.ceph" not in op:
-            log.error("Mount helper not present in the client node. Exiting..")
-            return 0
+    # upper bounds of the exported latency histogram buckets, in seconds
+    latency_buckets = (
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+    )
 
-        log.info(
-            f"All pre-req checks for small files for running CephFile IO completed successfully"
-        )
-        return 1
+    def __init__(self, port):
+        """
+        Binds the HTTP server on the given port, on all the interfaces
+        :param port: port to serve the metrics on
+        """
+        self.server = http.server.ThreadingHTTPServer(("", port), MetricsRequestHandler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
 
-    def run_file_write_ops(self):
+    def start(self):
         """
-        Method to trigger the write operations for the Ceph file system
+        Starts serving the metrics
         :return: None
         """
-        threads = config["CephFS"]["num_threads"]
-        files = config["CephFS"]["num_files"]
-        fsize = config["CephFS"]["file_size"]
-        create_cmd = (
-            f"python smallfile/smallfile_cli.py --operation create --threads {threads} "
-            f"--file-size {fsize} --files {files} --top {self.mnt_pnt} --prefix {unique_id}"
-            f" --verify-read Y --response-times Y"
+        self.thread.start()
+        log.info(
+            f"Serving the live metrics on http://{socket.gethostname()}:{self.server.server_port}/metrics"
         )
-        try:
-            op = cmdline(create_cmd)
-            log.debug(f"The o/p of the file write ops is : {op}")
-        except Exception as err:
-            log.error(f"The error collected from file IO write is {err}")
 
-    def run_file_read_ops(self):
+    def stop(self):
         """
-        Method to trigger the read operations for the Ceph file system
+        Stops serving the metrics
         :return: None
         """
+        self.server.shutdown()
+        self.server.server_close()
 
-        #  python smallfile_cli.py --operation read --top /mnt/mycephfs/ --prefix test1
-        read_cmd = (
-            f"python smallfile/smallfile_cli.py --operation read"
-            f" --top {self.mnt_pnt} --prefix {unique_id}"
-        )
-        try:
-            op = cmdline(read_cmd)
-            log.debug(f"The o/p of the file read ops is : {op}")
-        except Exception as err:
-            log.error(f"The error collected from file IO read is {err}")
+
+def flatten_metrics(tree, path=()):
+    """
+    Flattens the metrics of a results document, skipping the raw histograms
+    :param tree: dictionary of workload -> phase -> operation -> metrics
+    :param path: path of the tree being flattened
+    :return: generator of tuples of the path of the metric and its value
+    """
+    for name, value in tree.items():
+        if name == "histogram":
+            continue
+        if isinstance(value, dict):
+            yield from flatten_metrics(value, path + (name,))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path + (name,), value
 
 
-def run_rgw_io():
+def metric_direction(path):
     """
-    Creates object of class RgwIoTools and runs IO
-    :return: None
+    Classifies the metric as throughput ( higher is better ) or latency ( lower is better )
+    :param path: path of the metric in the results document
+    :return: 1 for throughput metrics, -1 for latency metrics, 0 for the metrics that are not compared
     """
-    con = f"1. Create a RGW admin user with the keys : {config['RGW']['create_rgw_user']}\n"
-    con1 = (
-        f"4. The Secret Key provided is :{config['RGW']['secret_key']}\n"
-        f"5. The access Key provided is :{config['RGW']['access_key']}\n"
-    )
-    con2 = (
-        f"2. Number of buckets being created : {config['RGW']['num_buckets']}\n"
-        f"3. Number of objects in each bucket: {config['RGW']['num_objects']}\n"
+    if any("latency" in part or "lat_" in part for part in path):
+        return -1
+    if path[-1] in ("ops_per_sec", "mb_per_sec", "files_per_sec", "iops", "bw_mb"):
+        return 1
+    return 0
+
+
+def is_admin_metric(path):
+    """
+    Tells if the metric times the admin work done around the workload, rather than its IO.
+    Eg : the commands run ( operations "cmd ..." ), and the setup and teardown of its resources
+    :param path: path of the metric in the results document
+    :return: True for the admin metrics
+    """
+    return len(path) > 2 and (
+        path[1] in ("setup", "teardown") or path[2].startswith("cmd ")
     )
-    con3 = f"6. Downloading the objects and placing them in folder : object_downloads_{unique_id} "
+
+
+def compare_runs(result_files, threshold):
+    """
+    Compares the results of the runs against the first run given, flagging throughput drops and
+    latency increases beyond the threshold. The throughput and latency metrics of the baseline missing from a
+    run, as when a workload or an operation failed, are flagged too. The admin timings are reported separately,
+    without a verdict
+    :param result_files: paths of the results files. The first file is the baseline
+    :param threshold: allowed change in percentage
+    :return: list of regressions found, as tuples of the run ID, metric path, baseline value, value and change.
+        The value and the change are None for the missing metrics
+    """
+    runs = []
+    for file_name in result_files:
+        with open(file_name, "r") as fd:
+            runs.append(json.load(fd))
+    baseline = dict(flatten_metrics(runs[0]["workloads"]))
     log.info(
-        f"\n\nTriggering  RGW IO using BOTO tool with the below config :\n {con}{con2}"
+        f"Comparing runs {[run['run_id'] for run in runs[1:]]} against baseline run {runs[0]['run_id']}"
+        f" with a threshold of {threshold}%"
     )
-    if config["RGW"]["create_rgw_user"]:
-        log.info(con1)
-    if config["RGW"]["download_objects"]:
-        log.info(con3)
+    regressions = []
+    admin = []
+    for run in runs[1:]:
+        values = dict(flatten_metrics(run["workloads"]))
+        for path, base in baseline.items():
+            if path in values or not metric_direction(path) or is_admin_metric(path):
+                continue
+            regressions.append((run["run_id"], "/".join(path), base, None, None))
+            log.info(
+                f"{run['run_id']} : {'/'.join(path)} : {base} -> missing REGRESSION"
+            )
+        for path, value in values.items():
+            direction = metric_direction(path)
+            base = baseline.get(path)
+            if not direction or not base:
+                continue
+            change = (value - base) * 100 / base
+            if is_admin_metric(path):
+                admin.append((run["run_id"], "/".join(path), base, value, change))
+                continue
+            flag = ""
+            if -change * direction > threshold:
+                flag = "REGRESSION"
+                regressions.append((run["run_id"], "/".join(path), base, value, change))
+            log.info(
+                f"{run['run_id']} : {'/'.join(path)} : {base} -> {value} ({change:+.2f}%) {flag}"
+            )
+    if admin:
+        log.info(
+            "Admin command and setup / teardown timings, not counted as regressions :"
+        )
+    for run_id, path, base, value, change in admin:
+        log.info(f"{run_id} : {path} : {base} -> {value} ({change:+.2f}%)")
+    log.info(f"Found {len(regressions)} regression(s) beyond {threshold}%")
+    for run_id, path, base, value, change in regressions:
+        if value is None:
+            log.error(f"Regression in run {run_id} : {path} : {base} -> missing")
+            continue
+        log.error(
+            f"Regression in run {run_id} : {path} : {base} -> {value} ({change:+.2f}%)"
+        )
+    return regressions
 
-    rgw_obj = RgwIoTools()
-    # Creating no of buckets specified in the config
-    if config["RGW"]["create_bkt_obj"]:
-        log.debug("Creating new buckets")
-        rgw_obj.create_buckets(quantity=config["RGW"]["num_buckets"])
 
-    # Listing all the Newly created buckets
-    dict_buckets = rgw_obj.list_buckets()
-    bucket_list = [keys for keys in dict_buckets.keys()]
-    log.debug(
-        f"all the buckets Present for the given User are are : {str(bucket_list)}"
+def parse_size(value):
+    """
+    Converts the given size into bytes.
+    :param value: size as an int, or as a string with an optional binary unit suffix. Eg : 512, "4k", "1m", "64MiB"
+    :return: size in bytes
+    """
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(
+        r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*", str(value).lower()
     )
+    if not match:
+        raise ValueError(f"Invalid size provided : {value}")
+    multiplier = 1024 ** "_kmgt".index(match.group(2) or "_")
+    return int(float(match.group(1)) * multiplier)
 
-    if config["RGW"]["create_bkt_obj"]:
-        # creating objects in each bucket as provided in the config file
-        user_val = config["RGW"]["avoid_user_created_bkts"]
-        if user_val:
-            if user_val.upper() == "ALL":
-                bucket_li = [bkt for bkt in bucket_list if unique_id in bkt]
-            else:
-                ignore_list = [bkt.strip() for bkt in user_val.split(",")]
-                bucket_li = [bkt for bkt in bucket_list if bkt not in ignore_list]
-            log.debug(
-                f"The list of buckets after removing the user provided exclude list is :\n{bucket_li}"
+
+class ObjectSizeDistribution:
+    """
+    Picks the sizes of the objects being written as per the "object_size" spec.
+
+    Supported specs :
+    1. fixed size. Eg : 4096 or "4k"
+    2. uniform range. Eg : "4k-1m"
+    3. weighted histogram of fixed sizes or ranges. Eg : "70% 4k, 25% 1m, 5% 64m"
+    """
+
+    def __init__(self, spec):
+        """
+        Parses the given spec into a list of weighted size ranges
+        :param spec: object size spec as described in the class doc
+        """
+        self.spec = spec
+        self.ranges = []
+        self.weights = []
+        for entry in str(spec).split(","):
+            weight, _, size = entry.strip().rpartition(" ")
+            low, _, high = size.partition("-")
+            self.ranges.append((parse_size(low), parse_size(high or low)))
+            self.weights.append(float(weight.strip().rstrip("%") or 100))
+        self.max_size = max(high for _, high in self.ranges)
+        self.rand = random.Random()
+
+    def sample(self):
+        """
+        Picks the size of the next object
+        :return: size in bytes
+        """
+        low, high = self.rand.choices(self.ranges, weights=self.weights)[0]
+        return self.rand.randint(low, high)
+
+
+class KeyDistribution:
+    """
+    Picks the keys of the working set accessed by the mixed workload, as per the "key_distribution" spec.
+
+    Supported distributions :
+    1. uniform -> every key is equally likely to be picked
+    2. zipfian -> the key of rank n is picked with a probability proportional to 1 / n ^ "zipf_exponent",
+       so that a few keys get most of the requests
+    3. hotspot -> "hot_ops_percent" of the requests go to the first "hot_keys_percent" of the keys
+    """
+
+    def __init__(
+        self,
+        size,
+        distribution="uniform",
+        zipf_exponent=0.99,
+        hot_keys_percent=20,
+        hot_ops_percent=80,
+    ):
+        """
+        Prepares the distribution over the keys of the working set
+        :param size: no of keys in the working set
+        :param distribution: name of the distribution as described in the class doc
+        :param zipf_exponent: skew of the zipfian distribution. Higher values concentrate the requests on fewer keys
+        :param hot_keys_percent: percentage of the keys that are hot, for the hotspot distribution
+        :param hot_ops_percent: percentage of the requests that go to the hot keys, for the hotspot distribution
+        """
+        self.size = int(size)
+        self.distribution = distribution
+        self.rand = random.Random()
+        if distribution == "zipfian":
+            # cumulative weights of the ranks, searched with a random point for every pick
+            self.cdf = array.array(
+                "d",
+                itertools.accumulate(
+                    1 / rank**zipf_exponent for rank in range(1, self.size + 1)
+                ),
             )
-            for bkt in bucket_li:
-                obj = rgw_obj.create_bucket_object(
-                    bucket=bkt, quantity=config["RGW"]["num_objects"]
-                )
-                log.debug(f"all the objects created : {str(obj)}")
+        elif distribution == "hotspot":
+            self.hot_keys = max(1, int(self.size * hot_keys_percent / 100))
+            self.hot_ops = hot_ops_percent / 100
+        elif distribution != "uniform":
+            raise ValueError(f"Invalid key distribution provided : {distribution}")
+
+    def sample(self):
+        """
+        Picks the next key
+        :return: index of the key in the working set
+        """
+        if self.distribution == "zipfian":
+            return bisect.bisect(self.cdf, self.rand.random() * self.cdf[-1])
+        if self.distribution == "hotspot":
+            if self.hot_keys < self.size and self.rand.random() >= self.hot_ops:
+                return self.rand.randrange(self.hot_keys, self.size)
+            return self.rand.randrange(self.hot_keys)
+        return self.rand.randrange(self.size)
+
+
+class PayloadGenerator:
+    """
+    Hands out object payloads as memoryview slices of one pre-allocated buffer.
+
+    The buffer is filled only once, so that the payloads of large objects are never built with per object
+    allocations. Slices start at a random offset, so that consecutive objects do not carry the same data
+    """
+
+    # extra room in the buffer, over the largest object size, for picking random offsets
+    offset_window = 1 << 20
+
+    def __init__(self, max_size, compressible=False):
+        """
+        Allocates and fills the buffer
+        :param max_size: size of the largest payload to be generated
+        :param compressible: If true, the data is generated such that it compresses roughly 2:1,
+            otherwise incompressible random data is generated
+        """
+        self.max_size = max_size
+        size = max_size + self.offset_window
+        if compressible:
+            # every 4k block carries 2k of random data followed by 2k of zeros
+            block = 4096
+            self.buffer = bytearray(size + block)
+            for offset in range(0, size, block):
+                self.buffer[offset : offset + block // 2] = os.urandom(block // 2)
         else:
-            for bkt in bucket_list:
-                obj = rgw_obj.create_bucket_object(
-                    bucket=bkt, quantity=config["RGW"]["num_objects"]
-                )
-                log.debug(f"all the objects created : {str(obj)}")
+            self.buffer = bytearray(os.urandom(size))
+        self.view = memoryview(self.buffer)
+        self.rand = random.Random()
 
-    # Listing the contents of a single bucket
-    bkt_content_single = rgw_obj.list_bucket_content(bucket=bucket_list[0])
-    log.debug(
-        f"\n\n\n the contents of single bucket {bucket_list[0]} are \n {bkt_content_single}\n\n"
-    )
+    def get(self, size):
+        """
+        Returns a payload of the given size
+        :param size: size of the payload in bytes
+        :return: read only memoryview of the payload
+        """
+        if size > self.max_size:
+            raise ValueError(
+                f"Payload size {size} is larger than the generator size {self.max_size}"
+            )
+        offset = self.rand.randrange(self.offset_window)
+        return self.view[offset : offset + size].toreadonly()
 
-    # Listing contents of all the buckets created
-    bkt_content_all = rgw_obj.list_bucket_content()
-    log.debug(f"\n\n\n the contents all buckets are  \n {bkt_content_all}\n\n")
 
-    # Downloading the objects created and placing them in the folder
-    # bucket_name = bucket_list[0]
-    # bkt_content_single = rgw_obj.list_bucket_content(bucket=bucket_name)
-    # Selecting the 1st object from the bucket to be deleted
-    # single_key = bkt_content_single[bucket_name][0].name
+class MemoryViewReader:
+    """
+    File like reader over a memoryview, used to upload the payloads with BOTO without copying them.
+    The chunks read are memoryview slices of the payload, which http.client sends to the socket as they are
+    """
 
-    # command for downloading 1 the object in the given bucket with the key provided
-    # rgw_obj.download_boto_objects(bucket=bucket_name, key=single_key)
+    def __init__(self, view):
+        """
+        :param view: memoryview of the data to be read
+        """
+        self.view = view
+        self.position = 0
 
-    # downloading all the objects in all the buckets
-    if config["RGW"]["download_objects"]:
-        for names in bucket_list:
-            log.info(f"Downloading objects for bucket : {names}")
-            rgw_obj.download_boto_objects(bucket=names)
-            all_uri = rgw_obj.generate_boto_obj_url(bucket=names)
-            log.debug(f"The URL's generated for bucket {names} are :\n{str(all_uri)}\n")
+    def read(self, size=-1):
+        """
+        Reads the next chunk of data
+        :param size: number of bytes to be read, -1 reads till the end
+        :return: memoryview of the bytes read
+        """
+        end = len(self.view) if size < 0 else min(len(self.view), self.position + size)
+        chunk = self.view[self.position : end]
+        self.position = end
+        return chunk
 
-    # Selecting a single key and deleting a single object by providing object key and the bucket name
-    # bucket_name = li[0]
-    # Selecting the 1st object from the bucket to be deleted
-    # single_key = bkt_content_single[bucket_name][0].name
-    # rgw_obj.delete_boto_object(bucket=bucket_name, key=single_key)
-    # bkt_content_single = rgw_obj.list_bucket_content(bucket=li[0])
-    # log.debug(f"contents of bucket after deleting a single key {single_key} is given below\n{bkt_content_single}")
+    def seek(self, offset, whence=os.SEEK_SET):
+        """
+        Moves the read position
+        :param offset: offset to move to
+        :param whence: reference point of the offset
+        :return: new read position
+        """
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self.position, os.SEEK_END: len(self.view)}
+        self.position = base[whence] + offset
+        return self.position
 
-    # deleting all the objects and the buckets created
-    if config["RGW"]["delete_buckets_and_objects"]:
-        # deleting buckets and objects only if they have been created by the script, other wise leaving them intact.
-        bucket_list = [bkt for bkt in bucket_list if unique_id in bkt]
-        for bucket in bucket_list:
-            rgw_obj.delete_boto_bucket(bucket)
-        list_buckets = rgw_obj.list_buckets()
+    def tell(self):
+        """
+        :return: current read position
+        """
+        return self.position
+
+
+@functools.cache
+def get_rgw_keys():
+    """
+    Collects the access key and secret key of the RGW admin user used for IO.
+
+    When "create_rgw_user" is set, a new radosgw admin user is created with keys derived from the run ID,
+    otherwise the keys provided in the config file are used. The keys are collected once per process, so that
+    the workload run again and again ( Eg : by the steps of a soak run ) reuses the user created by the first run
+    :return: tuple of access key and secret key
+    """
+    if config["RGW"]["create_rgw_user"]:
         log.debug(
-            f"\n\n\nAfter deleting all the buckets {str(list_buckets.keys())}\n\n\n"
+            "User creation is set to true, creating a radosgw admin user with keys"
         )
-    log.info("Finished Running RGW IO using BOTO tool")
+        user = f"operator_{unique_id}"
+        disp_name = f"s3 {user}"
+        email = f"{user}@example.com"
+        access_key = unique_id
+        secret_key = f"{unique_id}0000"
 
+        run_command(
+            [
+                "radosgw-admin",
+                "user",
+                "create",
+                f"--uid={user}",
+                f"--display-name={disp_name}",
+                f"--email={email}",
+                f"--access_key={access_key}",
+                f"--secret={secret_key}",
+            ],
+            workload="RGW",
+            check=True,
+        )
+        log.info(f"admin user for RGW : {user} created successfully")
+        return access_key, secret_key
 
-def run_rados_io():
+    log.debug(
+        "User creation is set to false, creating a radosgw admin user provided with keys"
+    )
+    return config["RGW"]["access_key"], config["RGW"]["secret_key"]
+
+
+def get_payload_generator():
     """
-    Creates object of class RadosIoTools and runs IO
-    :return: None
+    Creates the object size distribution and the payload generator as per the RGW section of the config file
+    :return: tuple of ObjectSizeDistribution and PayloadGenerator objects
     """
-    log.info(
-        f"Option present to run Rados bench on the given Host with config :\n\n {config['Rados_Bench']}\n\n"
+    object_sizes = ObjectSizeDistribution(config["RGW"].get("object_size", "4k"))
+    compressible = config["RGW"].get("payload_data", "random") == "compressible"
+    log.debug(
+        f"Generating payloads for object size spec : {object_sizes.spec}, compressible : {compressible}"
     )
-    block_size = config["Rados_Bench"]["Size"]
-    dur_write = config["Rados_Bench"]["write_seconds"]
-    dur_read = config["Rados_Bench"]["write_seconds"]
+    return object_sizes, PayloadGenerator(object_sizes.max_size, compressible)
 
-    for i in range(config["Rados_Bench"]["no_pools"]):
-        name = RadosIoTools()
-        name.bench_write_ops(bsize=block_size, duration=dur_write)
-        name.bench_read_ops(duration=dur_read)
 
-        # Deleting the benckmark objects created
-        if config["Rados_Bench"]["delete_bench_data"]:
-            name.bench_cleanup()
+# S3 accepts at most 1000 keys in a single multi-object delete request
+S3_MAX_DELETE_KEYS = 1000
+# S3 accepts parts of 5 MiB to 5 GiB in a multipart upload, except for the last part which may be smaller
+S3_MIN_PART_SIZE = 5 * 2**20
+S3_MAX_PART_SIZE = 5 * 2**30
+# Size of the chunks in which the objects are read while downloading
+DOWNLOAD_CHUNK_SIZE = 2**20
 
 
-def run_block_io():
+def get_multipart_config():
     """
-    Creates object of class RbdFioTools and runs IO
-    :return: None
+    Reads the multipart upload params of the RGW section of the config file
+    :return: tuple of the multipart threshold, the part size and the number of parts of an object moved in parallel
+    :raises ValueError: when the part size is out of the range accepted by S3
     """
-    log.info(
-        f"Option present to run FIO on the given Host with config :\n\n {config['RBD']}\n\n"
-    )
-    RbdFioTools.complete_prereqs()
-    rbd_obj = RbdFioTools()
-    rbd_obj.fio_write_ops()
-    rbd_obj.fio_read_ops()
-    rbd_obj.fio_readwrite_ops()
+    threshold = parse_size(config["RGW"].get("multipart_threshold", "64m"))
+    part_size = parse_size(config["RGW"].get("part_size", "16m"))
+    if not S3_MIN_PART_SIZE <= part_size <= S3_MAX_PART_SIZE:
+        raise ValueError(
+            f"Invalid part_size provided : {config['RGW'].get('part_size')}. S3 accepts parts of 5 MiB to 5 GiB"
+        )
+    return threshold, part_size, int(config["RGW"].get("part_concurrency", 4))
 
 
-def run_file_io():
+class BucketKey:
     """
-    Creates object of class SmallFileTools and runs IO
-    :return: None
+    Compact record of a single object returned by the bucket listing.
+    Uses slots instead of the boto key objects, as millions of them are streamed through for large buckets
     """
-    if not os.path.isdir("smallfile"):
-        cmdline(
-            command="git clone https://github.com/distributed-system-analysis/smallfile.git"
-        )
-    if not SmallFileTools.complete_prereqs():
-        log.error("Some pre-reqs for running smallfile IO not completed. Exiting.")
-        return
-    file_obj = SmallFileTools()
-    file_obj.run_file_write_ops()
-    file_obj.run_file_read_ops()
 
+    __slots__ = ("bucket", "name", "size", "modified")
+
+    def __init__(self, bucket, name, size, modified):
+        self.bucket = bucket
+        self.name = name
+        self.size = size
+        self.modified = modified
+
+    def __repr__(self):
+        return f"BucketKey({self.bucket}/{self.name}, size={self.size}, modified={self.modified})"
+
+
+class ConcurrencyGate:
+    """
+    Limits the number of workers of a pool that are active, so that the concurrency can be changed while the
+    workers run. The workers with an index at or above the limit wait till the limit is raised
+    """
+
+    def __init__(self, active):
+        """
+        :param active: number of workers allowed to run
+        """
+        self.active = active
+        self.cond = threading.Condition()
+
+    def set(self, active):
+        """
+        Changes the number of workers allowed to run
+        :param active: number of workers allowed to run
+        :return: None
+        """
+        with self.cond:
+            self.active = active
+            self.cond.notify_all()
+
+    def wait(self, index, stop):
+        """
+        Waits till the worker is allowed to run
+        :param index: index of the worker
+        :param stop: event set when the workers are being stopped
+        :return: False if the workers were stopped while waiting, True otherwise
+        """
+        with self.cond:
+            while index >= self.active and not stop.is_set():
+                self.cond.wait(0.5)
+        return not stop.is_set()
+
+
+class RgwIoTools:
+    """
+    This class implements the methods required to trigger the Object IO for RGW
+    """
+
+    def __init__(self):
+        """
+        Initializing the connection for the objects
+        """
+        # self.host = collect_hostname()
+        self.host = config["RGW"]["rgw_host"]
+        self.port = int(config["RGW"].get("rgw_port", 80))
+        self.access_key, self.secret_key = get_rgw_keys()
+
+        # Number of worker threads issuing requests in parallel. Each worker borrows its own
+        # connection from the pool, as boto connections are not safe to share between threads
+        self.concurrency = int(config["RGW"].get("rgw_concurrency", 1))
+        self.conn_pool = queue.LifoQueue()
+        self.conn = self.new_connection()
+        self.object_sizes, self.payloads = get_payload_generator()
+        # Objects at or above the threshold are moved with multipart uploads and ranged GETs,
+        # with "part_concurrency" parts of each object in flight at a time
+        (
+            self.multipart_threshold,
+            self.part_size,
+            self.part_concurrency,
+        ) = get_multipart_config()
+        # Number of keys fetched in a single listing request
+        self.list_page_size = int(config["RGW"].get("list_page_size", 1000))
+        # Downloads are either written into files, or read and discarded so that reads are not limited by the disk
+        self.download_mode = config["RGW"].get("download_mode", "file")
+        self.download_concurrency = int(
+            config["RGW"].get("download_concurrency", self.concurrency)
+        )
+        log.debug(
+            "successfully created a connection with the Host for IO using BOTO tool"
+        )
+
+    def new_connection(self):
+        """
+        Creates a new S3 connection with the RGW host using the keys of the admin user
+        :return: boto S3 connection object
+        """
+        try:
+            return boto.connect_s3(
+                aws_access_key_id=self.access_key,
+                aws_secret_access_key=self.secret_key,
+                host=self.host,
+                port=self.port,
+                is_secure=False,  # comment if you are using ssl
+                calling_format=boto.s3.connection.OrdinaryCallingFormat(),
+            )
+        except AttributeError as err:
+            log.error(
+                f"Please enter the access key and Secret key as string. Error message : {err}"
+            )
+        except Exception as err:
+            log.error(
+                f"An exception occurred during connecting with S3 . Error message : {err}"
+            )
+
+    @contextlib.contextmanager
+    def pooled_connection(self):
+        """
+        Borrows a connection from the connection pool, creating a new one if none are free.
+        The connection is returned to the pool once the caller is done with it.
+        :return: boto S3 connection object
+        """
+        try:
+            conn = self.conn_pool.get_nowait()
+        except queue.Empty:
+            log.debug("No free connection present in the pool, creating a new one")
+            conn = self.new_connection()
+        try:
+            yield conn
+        finally:
+            self.conn_pool.put(conn)
+
+    def list_buckets(self):
+        """
+        lists all the buckets created by the given user
+        :return: dictionary of all the buckets with the timestamp
+        """
+        bucket_dictionary = {}
+        log.debug("listing all the buckets on the host")
+        with metrics.timer("RGW", "list_buckets"):
+            all_buckets = self.conn.get_all_buckets()
+        for bucket in all_buckets:
+            log.info(f"{bucket.name}\t{bucket.creation_date}")
+            bucket_dictionary[bucket.name] = bucket.creation_date
+        log.debug(f"all the buckets on the host are : {str(bucket_dictionary)}")
+        return bucket_dictionary
+
+    def create_buckets(self, quantity):
+        """
+        Creates the buckets as many as specified in the
+        :param quantity: no of buckets to be created
+        :return: Returns the list of buckets created
+        """
+        buckets_list = []
+        log.debug("creating buckets for RGW IO")
+        for no in range(int(quantity)):
+            name = f"my-bucket-{unique_id}-no-{no}"
+            log.debug(f"creating bucket : {name}")
+            try:
+                with metrics.timer("RGW", "create_bucket"):
+                    bucket = self.conn.create_bucket(name)
+                buckets_list.append(bucket.name)
+            except Exception as err:
+                log.error(
+                    f"An error occurred when creating the bucket {name}. Error message : \n {err}"
+                )
+        log.debug(f"all the buckets created are : {str(buckets_list)}")
+        return buckets_list
+
+    def iter_bucket_keys(self, bucket, page_size=None, conn=None):
+        """
+        Streams the keys of the bucket, fetching one page of "list_page_size" keys at a time.
+        Every page request continues from the marker of the last key seen, so only a single page is held in memory
+        :param bucket: Name of the bucket whose contents need to be listed.
+        :param page_size: no of keys fetched per listing request. Defaults to "list_page_size"
+        :param conn: connection used for the listing. Defaults to the connection of the object
+        :return: generator of BucketKey records
+        """
+        page_size = page_size or self.list_page_size
+        bucket = (conn or self.conn).get_bucket(bucket, validate=False)
+        marker = ""
+        while True:
+            with metrics.timer("RGW", "list"):
+                page = bucket.get_all_keys(marker=marker, max_keys=page_size)
+            for key in page:
+                log.debug(
+                    f"bucket : {bucket.name}\t{key.name}\t{key.size}\t{key.last_modified}"
+                )
+                yield BucketKey(bucket.name, key.name, key.size, key.last_modified)
+            if not page.is_truncated or not len(page):
+                return
+            marker = page[-1].name
+
+    def list_bucket_content(self, bucket=None):
+        """
+        Lists the content of the bucket.
+
+        When a bucket name is provided, streams the contents of that particular bucket,
+        else streams the contents of all the buckets created by the particular user
+        :param bucket: Name of the bucket whose contents need to be listed.
+        :return: generator of BucketKey records
+        """
+        log.debug("Listing the objects inside the specified bucket(s)")
+        if bucket:
+            log.debug(f"Indivudial bucket name given. Bucket {bucket}")
+            yield from self.iter_bucket_keys(bucket)
+        else:
+            log.debug("listing contents of all the buckets created by user")
+            with metrics.timer("RGW", "list_buckets"):
+                all_buckets = self.conn.get_all_buckets()
+            for bucket in all_buckets:
+                yield from self.iter_bucket_keys(bucket.name)
+
+    def put_object(self, bucket, ukey):
+        """
+        Writes a single object into the given bucket using a connection from the pool
+        :param bucket: name of the bucket where the object needs to be created
+        :param ukey: key of the object to be created
+        :return: key of the object created
+        """
+        payload = self.payloads.get(self.object_sizes.sample())
+        with metrics.timer("RGW", "put", nbytes=len(payload)):
+            if len(payload) >= self.multipart_threshold:
+                return self.multipart_upload(bucket, ukey, payload)
+            with self.pooled_connection() as conn:
+                self.send_payload(conn, bucket, ukey, payload)
+        return ukey
+
+    @staticmethod
+    def send_payload(conn, bucket, ukey, payload, query_args=None):
+        """
+        Sends the payload with a single PUT request, streaming it to the socket from a MemoryViewReader.
+
+        boto.s3.key.Key.send_file converts every chunk it reads into bytes, so the request is made directly
+        on the connection. The MD5 is sent along, so that the data is still verified by the RGW host
+        :param conn: boto S3 connection used for the request
+        :param bucket: name of the bucket where the object is being written
+        :param ukey: key of the object
+        :param payload: memoryview of the data to be written
+        :param query_args: query string of the request. Eg : the part number and upload ID of a part
+        :return: etag of the object or part written
+        """
+        headers = {
+            "Content-Length": str(len(payload)),
+            "Content-MD5": base64.b64encode(hashlib.md5(payload).digest()).decode(),
+            "Content-Type": "application/octet-stream",
+        }
+
+        def sender(http_conn, method, path, data, headers):
+            # a new reader for every attempt, as boto resends the request on retries
+            http_conn.request(method, path, MemoryViewReader(payload), headers)
+            return http_conn.getresponse()
+
+        resp = conn.make_request(
+            "PUT",
+            bucket,
+            ukey,
+            headers=headers,
+            query_args=query_args,
+            sender=sender,
+        )
+        body = resp.read()
+        if resp.status != 200:
+            raise conn.provider.storage_response_error(resp.status, resp.reason, body)
+        return resp.getheader("etag")
+
+    def open_loop_put(self, bucket, ukey, intended):
+        """
+        Writes a single object sent by the open loop. The time taken by the request is recorded as the "put"
+        service time, and the time from the intended send time till the end as the "put response" time, which
+        includes the time spent waiting for a free worker
+        :param bucket: name of the bucket where the object needs to be created
+        :param ukey: key of the object to be created
+        :param intended: wall clock time at which the request was scheduled to be sent
+        :return: key of the object created
+        """
+        response = metrics.op_stats("RGW", "put response")
+        try:
+            self.put_object(bucket, ukey)
+        except BaseException:
+            response.record(intended, time.time(), error=True)
+            raise
+        response.record(intended, time.time())
+        return ukey
+
+    def multipart_upload(self, bucket, ukey, payload):
+        """
+        Writes a single object into the given bucket using S3 multipart upload.
+
+        The payload is split into parts of "part_size", with up to "part_concurrency" parts uploaded in parallel
+        by workers of its own, so that the parts of one object do not wait behind those of the others. The upload
+        is aborted if any of the parts fail.
+        :param bucket: name of the bucket where the object needs to be created
+        :param ukey: key of the object to be created
+        :param payload: memoryview of the data to be written
+        :return: key of the object created
+        """
+        with self.pooled_connection() as conn:
+            mp = conn.get_bucket(bucket, validate=False).initiate_multipart_upload(ukey)
+        log.debug(
+            f"Initiated multipart upload {mp.id} for object {ukey} of size {len(payload)}"
+        )
+        offsets = range(0, len(payload), self.part_size)
+        part_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, min(self.part_concurrency, len(offsets)))
+        )
+        try:
+            with part_pool:
+                futures = [
+                    part_pool.submit(
+                        self.upload_part,
+                        bucket,
+                        ukey,
+                        mp.id,
+                        part_no,
+                        payload[offset : offset + self.part_size],
+                    )
+                    for part_no, offset in enumerate(offsets, start=1)
+                ]
+                parts_xml = "".join(
+                    f"<Part><PartNumber>{part_no}</PartNumber><ETag>{future.result()}</ETag></Part>"
+                    for part_no, future in enumerate(futures, start=1)
+                )
+            with self.pooled_connection() as conn:
+                conn.get_bucket(bucket, validate=False).complete_multipart_upload(
+                    ukey,
+                    mp.id,
+                    f"<CompleteMultipartUpload>{parts_xml}</CompleteMultipartUpload>",
+                )
+        except Exception:
+            # the parts not yet started are dropped, rather than uploaded into an aborted upload
+            part_pool.shutdown(cancel_futures=True)
+            with self.pooled_connection() as conn:
+                conn.get_bucket(bucket, validate=False).cancel_multipart_upload(
+                    ukey, mp.id
+                )
+            raise
+        return ukey
+
+    def upload_part(self, bucket, ukey, upload_id, part_no, data):
+        """
+        Uploads a single part of a multipart upload using a connection from the pool
+        :param bucket: name of the bucket where the object is being created
+        :param ukey: key of the object being created
+        :param upload_id: ID of the multipart upload
+        :param part_no: number of the part, starting from 1
+        :param data: memoryview of the part data
+        :return: etag of the part uploaded
+        """
+        with self.pooled_connection() as conn:
+            with metrics.timer("RGW", "put_part", nbytes=len(data)):
+                etag = self.send_payload(
+                    conn,
+                    bucket,
+                    ukey,
+                    data,
+                    query_args=f"partNumber={part_no}&uploadId={upload_id}",
+                )
+        log.debug(f"Uploaded part {part_no} of object {ukey}")
+        return etag
+
+    def create_bucket_object(self, bucket, quantity):
+        """
+        creates the given number of objects inside the given bucket
+        :param bucket: name of the bucket where the object needs to be created
+        :param quantity: number of objects to be created
+        :return: list of all the keys of objects created
+        """
+        return self.create_objects(buckets=[bucket], quantity=quantity)[bucket]
+
+    def create_objects(self, buckets, quantity, arrivals=None):
+        """
+        creates the given number of objects inside each of the given buckets.
+
+        The objects are written by "rgw_concurrency" worker threads, each using its own pooled connection.
+        The work is interleaved across the buckets, so that all the buckets are written to at the same time.
+        At most 2 x "rgw_concurrency" objects are queued ahead of the workers, and the results are collected as
+        the objects finish.
+        :param buckets: list of bucket names where the objects need to be created
+        :param quantity: number of objects to be created in each bucket
+        :param arrivals: OpenLoopArrivals used to send the objects at its arrival rate, instead of as soon as
+            a worker is free
+        :return: dictionary of the list of keys created, with bucket name as key
+        """
+        obj_key_dict = {bucket: [] for bucket in buckets}
+        err_dict = collections.defaultdict(list)
+        log.info(
+            f"creating {quantity} objects inside buckets {buckets} with {self.concurrency} worker(s)"
+        )
+
+        def collect(done):
+            for future in done:
+                bucket, ukey = pending.pop(future)
+                try:
+                    obj_key_dict[bucket].append(future.result())
+                except Exception as err:
+                    err_dict[bucket].append(ukey)
+                    log.error(
+                        f"An error occurred when creating the object {ukey} in bucket {bucket}."
+                        f" Error message : \n {err}"
+                    )
+
+        # The open loop keeps at most "max_backlog" requests unfinished, dropping the ones arriving beyond it.
+        # With the limit raised by the backlog there is always a finished future to collect, so its arrivals
+        # are never delayed
+        limit = 2 * self.concurrency
+        if arrivals is not None:
+            limit += arrivals.max_backlog
+        pending = {}
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.concurrency
+        ) as executor:
+            try:
+                for no in range(int(quantity)):
+                    ukey = f"obj_{unique_id}_no{no}"
+                    for bucket in buckets:
+                        log.debug(
+                            f"creating the object no : {no} with key : {ukey} in bucket {bucket}"
+                        )
+                        if len(pending) >= limit:
+                            done, _ = concurrent.futures.wait(
+                                pending, return_when=concurrent.futures.FIRST_COMPLETED
+                            )
+                            collect(done)
+                        if arrivals is None:
+                            future = executor.submit(self.put_object, bucket, ukey)
+                        else:
+                            intended = arrivals.next()
+                            if intended is None:
+                                continue
+                            future = executor.submit(
+                                self.open_loop_put, bucket, ukey, intended
+                            )
+                            future.add_done_callback(arrivals.done)
+                        pending[future] = (bucket, ukey)
+                collect(concurrent.futures.as_completed(list(pending)))
+            except BaseException:
+                # not waiting for the queued objects when the workload is being stopped
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+        if arrivals is not None:
+            metrics.record_result(
+                "RGW",
+                metrics.current_phase.get("RGW", "default"),
+                "open loop",
+                arrivals.summary(),
+            )
+        # Completion order is random with multiple workers, keeping the keys in the order of creation
+        for bucket, key_list in obj_key_dict.items():
+            key_list.sort(key=lambda ky: int(ky.rsplit("_no", 1)[1]))
+            if err_dict[bucket]:
+                log.error(
+                    f"Failed to create {len(err_dict[bucket])} object(s) in bucket {bucket} : {err_dict[bucket]}"
+                )
+        log.debug(f"All the keys created are : {str(obj_key_dict)}")
+        return obj_key_dict
+
+    def run_mixed_workload(self, buckets, autotune=False):
+        """
+        Runs the steady state workload described in the "mixed_workload" section of the RGW config.
+
+        The working set of "working_set" keys is spread across the given buckets and written first, unless
+        "prefill" is false. Then every one of the "rgw_concurrency" workers repeatedly picks an operation as per
+        the "op_mix" weights and a key as per the "key_distribution", till "seconds" are over.
+        :param buckets: list of the names of the buckets holding the working set
+        :param autotune: If true, the number of active workers is changed by the Autotuner every window,
+            and the workload runs till the tuning is over
+        :return: dictionary of the no of operations issued, with the operation as key
+        """
+        mixed = config["RGW"]["mixed_workload"]
+        op_mix = {op: float(weight) for op, weight in mixed["op_mix"].items() if weight}
+        unknown = set(op_mix) - {"get", "put", "list", "delete"}
+        if unknown:
+            raise ValueError(f"Invalid operations provided in the op_mix : {unknown}")
+        keys = KeyDistribution(
+            mixed["working_set"],
+            mixed.get("key_distribution", "uniform"),
+            zipf_exponent=mixed.get("zipf_exponent", 0.99),
+            hot_keys_percent=mixed.get("hot_keys_percent", 20),
+            hot_ops_percent=mixed.get("hot_ops_percent", 80),
+        )
+        # keys present in the buckets, gets and deletes of missing keys are issued as puts instead
+        live = bytearray(keys.size)
+        if mixed.get("prefill", True):
+            with metrics.phase("RGW", "mixed prefill"):
+                created = self.create_objects(
+                    buckets, quantity=math.ceil(keys.size / len(buckets))
+                )
+            for no, bucket in enumerate(buckets):
+                for ukey in created[bucket]:
+                    index = int(ukey.rsplit("_no", 1)[1]) * len(buckets) + no
+                    if index < keys.size:
+                        live[index] = 1
+
+        workers, seconds, gate, tuner = (
+            self.concurrency,
+            float(mixed["seconds"]),
+            None,
+            None,
+        )
+        if autotune:
+            gate = ConcurrencyGate(1)
+            tuner = Autotuner("RGW", gate.set)
+            workers, seconds = tuner.max, tuner.windows * tuner.window_secs
+        log.info(
+            f"Running the mixed workload with op mix {op_mix} on {keys.size} keys with {keys.distribution}"
+            f" access for {seconds} seconds, with {workers} worker(s)"
+        )
+        deadline = time.time() + seconds
+        stop = threading.Event()
+        with metrics.phase("RGW", "mixed"):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        self.mixed_worker,
+                        buckets,
+                        keys,
+                        list(op_mix),
+                        list(op_mix.values()),
+                        live,
+                        deadline,
+                        stop,
+                        gate,
+                        worker,
+                    )
+                    for worker in range(workers)
+                ]
+                try:
+                    if tuner:
+                        # the workers keep running while the tuner changes the number of active workers
+                        try:
+                            tuner.run(stop.wait)
+                        finally:
+                            stop.set()
+                    issued = sum(
+                        (future.result() for future in futures), collections.Counter()
+                    )
+                except BaseException:
+                    # letting the workers finish their current operation and exit
+                    stop.set()
+                    raise
+            metrics.record_result("RGW", "mixed", "op_mix", dict(issued))
+        return dict(issued)
+
+    def mixed_worker(
+        self, buckets, keys, ops, weights, live, deadline, stop, gate=None, worker=0
+    ):
+        """
+        Issues the operations of the mixed workload one after another till the deadline
+        :param buckets: list of the names of the buckets holding the working set
+        :param keys: KeyDistribution used to pick the keys
+        :param ops: list of the operations to pick from
+        :param weights: weights of the operations
+        :param live: bytearray marking the keys of the working set that are present
+        :param deadline: time at which the worker stops
+        :param stop: event set when the workload is being stopped early
+        :param gate: ConcurrencyGate pausing the worker while its index is not active, None to always run
+        :param worker: index of the worker
+        :return: Counter of the operations issued
+        """
+        rand = random.Random()
+        issued = collections.Counter()
+        while time.time() < deadline and not stop.is_set():
+            if gate and not gate.wait(worker, stop):
+                break
+            op = rand.choices(ops, weights)[0]
+            index = keys.sample()
+            bucket = buckets[index % len(buckets)]
+            ukey = f"obj_{unique_id}_no{index // len(buckets)}"
+            if op in ("get", "delete") and not live[index]:
+                issued[f"{op} of missing key, put instead"] += 1
+                op = "put"
+            try:
+                if op == "put":
+                    self.put_object(bucket, ukey)
+                    live[index] = 1
+                else:
+                    with self.pooled_connection() as conn:
+                        bkt = conn.get_bucket(bucket, validate=False)
+                        if op == "get":
+                            self.stream_object(bkt.new_key(ukey))
+                        elif op == "list":
+                            with metrics.timer("RGW", "list"):
+                                bkt.get_all_keys(
+                                    marker=ukey, max_keys=self.list_page_size
+                                )
+                        else:
+                            live[index] = 0
+                            with metrics.timer("RGW", "delete"):
+                                bkt.delete_key(ukey)
+            except Exception as err:
+                if getattr(err, "status", None) == 404:
+                    # the key was deleted by another worker after it was picked
+                    log.debug(f"Object {ukey} in bucket {bucket} not found during {op}")
+                    issued[f"{op} of missing key"] += 1
+                    continue
+                log.error(
+                    f"An error occurred during {op} of the object {ukey} in bucket {bucket}."
+                    f" Error message : \n {err}"
+                )
+            issued[op] += 1
+        return issued
+
+    def delete_boto_object(self, bucket, key=None, delete_all=False):
+        """
+        Deletes the given object from the bucket.
+
+        If the Key is specified, deletes only the object from the bucket, otherwise deletes all the objects from
+        the given bucket
+        :param bucket: name of the bucket from where the object needs to be deleted
+        :param key: name of the key to be deleted.
+        :param delete_all: If true, deletes all the objects in the given bucket
+        :return: no of objects deleted
+        """
+        log.info(f"Deleting the object(s) present in the given bucket {bucket}")
+        if delete_all:
+            log.debug(f"selected to delete all the objects in bucket {bucket}")
+            with self.pooled_connection() as conn:
+                return self.delete_all_objects(bucket, conn)
+
+        bucket = self.conn.get_bucket(bucket)
+        try:
+            with metrics.timer("RGW", "delete"):
+                bucket.delete_key(key)
+        except Exception as err:
+            log.error(
+                f"An error occurred when deleting the object {key} in bucket {bucket.name}."
+                f" Error message : \n {err}"
+            )
+            return 0
+        log.debug(f"Delete the object {key} in bucket {bucket.name}")
+        return 1
+
+    def delete_all_objects(self, bucket, conn):
+        """
+        Deletes all the objects of the bucket with multi-object delete requests of up to 1000 keys each.
+        The keys are taken from the listing stream as they arrive, so only one batch is held in memory
+        :param bucket: name of the bucket whose objects need to be deleted
+        :param conn: connection used for the listing and the deletes
+        :return: no of objects deleted
+        """
+        deleted = 0
+        batch = []
+        bkt = conn.get_bucket(bucket, validate=False)
+        for record in self.iter_bucket_keys(bucket, conn=conn):
+            batch.append(record.name)
+            if len(batch) == S3_MAX_DELETE_KEYS:
+                deleted += self.delete_batch(bkt, batch)
+                batch = []
+        if batch:
+            deleted += self.delete_batch(bkt, batch)
+        log.info(f"done with deleting {deleted} object(s) in bucket {bucket}")
+        return deleted
+
+    def delete_batch(self, bucket, keys):
+        """
+        Deletes the given keys with a single multi-object delete request
+        :param bucket: boto bucket object from where the objects need to be deleted
+        :param keys: list of up to 1000 keys to be deleted
+        :return: no of objects deleted
+        """
+        try:
+            with metrics.timer("RGW", "delete_multi"):
+                result = bucket.delete_keys(keys, quiet=True)
+        except Exception as err:
+            log.error(
+                f"An error occurred when deleting {len(keys)} objects in bucket {bucket.name}."
+                f" Error message : \n {err}"
+            )
+            return 0
+        for error in result.errors:
+            log.error(
+                f"An error occurred when deleting the object {error.key} in bucket {bucket.name}."
+                f" Error message : \n {error.code} {error.message}"
+            )
+        log.debug(f"Deleted {len(keys)} objects in bucket {bucket.name}")
+        return len(keys) - len(result.errors)
+
+    def delete_boto_bucket(self, bucket):
+        """
+        Deletes the empty bucket. If the bucket is not empty, deletes all the objects and then delets bucket
+        :param bucket: Name of the bucket to be deleted.
+        :return: no of objects deleted from the bucket
+        """
+        log.info(f"Bucket provided to be deleted : {bucket}")
+        with self.pooled_connection() as conn:
+            deleted = self.delete_all_objects(bucket, conn)
+            try:
+                with metrics.timer("RGW", "delete_bucket"):
+                    conn.delete_bucket(bucket)
+            except Exception as err:
+                log.error(
+                    f"An error occurred when deleting bucket {bucket}."
+                    f" Error message : \n {err}"
+                )
+        log.info(f"completed deleting bucket {bucket}")
+        return deleted
+
+    def delete_buckets(self, buckets):
+        """
+        Deletes the buckets along with all their objects, "rgw_concurrency" buckets at a time
+        :param buckets: list of the names of the buckets to be deleted
+        :return: no of objects deleted
+        """
+        if not buckets:
+            return 0
+        workers = min(self.concurrency, len(buckets))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return sum(executor.map(self.delete_boto_bucket, buckets))
+
+    def download_boto_objects(self, bucket, key=None):
+        """
+        Used to download the object on to local file system simulating read option.
+
+        If Key is specified along with bucket name, only that object will be downloaded, Otherwise all the objects in
+        the bucket will be downloaded. Creates a folder called object_downloads_<timestamp> and downloads them in the
+        folder. The objects are downloaded by "download_concurrency" worker threads, fed from the listing stream.
+        With "download_mode" set to "discard", the objects are read and checksummed but not written to the disk.
+        :param bucket: Name of the bucket from where to download a object
+        :param key: Name of the object to be downloaded
+        :return: no of objects downloaded
+        """
+        folder_name = f"object_downloads_{unique_id}"
+        if self.download_mode == "file":
+            log.debug(f"Creating the folder : {folder_name}")
+            os.makedirs(folder_name, exist_ok=True)
+        log.info(
+            f"Downloading object(s) from the bucket {bucket} in {self.download_mode} mode"
+            f" with {self.download_concurrency} worker(s)"
+        )
+        keys = [
+            BucketKey(bucket, key, None, None),
+        ]
+        if not key:
+            log.debug(f"Downloading all the objects from the bucket {bucket}")
+            keys = self.iter_bucket_keys(bucket)
+
+        # Proceeding to download all the keys provided, keeping a bounded number of downloads queued
+        # so that the listing does not run ahead of the workers
+        downloaded = 0
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.download_concurrency
+        ) as executor:
+            pending = set()
+            try:
+                for record in keys:
+                    if record.name.endswith("/"):
+                        continue
+                    if len(pending) >= 2 * self.download_concurrency:
+                        done, pending = concurrent.futures.wait(
+                            pending, return_when=concurrent.futures.FIRST_COMPLETED
+                        )
+                        downloaded += sum(future.result() for future in done)
+                    pending.add(
+                        executor.submit(self.download_object, record, folder_name)
+                    )
+                downloaded += sum(
+                    future.result()
+                    for future in concurrent.futures.as_completed(pending)
+                )
+            except BaseException:
+                # not waiting for the queued objects when the workload is being stopped
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        log.info(f"Downloaded {downloaded} object(s) from the bucket {bucket}")
+        return downloaded
+
+    def download_object(self, record, folder_name):
+        """
+        Downloads a single object using a connection from the pool
+        :param record: BucketKey of the object to be downloaded. The size is looked up with a HEAD request if unknown
+        :param folder_name: folder where the object is downloaded
+        :return: 1 if the object was downloaded, else 0
+        """
+        file_path = os.path.join(
+            folder_name, f"object_{record.bucket}_{record.name}.txt"
+        )
+        log.debug(
+            f"Downloading the objects {record.name} from the bucket {record.bucket}"
+        )
+        with self.pooled_connection() as conn:
+            bucket = conn.get_bucket(record.bucket, validate=False)
+            try:
+                if record.size is None:
+                    with metrics.timer("RGW", "head"):
+                        key = bucket.get_key(record.name)
+                else:
+                    # The size is known from the listing, so the HEAD request can be skipped
+                    key = bucket.new_key(record.name)
+                    key.size = record.size
+                if self.download_mode == "discard":
+                    self.stream_object(key)
+                elif key.size >= self.multipart_threshold:
+                    with metrics.timer("RGW", "get", nbytes=key.size):
+                        self.ranged_download(key, file_path)
+                else:
+                    with open(file_path, "wb") as fd:
+                        self.stream_object(key, fd)
+            except Exception as err:
+                log.error(
+                    f"An error occurred when downloading the object {record.name} in bucket {record.bucket}."
+                    f" Error message : \n {err}"
+                )
+                return 0
+        return 1
+
+    def stream_object(self, key, fd=None):
+        """
+        Reads the body of the object in chunks, writing each chunk into the file if one is given.
+        The MD5 of the data read is verified against the ETag, except for multipart uploads whose ETag is not an MD5
+        :param key: boto key object of the object to be read
+        :param fd: file object where the object is written. If not given, the data is dropped once checksummed
+        :return: None
+        """
+        checksum = hashlib.md5()
+        with metrics.timer("RGW", "get") as sample:
+            key.open_read()
+            try:
+                while True:
+                    chunk = key.resp.read(DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    checksum.update(chunk)
+                    if fd:
+                        fd.write(chunk)
+                    sample.nbytes += len(chunk)
+            finally:
+                key.close()
+            etag = (key.etag or "").strip('"')
+            if etag and "-" not in etag and etag != checksum.hexdigest():
+                raise ValueError(
+                    f"Checksum mismatch for object {key.name}, ETag {etag} and MD5 of the data read {checksum.hexdigest()}"
+                )
+
+    def ranged_download(self, key, file_path):
+        """
+        Downloads the object with ranged GETs of "part_size", each written at its offset in the file. Up to
+        "part_concurrency" ranges of the object are downloaded in parallel, by workers of its own
+        :param key: boto key object of the object to be downloaded
+        :param file_path: path of the file where the object is downloaded
+        :return: None
+        """
+        log.debug(
+            f"Downloading object {key.name} of size {key.size} with ranged GETs of size {self.part_size}"
+        )
+        offsets = range(0, key.size, self.part_size)
+        with open(file_path, "wb") as fd, concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, min(self.part_concurrency, len(offsets)))
+        ) as part_pool:
+            fd.truncate(key.size)
+            futures = [
+                part_pool.submit(
+                    self.download_range, key.bucket.name, key.name, fd.fileno(), offset
+                )
+                for offset in offsets
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except Exception:
+                part_pool.shutdown(cancel_futures=True)
+                raise
+
+    def download_range(self, bucket, ukey, fileno, offset):
+        """
+        Downloads a single range of the object using a connection from the pool
+        :param bucket: name of the bucket of the object
+        :param ukey: key of the object being downloaded
+        :param fileno: file descriptor of the file where the object is downloaded
+        :param offset: offset of the range within the object
+        :return: None
+        """
+        end = offset + self.part_size - 1
+        with self.pooled_connection() as conn:
+            key = conn.get_bucket(bucket, validate=False).new_key(ukey)
+            with metrics.timer("RGW", "get_range") as sample:
+                data = key.get_contents_as_string(
+                    headers={"Range": f"bytes={offset}-{end}"}
+                )
+                sample.nbytes = len(data)
+        os.pwrite(fileno, data, offset)
+
+    def generate_boto_obj_url(self, bucket, key=None):
+        """
+        Used to create download URL for the object simulating read option.
+
+        If Key is specified along with bucket name, only for that object the URL will be generated,
+         Otherwise all the objects in the bucket will have the download URL's.
+        :param bucket: Name of the bucket from where to download a object
+        :param key: Name of the object for which URL should be generated
+        :return: generator of the objects URL's
+        """
+        bucket = self.conn.get_bucket(bucket, validate=False)
+        log.info(f"Creating URL's for object(s) from the bucket {bucket.name}")
+        keys = [
+            key,
+        ]
+        if not key:
+            log.debug(
+                f"Generating URL's for all the objects from the bucket {bucket.name}"
+            )
+            keys = (record.name for record in self.iter_bucket_keys(bucket.name))
+
+        for key in keys:
+            if key.endswith("/"):
+                continue
+            try:
+                # Unsigned URL's are built locally, no request needs to be sent for the key
+                obj_url = bucket.new_key(key).generate_url(
+                    0, query_auth=False, force_http=True
+                )
+                log.debug(
+                    f"The URL generated is : {str(obj_url)} of type {type(obj_url)}"
+                )
+                yield obj_url
+            except Exception as err:
+                log.error(
+                    f"An error occurred when generating URI the object {key} in bucket {bucket.name}."
+                    f" Error message : \n {err}"
+                )
+
+
+class OpenLoopArrivals:
+    """
+    Schedules the requests of an open loop workload at a fixed or Poisson arrival rate.
+
+    In a closed loop the next request is sent only once a worker is free, so when the cluster stalls fewer
+    requests are sent and the stall is hidden from the latencies ( coordinated omission ). Here the send time of
+    every request is fixed in advance and the response time is measured from it. Requests arriving while
+    "max_backlog" requests are already waiting or in flight are dropped and counted instead
+    """
+
+    def __init__(self, ops_per_sec, arrival="poisson", max_backlog=1000):
+        """
+        :param ops_per_sec: arrival rate of the requests
+        :param arrival: "fixed" for evenly spaced arrivals, "poisson" for exponentially distributed gaps
+        :param max_backlog: maximum number of requests waiting or in flight
+        """
+        if arrival not in ("fixed", "poisson"):
+            raise ValueError(f"Invalid arrival provided : {arrival}")
+        if float(ops_per_sec) <= 0:
+            raise ValueError(f"Invalid arrival rate provided : {ops_per_sec}")
+        self.rate = float(ops_per_sec)
+        self.arrival = arrival
+        self.max_backlog = int(max_backlog)
+        self.slots = threading.BoundedSemaphore(self.max_backlog)
+        self.rand = random.Random()
+        self.first_send = None
+        self.next_send = None
+        self.scheduled = 0
+        self.dropped = 0
+
+    def next(self):
+        """
+        Waits till the send time of the next request
+        :return: intended send time of the request, None if it is dropped because of the backlog
+        """
+        if self.next_send is None:
+            self.first_send = self.next_send = time.time()
+        elif self.arrival == "poisson":
+            self.next_send += self.rand.expovariate(self.rate)
+        else:
+            self.next_send += 1 / self.rate
+        time.sleep(max(0.0, self.next_send - time.time()))
+        self.scheduled += 1
+        if not self.slots.acquire(blocking=False):
+            self.dropped += 1
+            return None
+        return self.next_send
+
+    def done(self, future):
+        """
+        Frees the backlog slot of a completed request. Used as the done callback of its future
+        :param future: future of the request
+        :return: None
+        """
+        self.slots.release()
+
+    def summary(self):
+        """
+        :return: dictionary of the arrival rate asked for and achieved, and the requests sent and dropped
+        """
+        elapsed = (self.next_send - self.first_send) if self.scheduled > 1 else 0
+        return {
+            "arrival": self.arrival,
+            "target_ops_per_sec": self.rate,
+            "offered_ops_per_sec": (
+                round((self.scheduled - 1) / elapsed, 2) if elapsed else 0
+            ),
+            "scheduled": self.scheduled,
+            "sent": self.scheduled - self.dropped,
+            "dropped": self.dropped,
+            "dropped_percent": (
+                round(self.dropped * 100 / self.scheduled, 3) if self.scheduled else 0
+            ),
+            "max_backlog": self.max_backlog,
+        }
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter used to hold a steady rate of operations for the async RGW engine
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        Initializing the bucket with full tokens
+        :param rate: number of operations allowed per second. 0 or None disables the limiter
+        :param burst: maximum number of tokens the bucket can hold. Defaults to 1/10th of a second worth of tokens
+        """
+        self.rate = float(rate or 0)
+        self.capacity = float(burst or max(1.0, self.rate / 10))
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Waits till a token is available and consumes it
+        :return: None
+        """
+        if not self.rate:
+            return
+        # Serializing the waiters, so that the tokens are handed out in the order they were requested
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.last_refill) * self.rate
+                )
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncS3Connection:
+    """
+    Minimal asyncio based S3 client used by the async RGW engine.
+
+    Requests are signed with AWS signature V2 (same as the BOTO tool) and sent over a pool of
+    keep-alive HTTP/1.1 connections, so that thousands of requests can be in flight from a single process
+    """
+
+    def __init__(self, host, access_key, secret_key, port=80, max_connections=100):
+        """
+        Initializing the connection pool
+        :param host: IP/FQDN of the RGW host
+        :param access_key: access key of the RGW user
+        :param secret_key: secret key of the RGW user
+        :param port: port on which RGW is listening
+        :param max_connections: maximum number of TCP connections opened with the host
+        """
+        self.host = host
+        self.port = port
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.idle_streams = []
+        self.conn_slots = asyncio.Semaphore(max_connections)
+
+    def sign(self, method, resource, headers):
+        """
+        Generates the AWS V2 authorization header for the request
+        :param method: HTTP method of the request
+        :param resource: canonical resource of the request. Eg : /bucket/key
+        :param headers: headers being sent with the request
+        :return: value of the Authorization header
+        """
+        amz_headers = "".join(
+            f"{name}:{headers[name]}\n"
+            for name in sorted(headers)
+            if name.startswith("x-amz-")
+        )
+        string_to_sign = (
+            f"{method}\n{headers.get('content-md5', '')}\n{headers.get('content-type', '')}\n"
+            f"{headers['date']}\n{amz_headers}{resource}"
+        )
+        digest = hmac.new(
+            self.secret_key.encode(), string_to_sign.encode(), hashlib.sha1
+        ).digest()
+        return f"AWS {self.access_key}:{base64.b64encode(digest).decode()}"
+
+    async def request(
+        self,
+        method,
+        bucket,
+        key=None,
+        query="",
+        body=b"",
+        headers=None,
+        discard_body=False,
+    ):
+        """
+        Sends a request to the RGW host and collects the response
+        :param method: HTTP method of the request
+        :param bucket: name of the bucket
+        :param key: name of the object, if the request is for an object
+        :param query: query string of the request, without the "?"
+        :param body: bytes like object to be sent as the request body
+        :param headers: extra headers to be sent and signed. Eg : content-md5
+        :param discard_body: If true, the response body is read and dropped, only its size is returned
+        :return: tuple of status code, response headers and body (or size of the body if discarded)
+        """
+        path = f"/{bucket}"
+        if key is not None:
+            path = f"{path}/{urllib.parse.quote(key, safe='/~')}"
+        headers = {
+            **{name.lower(): value for name, value in (headers or {}).items()},
+            "date": email.utils.formatdate(usegmt=True),
+            "content-length": str(len(body)),
+        }
+        # Only the sub-resources are part of the canonical resource for V2 signatures
+        sub_resources = [
+            part
+            for part in query.split("&")
+            if part.split("=")[0] in ("delete", "uploads", "uploadId", "partNumber")
+        ]
+        resource = f"{path}?{'&'.join(sub_resources)}" if sub_resources else path
+        headers["authorization"] = self.sign(method, resource, headers)
+        target = f"{path}?{query}" if query else path
+        head = f"{method} {target} HTTP/1.1\r\nhost: {self.host}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+
+        async with self.conn_slots:
+            for attempt in range(2):
+                # A kept-alive connection may have been closed by the host while idle, in which case the
+                # request is sent once more on a fresh connection
+                reused = attempt == 0 and bool(self.idle_streams)
+                if reused:
+                    reader, writer = self.idle_streams.pop()
+                else:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                try:
+                    writer.write(f"{head}\r\n".encode())
+                    if len(body):
+                        writer.write(body)
+                    await writer.drain()
+                    status, resp_headers, resp_body = await self.read_response(
+                        reader, method, discard_body
+                    )
+                    break
+                except ConnectionError as err:
+                    writer.close()
+                    if not reused:
+                        raise
+                    log.debug(
+                        f"Reused connection with the RGW host failed, retrying on a new connection : {err}"
+                    )
+                except BaseException:
+                    writer.close()
+                    raise
+            if resp_headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self.idle_streams.append((reader, writer))
+        return status, resp_headers, resp_body
+
+    @staticmethod
+    async def read_response(reader, method, discard_body):
+        """
+        Reads a HTTP/1.1 response from the stream
+        :param reader: asyncio stream reader of the connection
+        :param method: HTTP method of the request sent, HEAD responses carry no body
+        :param discard_body: If true, the body is read in chunks and dropped
+        :return: tuple of status code, response headers and body (or size of the body if discarded)
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by the RGW host")
+        status = int(status_line.split()[1])
+        resp_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode().partition(":")
+            resp_headers[name.strip().lower()] = value.strip()
+
+        chunks = []
+        size = 0
+
+        async def consume(length):
+            nonlocal size
+            while length:
+                data = await reader.read(min(length, 1 << 20))
+                if not data:
+                    raise ConnectionError("Connection closed while reading the body")
+                length -= len(data)
+                size += len(data)
+                if not discard_body:
+                    chunks.append(data)
+
+        if method != "HEAD" and status not in (204, 304):
+            if resp_headers.get("transfer-encoding", "").lower() == "chunked":
+                while True:
+                    chunk_len = int((await reader.readline()).split(b";")[0], 16)
+                    if not chunk_len:
+                        await reader.readline()
+                        break
+                    await consume(chunk_len)
+                    await reader.readline()
+            else:
+                await consume(int(resp_headers.get("content-length", 0)))
+        return status, resp_headers, size if discard_body else b"".join(chunks)
+
+    async def close(self):
+        """
+        Closes all the idle connections in the pool
+        :return: None
+        """
+        while self.idle_streams:
+            _, writer = self.idle_streams.pop()
+            writer.close()
+
+
+class AsyncRgwIoTools:
+    """
+    This class implements the asyncio based engine to trigger the Object IO for RGW.
+
+    Covers the same operations as RgwIoTools, but keeps up to "async_concurrency" requests in flight
+    from a single process, paced by a token bucket to hold "target_ops_per_sec"
+    """
+
+    s3_ns = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+    def __init__(self):
+        """
+        Initializing the async connection pool and the rate limiter
+        """
+        self.host = config["RGW"]["rgw_host"]
+        self.access_key, self.secret_key = get_rgw_keys()
+        self.concurrency = int(config["RGW"].get("async_concurrency", 1000))
+        self.conn = AsyncS3Connection(
+            host=self.host,
+            access_key=self.access_key,
+            secret_key=self.secret_key,
+            port=int(config["RGW"].get("rgw_port", 80)),
+            max_connections=self.concurrency,
+        )
+        self.limiter = TokenBucket(rate=config["RGW"].get("target_ops_per_sec", 0))
+        self.in_flight = asyncio.Semaphore(self.concurrency)
+        self.object_sizes, self.payloads = get_payload_generator()
+        # Objects at or above the threshold are written with multipart uploads, with "part_concurrency"
+        # parts of each object in flight at a time
+        (
+            self.multipart_threshold,
+            self.part_size,
+            self.part_concurrency,
+        ) = get_multipart_config()
+        self.errors = 0
+
+    async def call(self, op, description, method, bucket, key=None, **kwargs):
+        """
+        Performs one rate limited and timed S3 request, logging the failures
+        :param op: name of the operation used in the metrics. Eg : put
+        :param description: description of the operation used in the logs
+        :param method: HTTP method of the request
+        :param bucket: name of the bucket
+        :param key: name of the object
+        :param kwargs: other arguments accepted by AsyncS3Connection.request
+        :return: tuple of response headers and body, None if the request failed
+        """
+        await self.limiter.acquire()
+        async with self.in_flight:
+            start = time.time()
+            try:
+                status, headers, body = await self.conn.request(
+                    method, bucket, key, **kwargs
+                )
+            except Exception as err:
+                self.errors += 1
+                metrics.op_stats("RGW", op).record(start, time.time(), error=True)
+                log.error(
+                    f"An error occurred when {description} in bucket {bucket}. Error message : \n {err}"
+                )
+                return None
+        nbytes = body if isinstance(body, int) else len(kwargs.get("body", b""))
+        metrics.op_stats("RGW", op).record(
+            start, time.time(), nbytes=nbytes, error=status >= 300
+        )
+        if status >= 300:
+            self.errors += 1
+            log.error(
+                f"An error occurred when {description} in bucket {bucket}. Status code : {status}"
+            )
+            return None
+        return headers, body
+
+    async def create_bucket(self, bucket):
+        """
+        Creates the given bucket
+        :param bucket: name of the bucket to be created
+        :return: name of the bucket if created, else None
+        """
+        if (
+            await self.call("create_bucket", "creating the bucket", "PUT", bucket)
+            is not None
+        ):
+            return bucket
+
+    async def put_object(self, bucket, key, data):
+        """
+        Writes a single object into the given bucket
+        :param bucket: name of the bucket
+        :param key: key of the object to be created
+        :param data: bytes like object to be written
+        :return: key of the object if created, else None
+        """
+        if len(data) >= self.multipart_threshold:
+            start = time.time()
+            uploaded = await self.multipart_upload(bucket, key, data)
+            metrics.op_stats("RGW", "put").record(
+                start,
+                time.time(),
+                nbytes=len(data) if uploaded else 0,
+                error=not uploaded,
+            )
+            return key if uploaded else None
+        if await self.call(
+            "put", f"creating the object {key}", "PUT", bucket, key, body=data
+        ):
+            return key
+
+    async def multipart_upload(self, bucket, key, data):
+        """
+        Writes a single object into the given bucket using S3 multipart upload.
+
+        The data is split into parts of "part_size", with up to "part_concurrency" parts uploaded in parallel.
+        The upload is aborted if any of the parts fail.
+        :param bucket: name of the bucket
+        :param key: key of the object to be created
+        :param data: bytes like object to be written
+        :return: True if the object was created, else False
+        """
+        resp = await self.call(
+            "put_initiate",
+            f"initiating the multipart upload of the object {key}",
+            "POST",
+            bucket,
+            key,
+            query="uploads",
+        )
+        if resp is None:
+            return False
+        upload_id = ElementTree.fromstring(resp[1]).findtext(f"{self.s3_ns}UploadId")
+        log.debug(
+            f"Initiated multipart upload {upload_id} for object {key} of size {len(data)}"
+        )
+        part_slots = asyncio.Semaphore(self.part_concurrency)
+
+        async def upload_part(part_no, offset):
+            async with part_slots:
+                resp = await self.call(
+                    "put_part",
+                    f"uploading the part {part_no} of the object {key}",
+                    "PUT",
+                    bucket,
+                    key,
+                    query=f"partNumber={part_no}&uploadId={upload_id}",
+                    body=data[offset : offset + self.part_size],
+                )
+            return resp[0].get("etag") if resp else None
+
+        etags = await asyncio.gather(
+            *(
+                upload_part(part_no, offset)
+                for part_no, offset in enumerate(
+                    range(0, len(data), self.part_size), start=1
+                )
+            )
+        )
+        if all(etags):
+            request = ElementTree.Element("CompleteMultipartUpload")
+            for part_no, etag in enumerate(etags, start=1):
+                part = ElementTree.SubElement(request, "Part")
+                ElementTree.SubElement(part, "PartNumber").text = str(part_no)
+                ElementTree.SubElement(part, "ETag").text = etag
+            if await self.call(
+                "put_complete",
+                f"completing the multipart upload of the object {key}",
+                "POST",
+                bucket,
+                key,
+                query=f"uploadId={upload_id}",
+                body=ElementTree.tostring(request, encoding="utf-8"),
+            ):
+                return True
+        await self.call(
+            "put_abort",
+            f"aborting the multipart upload of the object {key}",
+            "DELETE",
+            bucket,
+            key,
+            query=f"uploadId={upload_id}",
+        )
+        return False
+
+    async def put_sampled_object(self, bucket, key):
+        """
+        Writes a single object with a size drawn from the object size distribution
+        :param bucket: name of the bucket
+        :param key: key of the object to be created
+        :return: key of the object if created, else None
+        """
+        return await self.put_object(
+            bucket, key, self.payloads.get(self.object_sizes.sample())
+        )
+
+    async def get_object(self, bucket, key):
+        """
+        Reads a single object from the given bucket, dropping the data read
+        :param bucket: name of the bucket
+        :param key: key of the object to be read
+        :return: number of bytes read, None if the read failed
+        """
+        resp = await self.call(
+            "get",
+            f"downloading the object {key}",
+            "GET",
+            bucket,
+            key,
+            discard_body=True,
+        )
+        return resp[1] if resp else None
+
+    async def list_objects(self, bucket):
+        """
+        Lists all the objects in the bucket, paging through the results 1000 keys at a time
+        :param bucket: name of the bucket
+        :return: async generator yielding tuples of key name and size
+        """
+        marker = ""
+        while True:
+            query = f"max-keys=1000&marker={urllib.parse.quote(marker, safe='')}"
+            resp = await self.call(
+                "list", "listing the objects", "GET", bucket, query=query
+            )
+            if resp is None:
+                return
+            root = ElementTree.fromstring(resp[1])
+            key = None
+            for content in root.iter(f"{self.s3_ns}Contents"):
+                key = content.findtext(f"{self.s3_ns}Key")
+                yield key, int(content.findtext(f"{self.s3_ns}Size"))
+            if root.findtext(f"{self.s3_ns}IsTruncated") != "true" or key is None:
+                return
+            marker = root.findtext(f"{self.s3_ns}NextMarker") or key
+
+    async def delete_object(self, bucket, key):
+        """
+        Deletes a single object from the given bucket
+        :param bucket: name of the bucket
+        :param key: key of the object to be deleted
+        :return: key of the object if deleted, else None
+        """
+        if await self.call(
+            "delete", f"deleting the object {key}", "DELETE", bucket, key
+        ):
+            return key
+
+    async def listed_keys(self, buckets):
+        """
+        Streams the keys of all the given buckets, one listing page at a time
+        :param buckets: names of the buckets to be listed
+        :return: async generator yielding tuples of bucket name and key
+        """
+        for bucket in buckets:
+            async for key, _ in self.list_objects(bucket):
+                yield bucket, key
+
+    async def run_workers(self, items, handler):
+        """
+        Runs the handler on every item with "async_concurrency" worker tasks, fed through a bounded queue
+        so that the items are pulled from the (async) iterable only as fast as the workers consume them
+        :param items: iterable or async iterable of tuples of arguments for the handler
+        :param handler: coroutine function called with each tuple of arguments
+        :return: None
+        """
+        queued = asyncio.Queue(maxsize=self.concurrency)
+
+        async def worker():
+            while True:
+                args = await queued.get()
+                if args is None:
+                    return
+                try:
+                    await handler(*args)
+                except Exception as err:
+                    self.errors += 1
+                    log.error(
+                        f"An error occurred in the async worker. Error message : \n {err}"
+                    )
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            if hasattr(items, "__aiter__"):
+                async for args in items:
+                    await queued.put(args)
+            else:
+                for args in items:
+                    await queued.put(args)
+            for _ in workers:
+                await queued.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            # not waiting for the queued items when the workload is being stopped
+            for task in workers:
+                task.cancel()
+
+    async def delete_batch(self, bucket, keys):
+        """
+        Deletes the given keys with a single multi-object delete request
+        :param bucket: name of the bucket from where the objects need to be deleted
+        :param keys: list of up to 1000 keys to be deleted
+        :return: no of objects deleted
+        """
+        request = ElementTree.Element("Delete")
+        ElementTree.SubElement(request, "Quiet").text = "true"
+        for key in keys:
+            ElementTree.SubElement(
+                ElementTree.SubElement(request, "Object"), "Key"
+            ).text = key
+        body = ElementTree.tostring(request, encoding="utf-8")
+        resp = await self.call(
+            "delete_multi",
+            f"deleting {len(keys)} objects",
+            "POST",
+            bucket,
+            query="delete",
+            body=body,
+            headers={
+                "content-md5": base64.b64encode(hashlib.md5(body).digest()).decode(),
+                "content-type": "application/xml",
+            },
+        )
+        if resp is None:
+            return 0
+        errors = ElementTree.fromstring(resp[1]).findall(f"{self.s3_ns}Error")
+        for error in errors:
+            self.errors += 1
+            log.error(
+                f"An error occurred when deleting the object {error.findtext(f'{self.s3_ns}Key')}"
+                f" in bucket {bucket}. Error message : \n"
+                f" {error.findtext(f'{self.s3_ns}Code')} {error.findtext(f'{self.s3_ns}Message')}"
+            )
+        log.debug(f"Deleted {len(keys)} objects in bucket {bucket}")
+        return len(keys) - len(errors)
+
+    async def delete_bucket(self, bucket):
+        """
+        Deletes all the objects in the bucket and then the bucket. The listing is streamed and the objects
+        are removed with one multi-object delete request per S3_MAX_DELETE_KEYS keys
+        :param bucket: name of the bucket to be deleted
+        :return: no of objects deleted from the bucket
+        """
+        deleted = 0
+        batch = []
+        async for key, _ in self.list_objects(bucket):
+            batch.append(key)
+            if len(batch) == S3_MAX_DELETE_KEYS:
+                deleted += await self.delete_batch(bucket, batch)
+                batch = []
+        if batch:
+            deleted += await self.delete_batch(bucket, batch)
+        await self.call("delete_bucket", "deleting the bucket", "DELETE", bucket)
+        log.info(f"Deleted {deleted} object(s) from the bucket {bucket}")
+        return deleted
+
+    async def run(self):
+        """
+        Runs the RGW IO as specified in the RGW section of the config file, with the object requests
+        of a phase issued by "async_concurrency" workers
+        :return: None
+        """
+        rgw_conf = config["RGW"]
+        buckets = []
+        try:
+            if rgw_conf["create_bkt_obj"]:
+                names = [
+                    f"my-bucket-{unique_id}-no-{no}"
+                    for no in range(int(rgw_conf["num_buckets"]))
+                ]
+                with metrics.phase("RGW", "create buckets"):
+                    created = await asyncio.gather(
+                        *(self.create_bucket(name) for name in names)
+                    )
+                buckets = [bkt for bkt in created if bkt]
+
+                # The payload of each object is generated only when a worker picks it up
+                with metrics.phase("RGW", "put objects"):
+                    await self.run_workers(
+                        (
+                            (bkt, f"obj_{unique_id}_no{no}")
+                            for no in range(int(rgw_conf["num_objects"]))
+                            for bkt in buckets
+                        ),
+                        self.put_sampled_object,
+                    )
+
+            listed = 0
+            with metrics.phase("RGW", "list objects"):
+                async for _ in self.listed_keys(buckets):
+                    listed += 1
+            log.info(f"async engine : listed {listed} object(s)")
+
+            if rgw_conf["download_objects"]:
+                # The listing is streamed again into the workers, so that the keys are never all held in memory
+                with metrics.phase("RGW", "get objects"):
+                    await self.run_workers(self.listed_keys(buckets), self.get_object)
+
+            if rgw_conf["delete_buckets_and_objects"]:
+                with metrics.phase("RGW", "delete buckets and objects"):
+                    await asyncio.gather(*(self.delete_bucket(bkt) for bkt in buckets))
+        finally:
+            await self.conn.close()
+        log.info(f"async engine : total errors encountered : {self.errors}")
+
+
+def parse_rados_bench_output(output):
+    """
+    Parses the output of the rados bench write, seq and rand operations.
+
+    Collects the per second progress rows, so that the drops in throughput during the run are visible,
+    along with the final summary of the run
+    :param output: stdout of the rados bench command
+    :return: dictionary with the per second "series" and the "summary" of the run
+    """
+    summary_names = {
+        "Total time run": "elapsed_secs",
+        "Total writes made": "ops",
+        "Total reads made": "ops",
+        "Write size": "op_size",
+        "Read size": "op_size",
+        "Object size": "object_size",
+        "Bandwidth (MB/sec)": "mb_per_sec",
+        "Stddev Bandwidth": "stddev_mb_per_sec",
+        "Max bandwidth (MB/sec)": "max_mb_per_sec",
+        "Min bandwidth (MB/sec)": "min_mb_per_sec",
+        "Average IOPS": "ops_per_sec",
+        "Stddev IOPS": "stddev_iops",
+        "Max IOPS": "max_iops",
+        "Min IOPS": "min_iops",
+    }
+    latency_names = {
+        "Average Latency(s)": "mean",
+        "Stddev Latency(s)": "stddev",
+        "Max latency(s)": "max",
+        "Min latency(s)": "min",
+    }
+    series = []
+    summary = {}
+    latency = {}
+    for line in output.splitlines():
+        row = parse_rados_bench_row(line)
+        if row:
+            series.append(row)
+            continue
+        name, _, value = line.partition(":")
+        name = name.strip()
+        try:
+            value = float(value)
+        except ValueError:
+            continue
+        if name in summary_names:
+            summary[summary_names[name]] = value
+        elif name in latency_names:
+            latency[latency_names[name]] = round(value * 1000, 3)
+    if latency:
+        summary["latency_ms"] = latency
+    return {"series": series, "summary": summary}
+
+
+def parse_rados_bench_row(line):
+    """
+    Parses a per second progress row of rados bench. Eg :
+      sec Cur ops   started  finished  avg MB/s  cur MB/s last lat(s)  avg lat(s)
+        1      16      3034      3018   11.7876   11.7891  0.00547028  0.00526927
+    :param line: line of the rados bench output
+    :return: dictionary of the row, None if the line is not a progress row
+    """
+    fields = line.split()
+    if len(fields) != 8 or not all(
+        re.fullmatch(r"[\d.]+|-", field) for field in fields
+    ):
+        return None
+    values = [None if field == "-" else float(field) for field in fields]
+    return {
+        "sec": int(values[0]),
+        "cur_ops": int(values[1]),
+        "started": int(values[2]),
+        "finished": int(values[3]),
+        "avg_mb_per_sec": values[4],
+        "cur_mb_per_sec": values[5],
+        "last_lat_ms": None if values[6] is None else round(values[6] * 1000, 3),
+        "avg_lat_ms": None if values[7] is None else round(values[7] * 1000, 3),
+    }
+
+
+def rados_bench_progress(phase, pool_name):
+    """
+    Builds the callback reporting the progress rows of rados bench as interval metrics, as they are printed
+    :param phase: name of the phase. Eg : write
+    :param pool_name: name of the pool being benchmarked
+    :return: callback taking a line of the rados bench output
+    """
+    last = {"sec": 0, "finished": 0, "mb": 0.0}
+
+    def on_line(line):
+        row = parse_rados_bench_row(line)
+        if not row or row["sec"] - last["sec"] < metrics.interval_secs:
+            return
+        secs = row["sec"] - last["sec"]
+        total_mb = (row["avg_mb_per_sec"] or 0) * row["sec"]
+        metrics.interval(
+            "Rados_Bench",
+            phase,
+            pool_name,
+            ops=row["finished"] - last["finished"],
+            ops_per_sec=round((row["finished"] - last["finished"]) / secs, 2),
+            mb_per_sec=round((total_mb - last["mb"]) / secs, 2),
+            lat_ms=row["last_lat_ms"],
+        )
+        last.update(sec=row["sec"], finished=row["finished"], mb=total_mb)
+
+    return on_line
+
+
+def aggregate_rados_bench_results(results):
+    """
+    Combines the rados bench metrics of the pools benchmarked at the same time into cluster wide totals.
+
+    Bandwidth, IOPS and ops are added, the average latency is weighted by the ops of every pool, and the
+    max / min latencies are the max / min across the pools. The per second rows are added by second.
+    :param results: list of the metrics parsed by parse_rados_bench_output, one per pool
+    :return: dictionary with the combined "series" and "summary"
+    """
+    summaries = [result["summary"] for result in results if result["summary"]]
+    summary = {"pools": len(summaries)}
+    for name in ("ops", "mb_per_sec", "ops_per_sec"):
+        summary[name] = round(sum(item.get(name, 0) for item in summaries), 3)
+    summary["elapsed_secs"] = max(
+        (item.get("elapsed_secs", 0) for item in summaries), default=0
+    )
+    latencies = [
+        (item.get("ops", 0), item["latency_ms"])
+        for item in summaries
+        if "latency_ms" in item
+    ]
+    total_ops = sum(ops for ops, _ in latencies)
+    if latencies and total_ops:
+        summary["latency_ms"] = {
+            "mean": round(
+                sum(ops * lat["mean"] for ops, lat in latencies) / total_ops, 3
+            ),
+            "max": max(lat["max"] for _, lat in latencies),
+            "min": min(lat["min"] for _, lat in latencies),
+        }
+
+    rows = collections.defaultdict(lambda: {"cur_ops": 0, "cur_mb_per_sec": 0.0})
+    for result in results:
+        for row in result["series"]:
+            combined = rows[row["sec"]]
+            combined["cur_ops"] += row["cur_ops"]
+            combined["cur_mb_per_sec"] += row["cur_mb_per_sec"] or 0
+    series = [
+        {
+            "sec": sec,
+            "cur_ops": row["cur_ops"],
+            "cur_mb_per_sec": round(row["cur_mb_per_sec"], 3),
+        }
+        for sec, row in sorted(rows.items())
+    ]
+    return {"series": series, "summary": summary}
+
+
+def pool_delete_cmd(pool_name):
+    """
+    :param pool_name: name of the pool
+    :return: command deleting the pool. Needs mon_allow_pool_delete to be set on the cluster
+    """
+    return [
+        "sudo",
+        "ceph",
+        "osd",
+        "pool",
+        "delete",
+        pool_name,
+        pool_name,
+        "--yes-i-really-really-mean-it",
+    ]
+
+
+class RadosIoTools:
+    """
+    This class implements the methods required to trigger the Object IO via Rados Bench tool
+    """
+
+    @count
+    def __init__(self, pool_no=None):
+        """
+        Initializing class object by creating a pool for triggering Rados bench
+        :param pool_no: number used in the pool name. Defaults to the number of objects created so far,
+            pools created in parallel should be given their number explicitly
+        :raises CommandError: if the pool could not be set up. The steps completed are torn down with the workload
+        """
+        pool_no = pool_no if pool_no is not None else self.__init__.calls
+        self.pool_name = f"instant_io_pool_{pool_no}_{unique_id}"
+        self.concurrent_ios = int(config["Rados_Bench"].get("concurrent_ios", 16))
+        log.debug(f"Creating pool : {self.pool_name}, and enabling rados application")
+        pool = f"pool {self.pool_name}"
+        try:
+            resources.setup(
+                "Rados_Bench",
+                [
+                    SetupStep(
+                        pool,
+                        [
+                            "sudo",
+                            "ceph",
+                            "osd",
+                            "pool",
+                            "create",
+                            self.pool_name,
+                            64,
+                            64,
+                        ],
+                        teardown=pool_delete_cmd(self.pool_name),
+                    ),
+                    SetupStep(
+                        f"application {self.pool_name}",
+                        [
+                            "sudo",
+                            "ceph",
+                            "osd",
+                            "pool",
+                            "application",
+                            "enable",
+                            self.pool_name,
+                            "rados",
+                        ],
+                        after=[pool],
+                    ),
+                ],
+            )
+        except CommandError as err:
+            log.error(
+                f"failed to create pool {self.pool_name} for rados bench. Error : {err}"
+            )
+            raise
+        log.info(f"Created pool {self.pool_name} for Rados Bench successfully")
+
+    def bench_write_ops(self, bsize, duration):
+        """
+        Method to trigger Write operation via the Rados Bench tool
+        :param bsize: block size to write
+        :param duration: no of seconds to write the bench objects
+        :return: metrics parsed from the rados bench output
+        """
+        # dropping the cache from the system before triggering the test
+        run_command(["sudo", "sync"], workload="Rados_Bench")
+        run_command(
+            ["sudo", "sh", "-c", "echo 3 > /proc/sys/vm/drop_caches"],
+            workload="Rados_Bench",
+        )
+        log.debug("Performing Normal writes.")
+        bench_write_cmd = [
+            "sudo",
+            "rados",
+            "--no-log-to-stderr",
+            "-b",
+            str(int(bsize)),
+            "-p",
+            self.pool_name,
+            "bench",
+            str(duration),
+            "write",
+            "-t",
+            str(self.concurrent_ios),
+            "--no-cleanup",
+        ]
+        try:
+            op = stream_cmdline(
+                bench_write_cmd,
+                rados_bench_progress("write", self.pool_name),
+                run_time=duration,
+            )
+        except CommandError as err:
+            log.error(
+                f"Write operation via Rados Bench tool failed on pool {self.pool_name}. Error : {err}"
+            )
+            return None
+        log.debug(
+            f"Performed Write on pool {self.pool_name} using command : {bench_write_cmd} \n  Output :: \n {op} \n"
+        )
+        result = parse_rados_bench_output(op)
+        metrics.record_result("Rados_Bench", "write", self.pool_name, result)
+        log.info(
+            f"finished performing write operation via Rados Bench tool on pool {self.pool_name}"
+        )
+        return result
+
+    def bench_read_ops(self, duration):
+        """
+        Method to perform sequential and Random reads on using the rados bench tool
+        :param duration: no of seconds to read the bench objects
+        :return: dictionary of the metrics parsed from the rados bench output, with the read type as key
+        """
+        results = {}
+        log.info(f"Performing read operations on the pool {self.pool_name}")
+        if config["Rados_Bench"]["sequential_read"]:
+            log.info(
+                f"Performing sequental read operation on the pool {self.pool_name}"
+            )
+            cmd = [
+                "rados",
+                "--no-log-to-stderr",
+                "-p",
+                self.pool_name,
+                "bench",
+                str(duration),
+                "seq",
+                "-t",
+                str(self.concurrent_ios),
+            ]
+            log.debug(
+                f"Performing sequential read operations on the pool {self.pool_name} using {cmd}"
+            )
+            try:
+                op = stream_cmdline(
+                    cmd, rados_bench_progress("seq", self.pool_name), run_time=duration
+                )
+            except CommandError as err:
+                log.error(
+                    f"Sequential read via Rados Bench tool failed on pool {self.pool_name}. Error : {err}"
+                )
+                op = None
+            log.debug(
+                f"Performed sequential read on pool {self.pool_name} using command :{cmd} \nOutput :: \n{op}\n"
+            )
+            if op is not None:
+                results["seq"] = parse_rados_bench_output(op)
+                metrics.record_result(
+                    "Rados_Bench", "seq", self.pool_name, results["seq"]
+                )
+
+        if config["Rados_Bench"]["random_read"]:
+            log.info(
+                f"Performing sequental read operation on the pool {self.pool_name}"
+            )
+            cmd = [
+                "rados",
+                "--no-log-to-stderr",
+                "-p",
+                self.pool_name,
+                "bench",
+                str(duration),
+                "rand",
+                "-t",
+                str(self.concurrent_ios),
+            ]
+            log.debug(
+                f"Performing Random read operations on the pool {self.pool_name} using {cmd}"
+            )
+            try:
+                op = stream_cmdline(
+                    cmd, rados_bench_progress("rand", self.pool_name), run_time=duration
+                )
+            except CommandError as err:
+                log.error(
+                    f"Random read via Rados Bench tool failed on pool {self.pool_name}. Error : {err}"
+                )
+                op = None
+            log.debug(
+                f"Performed sequential read on pool {self.pool_name} using command :{cmd} \nOutput :: \n{op}\n"
+            )
+            if op is not None:
+                results["rand"] = parse_rados_bench_output(op)
+                metrics.record_result(
+                    "Rados_Bench", "rand", self.pool_name, results["rand"]
+                )
+
+        else:
+            log.info("Read operations not specified in the config file... Exiting ....")
+        return results
+
+    def bench_cleanup(self):
+        """
+        Removes the data created by the rados bench command
+        :return: None
+        """
+        log.info(f"Deleting the objects created in the pool : {self.pool_name}")
+        cmd = ["rados", "-p", self.pool_name, "cleanup"]
+        op = run_command(cmd, workload="Rados_Bench").stdout
+        log.debug(
+            f"Performed cleanup of pool {self.pool_name} using command : {cmd} \n  Output :: \n {op} \n"
+        )
+
+
+def parse_fio_eta_line(line):
+    """
+    Parses a progress line printed by fio with --eta=always. Eg :
+      Jobs: 2 (f=2): [M(2)][30.0%][r=20.1MiB/s,w=19.9MiB/s][r=5142,w=5098 IOPS][eta 00m:07s]
+    :param line: line of the fio output
+    :return: dictionary of the MB/s and IOPS, with "read" and "write" as keys. None if the line is not a progress line
+    """
+    if not line.startswith("Jobs:"):
+        return None
+    units = {"": 2**-20, "k": 2**-10, "m": 1, "g": 2**10, "t": 2**20}
+    multipliers = {"": 1, "k": 10**3, "m": 10**6, "g": 10**9}
+    directions = {"r": "read", "w": "write"}
+    progress = {}
+    for direction, value, unit in re.findall(
+        r"\b([rw])=([\d.]+)([kKmMgGtT]?)i?B/s", line
+    ):
+        progress.setdefault(directions[direction], {})["mb_per_sec"] = round(
+            float(value) * units[unit.lower()], 2
+        )
+    iops = re.search(r"\[([^\[\]]*) IOPS\]", line)
+    if iops:
+        for direction, value, unit in re.findall(
+            r"\b([rw])=([\d.]+)([kKmMgG]?)", iops.group(1)
+        ):
+            progress.setdefault(directions[direction], {})["ops_per_sec"] = round(
+                float(value) * multipliers[unit.lower()], 2
+            )
+    return progress or None
+
+
+def fio_progress(phase):
+    """
+    Builds the callback reporting the progress lines of fio as interval metrics, as they are printed
+    :param phase: name of the phase. Eg : write
+    :return: callback taking a line of the fio output
+    """
+
+    def on_line(line):
+        for direction, values in (parse_fio_eta_line(line) or {}).items():
+            metrics.interval(
+                "RBD",
+                phase,
+                direction,
+                ops_per_sec=values.get("ops_per_sec", 0),
+                mb_per_sec=values.get("mb_per_sec", 0),
+            )
+
+    return on_line
+
+
+def parse_fio_json_output(output):
+    """
+    Parses the output of fio run with --output-format=json+.
+
+    Collects the read and write IOPS, bandwidth and completion latency percentiles of every job. The jobs
+    of the same name ( one per --numjobs ) are also combined, by adding their IOPS and bandwidth and by
+    merging their completion latency histogram bins, so that the percentiles of the combined jobs are exact
+    :param output: stdout of the fio command
+    :return: dictionary with the combined metrics of every job name under "jobs"
+    """
+    # fio can print warnings before the JSON document
+    document, _ = json.JSONDecoder().raw_decode(output[output.index("{") :])
+    jobs = {}
+    for job in document["jobs"]:
+        combined = jobs.setdefault(job["jobname"], {"per_job": []})
+        per_job = {"job": len(combined["per_job"]), "elapsed_secs": job.get("elapsed")}
+        for direction in ("read", "write"):
+            stats = job.get(direction)
+            if not stats or not stats.get("total_ios"):
+                continue
+            clat = stats["clat_ns"]
+            per_job[direction] = {
+                "ops_per_sec": round(stats["iops"], 2),
+                "mb_per_sec": round(stats["bw"] / 1024, 2),
+                "clat_percentiles_ms": {
+                    percent.rstrip("0").rstrip("."): round(value / 1e6, 3)
+                    for percent, value in clat.get("percentile", {}).items()
+                },
+            }
+            total = combined.setdefault(
+                direction,
+                {"ops_per_sec": 0, "mb_per_sec": 0, "hist": LatencyHistogram()},
+            )
+            total["ops_per_sec"] = round(total["ops_per_sec"] + stats["iops"], 2)
+            total["mb_per_sec"] = round(total["mb_per_sec"] + stats["bw"] / 1024, 2)
+            for value_ns, bin_count in clat.get("bins", {}).items():
+                total["hist"].record(int(value_ns) / 1e9, bin_count)
+        combined["per_job"].append(per_job)
+
+    for combined in jobs.values():
+        for direction in ("read", "write"):
+            if direction not in combined:
+                continue
+            hist = combined[direction].pop("hist")
+            combined[direction]["latency_ms"] = {
+                "mean": round(hist.mean() / 1000, 3),
+                "p50": hist.percentile(50) / 1000,
+                "p90": hist.percentile(90) / 1000,
+                "p99": hist.percentile(99) / 1000,
+                "p99.9": hist.percentile(99.9) / 1000,
+                "max": hist.max / 1000,
+            }
+            combined[direction]["histogram"] = hist.to_dict()
+    return {"fio_version": document.get("fio version"), "jobs": jobs}
+
+
+def parse_fio_logs(log_prefix):
+    """
+    Parses the bandwidth and completion latency logs written by fio with --write_bw_log and --write_lat_log.
+
+    The logs of all the jobs are combined into one time series per direction : the bandwidth is added
+    and the latency is averaged across the jobs for every second
+    :param log_prefix: prefix of the log files given to fio
+    :return: dictionary with the "bw_mb_per_sec" and "clat_ms" series, as lists of [second, value]
+    """
+    series = {}
+    for name, pattern, scale, combine in (
+        ("bw_mb_per_sec", f"{log_prefix}_bw.*.log", 1024, sum),
+        ("clat_ms", f"{log_prefix}_clat.*.log", 1e6, statistics.mean),
+    ):
+        samples = collections.defaultdict(list)
+        for file_name in glob.glob(pattern):
+            with open(file_name, "r") as fd:
+                for line in fd:
+                    fields = [field.strip() for field in line.split(",")]
+                    if len(fields) < 3:
+                        continue
+                    direction = ("read", "write", "trim")[int(fields[2])]
+                    second = round(int(fields[0]) / 1000)
+                    samples[(direction, second)].append(int(fields[1]) / scale)
+        direction_series = collections.defaultdict(list)
+        for (direction, second), values in sorted(samples.items()):
+            direction_series[direction].append([second, round(combine(values), 3)])
+        series[name] = dict(direction_series)
+    return series
+
+
+class RbdFioTools:
+    """
+    Class containing modules for running File IO for Rados block devices
+    """
+
+    # size of the rbd image created for testing, in MB
+    image_size_mb = 4096
+
+    @count
+    def __init__(self, map_image=True):
+        """
+        Performs all the pre-requsits fro running FIO on for testing.
+
+        Steps performed in init:
+        1. Create a pool for testing
+        2. Create a rbd image in the test pool
+        3. Map image to a block device
+        4. Make file system
+        5. Mount the Ceph rbd image image
+        :param map_image: If false, only the pool and the image are created, for the native engine
+            to write on the image directly
+        """
+        log.debug("Performing pre-requisites for running FIO on the given host")
+        # Create a pool for testing
+        self.pool_name = f"rbd_io_pool_{self.__init__.calls}_{unique_id}"
+        self.image_name = f"rbd_io_image_{self.__init__.calls}_{unique_id}"
+        device = f"/dev/rbd/{self.pool_name}/{self.image_name}"
+        mount_point = "/mnt/ceph-block-device"
+        pool = f"pool {self.pool_name}"
+        image = f"image {self.pool_name}/{self.image_name}"
+        steps = [
+            # Create a pool for testing, and enable rbd application on it
+            SetupStep(
+                pool,
+                ["sudo", "ceph", "osd", "pool", "create", self.pool_name, 256, 256],
+                teardown=pool_delete_cmd(self.pool_name),
+            ),
+            SetupStep(
+                f"application {self.pool_name}",
+                [
+                    "sudo",
+                    "ceph",
+                    "osd",
+                    "pool",
+                    "application",
+                    "enable",
+                    self.pool_name,
+                    "rbd",
+                ],
+                after=[pool],
+            ),
+            # Creating a image on the given pool
+            SetupStep(
+                image,
+                [
+                    "sudo",
+                    "rbd",
+                    "create",
+                    self.image_name,
+                    "--size",
+                    self.image_size_mb,
+                    "--pool",
+                    self.pool_name,
+                    "--image-feature",
+                    "layering",
+                ],
+                teardown=["sudo", "rbd", "rm", f"{self.pool_name}/{self.image_name}"],
+                after=[pool],
+            ),
+        ]
+        if map_image:
+            steps += [
+                # Mapping the image create to the client
+                SetupStep(
+                    f"map {device}",
+                    [
+                        "sudo",
+                        "rbd",
+                        "map",
+                        self.image_name,
+                        "--pool",
+                        self.pool_name,
+                        "--name",
+                        "client.admin",
+                    ],
+                    teardown=["sudo", "rbd", "unmap", device],
+                    after=[image, f"application {self.pool_name}"],
+                ),
+                # Creating file system on the image created, and mounting it on /mnt/ceph-block-device
+                SetupStep(
+                    f"filesystem {device}",
+                    ["sudo", "mkfs.ext4", "-m0", device],
+                    after=[f"map {device}"],
+                ),
+                SetupStep(
+                    f"mount {mount_point}",
+                    ["sudo", "mount", device, mount_point],
+                    teardown=["sudo", "umount", mount_point],
+                    after=[f"filesystem {device}"],
+                ),
+                # Performing a small write using rbd-bench
+                SetupStep(
+                    f"bench-write {self.image_name}",
+                    [
+                        "sudo",
+                        "rbd",
+                        "bench-write",
+                        self.image_name,
+                        f"--pool={self.pool_name}",
+                    ],
+                    after=[f"mount {mount_point}"],
+                ),
+            ]
+        log.debug(f"Setting up image : {self.image_name}")
+        resources.setup("RBD", steps)
+
+        # Capturning image details :
+        details = run_command(
+            ["rbd", "info", f"{self.pool_name}/{self.image_name}"], workload="RBD"
+        )
+        log.debug(f"image details for: {self.image_name} is : \n {details.stdout}")
+
+        # collecting config specified in the JSON file
+        self.num_loops = config["RBD"]["num_loops"]
+        self.num_jobs = config["RBD"]["num_parallel_jobs"]
+        self.block_size = config["RBD"]["block_size"]
+        self.write_size = config["RBD"]["write_size"]
+        self.run_time = config["RBD"]["run_time"]
+        delete = 0 if config["RBD"]["delete_file_data"] else 1
+
+        self.gen_fio_cmd = (
+            f"sudo fio --name=global --ioengine=rbd --clientname=admin --pool={self.pool_name}"
+            f" --rbdname={self.image_name} --bs={self.block_size} --size={self.write_size}"
+            f" --direct=0 --iodepth=32 --runtime={self.run_time} --numjobs={self.num_jobs}"
+            f" --loops={self.num_loops} --cgroup_nodelete={delete} --output-format=json+"
+        )
+        # bandwidth and latency logs of every job, averaged over 1 sec, are written in this folder
+        self.fio_log_folder = f"fio_logs_{unique_id}"
+
+        log.debug(f"Base command for triggering FIO is : {self.gen_fio_cmd}")
+
+    @staticmethod
+    def complete_prereqs():
+        """
+        Completes pre-reqs of creating a mount directory and installing the FIO rpms on the node
+        :return: None
+        """
+        # checking for the FIO RPM and creating a mount directory for mounting RBD images created, at the same time
+        fio_rpm, _ = run_commands(
+            [["rpm", "-q", "fio"], ["sudo", "mkdir", "-p", "/mnt/ceph-block-device"]],
+            workload="RBD",
+        )
+        # installing the FIO RPM on the given node for running File IO
+        if not fio_rpm.ok:
+            cmd = ["sudo", "yum", "install", "fio", "-y"]
+            log.debug(f"Installing the fio rpms using the cmd {cmd}")
+            run_command(cmd, workload="RBD")
+
+        log.info(
+            "Completing the pre-reqs of installing the FIO rpm and creating the mount directory"
+        )
+
+    def run_fio_jobs(self, phase, jobs):
+        """
+        Runs the given fio jobs with the base fio command, and records the metrics parsed from the JSON
+        output along with the bandwidth and latency time series from the fio logs
+        :param phase: name of the phase. Eg : write
+        :param jobs: fio job options. Eg : --name=seq_write --rw=write
+        :return: stdout of the fio command
+        """
+        os.makedirs(self.fio_log_folder, exist_ok=True)
+        log_prefix = f"{self.fio_log_folder}/{phase}"
+        fio_cmd = (
+            f"{self.gen_fio_cmd} --write_bw_log={log_prefix} --write_lat_log={log_prefix}"
+            f" --log_avg_msec=1000 --eta=always --eta-newline={metrics.interval_secs} {jobs}"
+        )
+        log.debug(f"Running fio jobs for phase {phase} using the command : {fio_cmd}")
+        op = stream_cmdline(
+            fio_cmd.split(), fio_progress(phase), run_time=int(self.run_time)
+        )
+        result = parse_fio_json_output(op)
+        result["series"] = parse_fio_logs(log_prefix)
+        metrics.record_result("RBD", phase, "fio", result)
+        return op
+
+    def fio_write_ops(self):
+        """
+        Method triggers sequential and Random writes on the given pool.
+        """
+        log.info(
+            f"Performing Random and Sequential write on the image : {self.image_name}"
+        )
+        try:
+            op = self.run_fio_jobs(
+                "write", "--name=seq_write --rw=write --name=rand_write --rw=randwrite"
+            )
+            log.debug(
+                f"Performed the Write actions. \n Output collected :\n\n {op}\n\n"
+            )
+        except Exception as err:
+            log.error(f"Encountered error during fio write operations. Error : \n{err}")
+
+        # Capturing image details :
+        details = run_command(
+            ["rbd", "info", f"{self.pool_name}/{self.image_name}"], workload="RBD"
+        )
+        log.debug(
+            f"image details after write operations for: {self.image_name} is : \n {details.stdout}"
+        )
+
+    def fio_read_ops(self):
+        """
+        Method triggers sequential and Random reads on the given pool.
+        """
+        log.info(
+            f"Performing Random and Sequential reads on the image : {self.image_name}"
+        )
+        try:
+            op = self.run_fio_jobs(
+                "read", "--name=seq_read --rw=read --name=rand_read --rw=randread"
+            )
+            log.debug(f"Performed the Read actions. \n Output collected :\n\n {op}\n\n")
+        except Exception as err:
+            log.error(f"Encountered error during fio read operations. Error : \n{err}")
+
+        # Capturing image details :
+        details = run_command(
+            ["rbd", "info", f"{self.pool_name}/{self.image_name}"], workload="RBD"
+        )
+        log.debug(
+            f"image details after read operations for: {self.image_name} is : \n {details.stdout}"
+        )
+
+    def fio_readwrite_ops(self):
+        """
+        Method triggers sequential and Random reads on the given pool.
+        """
+        log.info(
+            f"Performing Random and Sequential reads on the image : {self.image_name}"
+        )
+        try:
+            op = self.run_fio_jobs(
+                "readwrite",
+                "--name=seq_readwrite --rw=readwrite --name=rand_readwrite --rw=randrw",
+            )
+            log.debug(
+                f"Performed the Read & write actions. \n Output collected :\n\n {op}\n\n"
+            )
+        except Exception as err:
+            log.error(
+                f"Encountered error during fio Read/Write operations. Error : \n{err}"
+            )
+
+        # Capturing image details :
+        details = run_command(
+            ["rbd", "info", f"{self.pool_name}/{self.image_name}"], workload="RBD"
+        )
+        log.debug(
+            f"image details after read/write operations for: {self.image_name} is : \n {details.stdout}"
+        )
+
+
+class IoBackend(abc.ABC):
+    """
+    Storage driven by NativeIoEngine, seen as a set of numbered slots of one object size each.
+
+    The operations are asynchronous, they return once the operation is queued, and the callback is called
+    from any thread once it completes, with the return value of the operation ( negative errno on failure ).
+    Implemented over librados and librbd, and by the in-memory and file stand-ins used for trying out the
+    engine without a cluster.
+    """
+
+    @abc.abstractmethod
+    def aio_write(self, slot, data, oncomplete):
+        """
+        Writes the data into the slot
+        :param slot: number of the slot
+        :param data: bytes to be written
+        :param oncomplete: callback called with the return value of the write
+        :return: None
+        """
+
+    @abc.abstractmethod
+    def aio_read(self, slot, length, oncomplete):
+        """
+        Reads the data of the slot
+        :param slot: number of the slot
+        :param length: number of bytes to be read
+        :param oncomplete: callback called with the return value and the data read
+        :return: None
+        """
+
+    def cleanup(self, slots):
+        """
+        Deletes the data written into the slots
+        :param slots: number of slots written
+        :return: None
+        """
+
+    def close(self):
+        """
+        Releases the resources held by the backend
+        :return: None
+        """
+
+
+class LibradosBackend(IoBackend):
+    """
+    Backend writing every slot as an object of the pool, with the librados async completion APIs
+    """
+
+    def __init__(self, pool_name, ceph_conf):
+        """
+        Connecting to the cluster and opening the pool
+        :param pool_name: name of the pool
+        :param ceph_conf: path of the ceph.conf file of the cluster
+        """
+        self.cluster = rados.Rados(conffile=ceph_conf, name="client.admin")
+        self.cluster.connect()
+        self.ioctx = self.cluster.open_ioctx(pool_name)
+
+    @staticmethod
+    def object_name(slot):
+        """
+        :param slot: number of the slot
+        :return: name of the object holding the slot
+        """
+        return f"instant_io_native_{unique_id}_{slot}"
+
+    def aio_write(self, slot, data, oncomplete):
+        self.ioctx.aio_write(
+            self.object_name(slot),
+            data,
+            0,
+            oncomplete=lambda completion: oncomplete(completion.get_return_value()),
+        )
+
+    def aio_read(self, slot, length, oncomplete):
+        self.ioctx.aio_read(
+            self.object_name(slot),
+            length,
+            0,
+            oncomplete=lambda completion, data: oncomplete(
+                completion.get_return_value(), data
+            ),
+        )
+
+    def cleanup(self, slots):
+        for slot in range(slots):
+            try:
+                self.ioctx.remove_object(self.object_name(slot))
+            except rados.ObjectNotFound:
+                pass
+
+    def close(self):
+        self.ioctx.close()
+        self.cluster.shutdown()
+
+
+class LibrbdBackend(IoBackend):
+    """
+    Backend writing every slot at its offset in the rbd image, with the librbd async completion APIs
+    """
+
+    def __init__(self, pool_name, image_name, object_size, ceph_conf):
+        """
+        Connecting to the cluster and opening the image
+        :param pool_name: name of the pool holding the image
+        :param image_name: name of the image
+        :param object_size: size of every slot in bytes
+        :param ceph_conf: path of the ceph.conf file of the cluster
+        """
+        self.object_size = object_size
+        self.cluster = rados.Rados(conffile=ceph_conf, name="client.admin")
+        self.cluster.connect()
+        self.ioctx = self.cluster.open_ioctx(pool_name)
+        self.image = rbd.Image(self.ioctx, image_name)
+
+    def aio_write(self, slot, data, oncomplete):
+        self.image.aio_write(
+            data,
+            slot * self.object_size,
+            lambda completion: oncomplete(completion.get_return_value()),
+        )
+
+    def aio_read(self, slot, length, oncomplete):
+        self.image.aio_read(
+            slot * self.object_size,
+            length,
+            lambda completion, data: oncomplete(completion.get_return_value(), data),
+        )
+
+    def close(self):
+        self.image.close()
+        self.ioctx.close()
+        self.cluster.shutdown()
+
+
+class MemoryBackend(IoBackend):
+    """
+    Stand-in backend keeping the slots in memory. The operations are completed by a pool of threads,
+    the same way the librados callbacks are called from its own threads
+    """
+
+    def __init__(self, queue_depth):
+        """
+        :param queue_depth: number of operations completed at the same time
+        """
+        self.slots = {}
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=queue_depth)
+
+    def aio_write(self, slot, data, oncomplete):
+        def write():
+            self.slots[slot] = bytes(data)
+            oncomplete(0)
+
+        self.executor.submit(write)
+
+    def aio_read(self, slot, length, oncomplete):
+        def read():
+            data = self.slots.get(slot)
+            if data is None:
+                oncomplete(-errno.ENOENT, b"")
+            else:
+                oncomplete(len(data[:length]), data[:length])
+
+        self.executor.submit(read)
+
+    def cleanup(self, slots):
+        self.slots.clear()
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class FileBackend(IoBackend):
+    """
+    Stand-in backend writing every slot at its offset in a local file, with a pool of threads
+    """
+
+    def __init__(self, path, object_size, queue_depth):
+        """
+        :param path: path of the file
+        :param object_size: size of every slot in bytes
+        :param queue_depth: number of operations run at the same time
+        """
+        self.path = path
+        self.object_size = object_size
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=queue_depth)
+
+    def aio_write(self, slot, data, oncomplete):
+        def write():
+            try:
+                oncomplete(os.pwrite(self.fd, data, slot * self.object_size))
+            except OSError as err:
+                oncomplete(-err.errno)
+
+        self.executor.submit(write)
+
+    def aio_read(self, slot, length, oncomplete):
+        def read():
+            try:
+                data = os.pread(self.fd, length, slot * self.object_size)
+            except OSError as err:
+                oncomplete(-err.errno, b"")
+            else:
+                oncomplete(len(data), data)
+
+        self.executor.submit(read)
+
+    def cleanup(self, slots):
+        os.ftruncate(self.fd, 0)
+
+    def close(self):
+        self.executor.shutdown()
+        os.close(self.fd)
+        if not os.path.getsize(self.path):
+            os.remove(self.path)
+
+
+class NativeIoEngine:
+    """
+    Runs IO in-process on an IoBackend, keeping "queue_depth" operations in flight.
+
+    Every slot of the working set is written once, and then reads and writes are run on random slots of the
+    working set as per the read/write ratio. The latency of every operation is recorded into the histograms of
+    the workload as "read" and "write".
+    """
+
+    def __init__(
+        self, backend, workload, object_size, queue_depth, working_set, read_percent
+    ):
+        """
+        :param backend: IoBackend object
+        :param workload: name of the workload the metrics are recorded for
+        :param object_size: size of every read and write in bytes
+        :param queue_depth: maximum number of operations in flight
+        :param working_set: number of slots written and read
+        :param read_percent: percentage of the operations that are reads, after the working set is written
+        """
+        self.backend = backend
+        self.workload = workload
+        self.object_size = object_size
+        self.queue_depth = queue_depth
+        self.working_set = working_set
+        self.read_percent = read_percent
+        self.payload = os.urandom(object_size)
+        self.inflight = threading.BoundedSemaphore(queue_depth)
+
+    def submit(self, op, slot):
+        """
+        Queues the operation once there is room in the queue, and times it till its completion
+        :param op: "read" or "write"
+        :param slot: number of the slot
+        :return: None
+        """
+        self.inflight.acquire()
+        stats = metrics.op_stats(self.workload, op)
+        start = time.time()
+
+        def oncomplete(ret, data=None):
+            error = ret < 0
+            if error:
+                log.debug(f"Native {op} of slot {slot} failed with error {ret}")
+            stats.record(start, time.time(), 0 if error else self.object_size, error)
+            self.inflight.release()
+
+        try:
+            if op == "write":
+                self.backend.aio_write(slot, self.payload, oncomplete)
+            else:
+                self.backend.aio_read(slot, self.object_size, oncomplete)
+        except Exception as err:
+            log.error(f"Failed to queue the native {op} of slot {slot}. Error : {err}")
+            oncomplete(-errno.EIO)
+
+    def drain(self):
+        """
+        Waits for all the operations in flight to complete
+        :return: None
+        """
+        for _ in range(self.queue_depth):
+            self.inflight.acquire()
+        for _ in range(self.queue_depth):
+            self.inflight.release()
+
+    def run(self, seconds):
+        """
+        Writes the working set, and then runs the mixed reads and writes
+        :param seconds: duration of the mixed reads and writes
+        :return: None
+        """
+        log.info(
+            f"Running native IO with queue depth {self.queue_depth}, object size {self.object_size},"
+            f" working set {self.working_set} and {self.read_percent}% reads"
+        )
+        with metrics.phase(self.workload, "native write"):
+            for slot in range(self.working_set):
+                self.submit("write", slot)
+            self.drain()
+
+        deadline = time.time() + seconds
+        with metrics.phase(self.workload, "native mixed"):
+            while time.time() < deadline:
+                op = "read" if random.random() * 100 < self.read_percent else "write"
+                self.submit(op, random.randrange(self.working_set))
+            self.drain()
+
+
+def parse_smallfile_output(output):
+    """
+    Parses the summary printed by smallfile_cli.py at the end of an operation
+    :param output: stdout of the smallfile_cli.py command
+    :return: dictionary of the metrics found. Eg : files_per_sec, ops_per_sec, mb_per_sec
+    """
+    names = {
+        "total threads": "threads",
+        "total files": "files",
+        "total data": "data_gib",
+        "elapsed time": "elapsed_secs",
+        "files/sec": "files_per_sec",
+        "IOPS": "ops_per_sec",
+        "MiB/sec": "mb_per_sec",
+    }
+    result = {}
+    for line in output.splitlines():
+        match = re.match(r"\s*([\w/ ]+?)\s*=\s*([\d.]+)", line)
+        if match and match.group(1) in names:
+            result[names[match.group(1)]] = float(match.group(2))
+    return result
+
+
+class SmallFileTools:
+    """
+    Class containing all the methods required for running IO from small files.
+    """
+
+    def __init__(self):
+        """
+        Initializes the class objects by creating
+        1. Checking if cephfs_data and cephfs_metadata pools are present
+        2. Creating a mount point for file IO to be run
+        3. Mounting the share using client admin keyring
+        The pools are created and the share is mounted at the same time
+        """
+        # 1. Checking if cephfs_data and cephfs_metadata pools are present
+        op = run_command(["ceph", "osd", "lspools"], workload="CephFS").stdout
+        log.debug(f"the op of all the pools are : \n{op}")
+        steps = []
+        if "cephfs_data" not in op and "cephfs_metadata" not in op:
+            pools = ["cephfs_data", "cephfs_metadata"]
+            log.debug(f"Creating pools {pools} for ceph file")
+            # the pools are not specific to the run, and are kept once created
+            for pool in pools:
+                steps += [
+                    SetupStep(
+                        f"pool {pool}",
+                        ["sudo", "ceph", "osd", "pool", "create", pool, 64, 64],
+                    ),
+                    SetupStep(
+                        f"application {pool}",
+                        [
+                            "sudo",
+                            "ceph",
+                            "osd",
+                            "pool",
+                            "application",
+                            "enable",
+                            pool,
+                            "cephfs",
+                        ],
+                        after=[f"pool {pool}"],
+                    ),
+                ]
+
+        # 2. Creating a mount point for file IO to be run
+        self.mnt_pnt = "/mnt/mycephfs"
+        os.makedirs(self.mnt_pnt, exist_ok=True)
+
+        # 3. Mounting the share using client admin keyring if not already mounted
+        op = run_command(["mount", "-l", "-t", "ceph"], workload="CephFS").stdout
+        log.debug(f"O/P of the mount command : {op}")
+        if "/mnt/mycephfs type ceph" not in op:
+            steps.append(
+                SetupStep(
+                    f"mount {self.mnt_pnt}",
+                    ["mount", "-t", "ceph", ":/", self.mnt_pnt, "-o", "name=admin"],
+                    teardown=["umount", self.mnt_pnt],
+                )
+            )
+        resources.setup("CephFS", steps)
+
+    @staticmethod
+    def complete_prereqs(check_smallfile=True):
+        """
+        checks the pre-reqs by :
+        1. presence MDS daemon. ( atleast 1 active )
+        2. Presence of admin keyring in client node at /etc/ceph
+        3. Smallfile repo successfully cloned and ready to be used.
+        4. checking IS MOUNT HELPER IS PRESENT?
+        :param check_smallfile: If false, the smallfile repo is not checked. Eg : for the native engine
+        :return: Returns 1 if every pre-req is satisfied, otherwise returns 0 for fail
+        """
+
+        # The checks are independent of each other, running all the commands at the same time
+        commands = [["ceph", "mds", "stat"], ["stat", "/sbin/mount.ceph"]]
+        if check_smallfile:
+            commands.append([sys.executable, "smallfile/smallfile_cli.py", "--help"])
+        mds_stat, mount_helper, *smallfile_help = run_commands(
+            commands, workload="CephFS"
+        )
+
+        # 1 checking if MDS daemon is up and active
+        op = mds_stat.stdout
+        log.debug(f"O/P of command ceph mds stat is : {op}")
+        if "up:active" not in op:
+            log.error(
+                f"No up and active MDS server was found to be running on the cluster. Unable to trigger FIO"
+            )
+            return 0
+        log.debug("At least 1 MDS daemon is up and active")
+
+        # 2. checking presence of admin keyring
+        if not os.path.isfile("/etc/ceph/ceph.client.admin.keyring"):
+            log.error(
+                f"No Admin keyring was found on the client node. Won't be able to "
+            )
+            return 0
+        log.debug("Admin Keyring is present in the client node")
+
+        # 3. Smallfile repo successfully cloned and ready to be used.
+        if check_smallfile:
+            op = smallfile_help[0].stdout
+            log.debug(f"ottput of the smallfile help cli is {op}")
+            if "usage: smallfile_cli.py" not in op:
+                log.error("failed to execute smallfile_cli.py --help... Exiting")
+                return 0
+
+        # 4. checking IS MOUNT HELPER IS PRESENT?
+        op = mount_helper.stdout
+        log.debug(f"the op of mount helper is: \n{op}")
+        if "/sbin/mount.ceph" not in op:
+            log.error("Mount helper not present in the client node. Exiting..")
+            return 0
+
+        log.info(
+            f"All pre-req checks for small files for running CephFile IO completed successfully"
+        )
+        return 1
+
+    def run_file_write_ops(self):
+        """
+        Method to trigger the write operations for the Ceph file system
+        :return: None
+        """
+        threads = config["CephFS"]["num_threads"]
+        files = config["CephFS"]["num_files"]
+        fsize = config["CephFS"]["file_size"]
+        create_cmd = [
+            sys.executable,
+            "smallfile/smallfile_cli.py",
+            "--operation",
+            "create",
+            "--threads",
+            str(threads),
+            "--file-size",
+            str(fsize),
+            "--files",
+            str(files),
+            "--top",
+            self.mnt_pnt,
+            "--prefix",
+            unique_id,
+            "--verify-read",
+            "Y",
+            "--response-times",
+            "Y",
+        ]
+        try:
+            op = stream_cmdline(create_cmd)
+            log.debug(f"The o/p of the file write ops is : {op}")
+            metrics.record_result(
+                "CephFS", "create", "smallfile", parse_smallfile_output(op)
+            )
+        except Exception as err:
+            log.error(f"The error collected from file IO write is {err}")
+
+    def run_file_read_ops(self):
+        """
+        Method to trigger the read operations for the Ceph file system
+        :return: None
+        """
+
+        #  python smallfile_cli.py --operation read --top /mnt/mycephfs/ --prefix test1
+        read_cmd = [
+            sys.executable,
+            "smallfile/smallfile_cli.py",
+            "--operation",
+            "read",
+            "--top",
+            self.mnt_pnt,
+            "--prefix",
+            unique_id,
+        ]
+        try:
+            op = stream_cmdline(read_cmd)
+            log.debug(f"The o/p of the file read ops is : {op}")
+            metrics.record_result(
+                "CephFS", "read", "smallfile", parse_smallfile_output(op)
+            )
+        except Exception as err:
+            log.error(f"The error collected from file IO read is {err}")
+
+
+class FileTree:
+    """
+    Layout of the directories and files written by the NativeFileEngine.
+
+    Every worker has its own tree under the top directory of the run, "levels" levels deep with "dirs_per_level"
+    directories in every level, and its files are spread across the directories of the last level
+    """
+
+    def __init__(self, top, files, file_size, dirs_per_level, levels):
+        """
+        :param top: directory the tree is created in. Eg : /mnt/mycephfs
+        :param files: number of files of every worker
+        :param file_size: size of every file in bytes
+        :param dirs_per_level: number of directories created in every directory of the tree
+        :param levels: number of levels of directories of every worker
+        """
+        self.top = os.path.join(top, f"instant_io_{unique_id}")
+        self.files = files
+        self.file_size = file_size
+        self.dirs_per_level = dirs_per_level
+        self.levels = levels
+        # set once the files are renamed, so that the later operations use the new names
+        self.renamed = False
+
+    def dirs(self, worker):
+        """
+        :param worker: number of the worker
+        :return: list of all the directories of the worker, every directory listed before the ones in it
+        """
+        level = [os.path.join(self.top, f"worker_{worker}")]
+        dirs = list(level)
+        for _ in range(self.levels):
+            level = [
+                os.path.join(parent, f"dir_{index}")
+                for parent in level
+                for index in range(self.dirs_per_level)
+            ]
+            dirs += level
+        return dirs
+
+    def file_paths(self, worker):
+        """
+        :param worker: number of the worker
+        :return: list of the paths of all the files of the worker
+        """
+        leaves = self.dirs(worker)[-(self.dirs_per_level**self.levels) :]
+        suffix = ".renamed" if self.renamed else ""
+        return [
+            os.path.join(leaves[index % len(leaves)], f"file_{index}{suffix}")
+            for index in range(self.files)
+        ]
+
+
+def run_file_op(tree, op, worker):
+    """
+    Runs the operation on all the files or directories of the worker. Runs in a process of the NativeFileEngine
+    :param tree: FileTree object
+    :param op: one of the NativeFileEngine.operations
+    :param worker: number of the worker
+    :return: OpStats object of the operation
+    """
+    stats = OpStats()
+    if op == "mkdir":
+        paths = tree.dirs(worker)
+    elif op == "rmdir":
+        paths = tree.dirs(worker)[::-1]
+    else:
+        paths = tree.file_paths(worker)
+    data = os.urandom(tree.file_size) if op in ("create", "append") else b""
+    for path in paths:
+        nbytes = 0
+        start = time.time()
+        try:
+            if op == "mkdir":
+                os.mkdir(path)
+            elif op in ("create", "append"):
+                flags = os.O_CREAT | os.O_EXCL if op == "create" else os.O_APPEND
+                fd = os.open(path, flags | os.O_WRONLY, 0o644)
+                try:
+                    nbytes = os.write(fd, data)
+                finally:
+                    os.close(fd)
+            elif op == "stat":
+                os.stat(path)
+            elif op == "read":
+                with open(path, "rb", buffering=0) as fd:
+                    nbytes = len(fd.read())
+            elif op == "rename":
+                os.rename(path, f"{path}.renamed")
+            elif op == "delete":
+                os.unlink(path)
+            else:
+                os.rmdir(path)
+        except OSError as err:
+            log.debug(f"Failed to {op} {path}. Error : {err}")
+            stats.record(start, time.time(), error=True)
+        else:
+            stats.record(start, time.time(), nbytes)
+    return stats
+
+
+class NativeFileEngine:
+    """
+    Built-in small file workload, run on any directory. Eg : the CephFS mount, or a local directory.
+
+    The operations are run one after another, each as a phase of the CephFS workload, by a pool of worker
+    processes, so that the load scales across the cores of the client. Every worker runs the operation on all
+    the files ( or directories ) of its own tree before the next operation is started. The latency histogram of
+    every operation, and the files/sec ( dirs/sec for mkdir and rmdir ) of every phase are recorded.
+    """
+
+    operations = (
+        "mkdir",
+        "create",
+        "append",
+        "stat",
+        "read",
+        "rename",
+        "delete",
+        "rmdir",
+    )
+
+    def __init__(self, top):
+        """
+        Collecting the config specified in the CephFS section
+        :param top: directory the files are written in
+        """
+        section = config["CephFS"]
+        self.workers = int(section["num_threads"])
+        self.tree = FileTree(
+            top,
+            int(section["num_files"]),
+            int(section["file_size"]) * 1024,
+            int(section.get("dirs_per_level", 4)),
+            int(section.get("levels", 2)),
+        )
+        self.ops = section.get("operations") or list(self.operations)
+
+    def run(self):
+        """
+        Runs all the operations
+        :return: None
+        """
+        unknown = set(self.ops) - set(self.operations)
+        if unknown:
+            log.error(f"Unknown file operations {unknown} given. Skipping the file IO")
+            return
+        log.info(
+            f"Running the file operations {self.ops} in {self.tree.top} with {self.workers} processes"
+        )
+        os.makedirs(self.tree.top, exist_ok=True)
+        # The workers are started from a forkserver, as forking this process would copy the locks held by its
+        # sampler and exporter threads into the workers. The forkserver imports this script again, and is given
+        # the run ID so that it logs into the same file
+        os.environ["INSTANT_IO_RUN_ID"] = unique_id
+        context = multiprocessing.get_context("forkserver")
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context
+        ) as executor:
+            # starting the workers before the first phase, so that their start up is not timed
+            concurrent.futures.wait(
+                [executor.submit(os.getpid) for _ in range(self.workers)]
+            )
+            for op in self.ops:
+                with metrics.phase("CephFS", op):
+                    start = time.time()
+                    futures = [
+                        executor.submit(run_file_op, self.tree, op, worker)
+                        for worker in range(self.workers)
+                    ]
+                    stats = metrics.op_stats("CephFS", op)
+                    done = 0
+                    for future in futures:
+                        worker_stats = future.result()
+                        stats.merge(worker_stats)
+                        done += worker_stats.hist.count
+                    elapsed = time.time() - start
+                    unit = "dirs" if op in ("mkdir", "rmdir") else "files"
+                    metrics.record_result(
+                        "CephFS",
+                        op,
+                        "native",
+                        {
+                            unit: done,
+                            "elapsed_secs": round(elapsed, 3),
+                            f"{unit}_per_sec": (
+                                round(done / elapsed, 2) if elapsed else 0
+                            ),
+                        },
+                    )
+                if op == "rename":
+                    self.tree.renamed = True
+        if "rmdir" in self.ops:
+            try:
+                os.rmdir(self.tree.top)
+            except OSError as err:
+                log.debug(f"Could not remove {self.tree.top}. Error : {err}")
+
+
+def filter_buckets(bucket_list):
+    """
+    Removes the buckets that should not be written to, as per the "avoid_user_created_bkts" param of the RGW config
+    :param bucket_list: list of the names of all the buckets
+    :return: list of the names of the buckets that can be written to
+    """
+    user_val = config["RGW"]["avoid_user_created_bkts"]
+    if not user_val:
+        return bucket_list
+    if user_val.upper() == "ALL":
+        bucket_li = [bkt for bkt in bucket_list if unique_id in bkt]
+    else:
+        ignore_list = [bkt.strip() for bkt in user_val.split(",")]
+        bucket_li = [bkt for bkt in bucket_list if bkt not in ignore_list]
+    log.debug(
+        f"The list of buckets after removing the user provided exclude list is :\n{bucket_li}"
+    )
+    return bucket_li
+
+
+def run_rgw_io():
+    """
+    Creates object of class RgwIoTools and runs IO
+    :return: None
+    """
+    con = f"1. Create a RGW admin user with the keys : {config['RGW']['create_rgw_user']}\n"
+    con1 = (
+        f"4. The Secret Key provided is :{config['RGW']['secret_key']}\n"
+        f"5. The access Key provided is :{config['RGW']['access_key']}\n"
+    )
+    con2 = (
+        f"2. Number of buckets being created : {config['RGW']['num_buckets']}\n"
+        f"3. Number of objects in each bucket: {config['RGW']['num_objects']}\n"
+    )
+    con3 = f"6. Downloading the objects and placing them in folder : object_downloads_{unique_id} "
+    log.info(
+        f"\n\nTriggering  RGW IO using BOTO tool with the below config :\n {con}{con2}"
+    )
+    if config["RGW"]["create_rgw_user"]:
+        log.info(con1)
+    if config["RGW"]["download_objects"]:
+        log.info(con3)
+    try:
+        get_multipart_config()
+    except ValueError as err:
+        log.error(f"Invalid multipart config for RGW. Exiting. Error : {err}")
+        return
+
+    if config["RGW"].get("engine", "boto") == "async":
+        log.info("Running RGW IO using the async engine")
+        asyncio.run(run_rgw_async_io())
+        log.info("Finished Running RGW IO using the async engine")
+        return
+
+    rgw_obj = RgwIoTools()
+    # Creating no of buckets specified in the config
+    if config["RGW"]["create_bkt_obj"]:
+        log.debug("Creating new buckets")
+        with metrics.phase("RGW", "create buckets"):
+            rgw_obj.create_buckets(quantity=config["RGW"]["num_buckets"])
+
+    # Listing all the Newly created buckets
+    dict_buckets = rgw_obj.list_buckets()
+    bucket_list = [keys for keys in dict_buckets.keys()]
+    log.debug(
+        f"all the buckets Present for the given User are are : {str(bucket_list)}"
+    )
+
+    if config["RGW"]["create_bkt_obj"]:
+        # creating objects in each bucket as provided in the config file
+        bucket_li = filter_buckets(bucket_list)
+        open_loop = config["RGW"].get("open_loop", {})
+        arrivals = None
+        if open_loop.get("trigger"):
+            arrivals = OpenLoopArrivals(
+                open_loop["ops_per_sec"],
+                arrival=open_loop.get("arrival", "poisson"),
+                max_backlog=open_loop.get("max_backlog", 1000),
+            )
+            log.info(
+                f"Creating the objects in open loop, with {arrivals.arrival} arrivals at {arrivals.rate} ops/sec"
+            )
+        with metrics.phase("RGW", "put objects"):
+            obj = rgw_obj.create_objects(
+                buckets=bucket_li,
+                quantity=config["RGW"]["num_objects"],
+                arrivals=arrivals,
+            )
+        log.debug(f"all the objects created : {str(obj)}")
+
+    with metrics.phase("RGW", "list objects"):
+        # Listing the contents of a single bucket
+        no_keys = sum(1 for _ in rgw_obj.list_bucket_content(bucket=bucket_list[0]))
+        log.info(f"Number of objects in the bucket {bucket_list[0]} : {no_keys}")
+
+        # Listing contents of all the buckets created
+        no_keys = sum(1 for _ in rgw_obj.list_bucket_content())
+        log.info(f"Number of objects in all the buckets : {no_keys}")
+
+    # Downloading the objects created and placing them in the folder
+    # bucket_name = bucket_list[0]
+    # bkt_content_single = rgw_obj.list_bucket_content(bucket=bucket_name)
+    # Selecting the 1st object from the bucket to be deleted
+    # single_key = bkt_content_single[bucket_name][0].name
+
+    # command for downloading 1 the object in the given bucket with the key provided
+    # rgw_obj.download_boto_objects(bucket=bucket_name, key=single_key)
+
+    # downloading all the objects in all the buckets
+    if config["RGW"]["download_objects"]:
+        with metrics.phase("RGW", "get objects"):
+            for names in bucket_list:
+                log.info(f"Downloading objects for bucket : {names}")
+                rgw_obj.download_boto_objects(bucket=names)
+                no_urls = sum(1 for _ in rgw_obj.generate_boto_obj_url(bucket=names))
+                log.debug(f"Generated {no_urls} URL's for bucket {names}")
+
+    # Selecting a single key and deleting a single object by providing object key and the bucket name
+    # bucket_name = li[0]
+    # Selecting the 1st object from the bucket to be deleted
+    # single_key = bkt_content_single[bucket_name][0].name
+    # rgw_obj.delete_boto_object(bucket=bucket_name, key=single_key)
+    # bkt_content_single = rgw_obj.list_bucket_content(bucket=li[0])
+    # log.debug(f"contents of bucket after deleting a single key {single_key} is given below\n{bkt_content_single}")
+
+    # running the steady state mixed workload on the buckets that can be written to
+    autotune = config.get("Autotune", {}).get("trigger", False)
+    if config["RGW"].get("mixed_workload", {}).get("trigger") or autotune:
+        bucket_li = filter_buckets(bucket_list)
+        if bucket_li:
+            rgw_obj.run_mixed_workload(bucket_li, autotune=autotune)
+        else:
+            log.error("No buckets present to run the mixed workload on")
+
+    # deleting all the objects and the buckets created
+    if config["RGW"]["delete_buckets_and_objects"]:
+        # deleting buckets and objects only if they have been created by the script, other wise leaving them intact.
+        bucket_list = [bkt for bkt in bucket_list if unique_id in bkt]
+        with metrics.phase("RGW", "delete buckets and objects"):
+            start = time.time()
+            deleted = rgw_obj.delete_buckets(bucket_list)
+            elapsed = time.time() - start
+            metrics.record_result(
+                "RGW",
+                "delete buckets and objects",
+                "cleanup",
+                {
+                    "buckets": len(bucket_list),
+                    "objects": deleted,
+                    "elapsed_secs": round(elapsed, 3),
+                    "deletes_per_sec": round(deleted / elapsed, 2) if elapsed else 0,
+                },
+            )
+        list_buckets = rgw_obj.list_buckets()
+        log.debug(
+            f"\n\n\nAfter deleting all the buckets {str(list_buckets.keys())}\n\n\n"
+        )
+    log.info("Finished Running RGW IO using BOTO tool")
+
+
+async def run_rgw_async_io():
+    """
+    Creates object of class AsyncRgwIoTools inside the event loop and runs IO
+    :return: None
+    """
+    await AsyncRgwIoTools().run()
+
+
+def run_rados_io():
+    """
+    Creates object of class RadosIoTools and runs IO
+    :return: None
+    """
+    log.info(
+        f"Option present to run Rados bench on the given Host with config :\n\n {config['Rados_Bench']}\n\n"
+    )
+    block_size = config["Rados_Bench"]["Size"]
+    dur_write = config["Rados_Bench"]["write_seconds"]
+    dur_read = config["Rados_Bench"]["write_seconds"]
+
+    if config["Rados_Bench"].get("engine", "bench") != "bench":
+        run_native_io("Rados_Bench")
+        return
+
+    # The pools created before a failure are removed along with the other resources of the workload
+    try:
+        if config["Rados_Bench"].get("concurrent_pools"):
+            run_concurrent_rados_io(block_size, dur_write, dur_read)
+            return
+
+        for i in range(config["Rados_Bench"]["no_pools"]):
+            name = RadosIoTools()
+            name.bench_write_ops(bsize=block_size, duration=dur_write)
+            name.bench_read_ops(duration=dur_read)
+
+            # Deleting the benckmark objects created
+            if config["Rados_Bench"]["delete_bench_data"]:
+                name.bench_cleanup()
+    except CommandError as err:
+        log.error(f"Failed to set up the pools for Rados bench. Exiting. Error : {err}")
+
+
+def run_concurrent_rados_io(block_size, dur_write, dur_read):
+    """
+    Creates all the pools in parallel, and runs rados bench on all of them at the same time.
+    The metrics of all the pools are combined into cluster wide totals for every phase.
+    :param block_size: block size to write
+    :param dur_write: no of seconds to write the bench objects
+    :param dur_read: no of seconds to read the bench objects
+    :return: None
+    """
+    no_pools = config["Rados_Bench"]["no_pools"]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=no_pools) as executor:
+        pools = list(executor.map(RadosIoTools, range(1, no_pools + 1)))
+        log.info(
+            f"Created {no_pools} pools, running rados bench on all of them at once"
+        )
+
+        write_results = list(
+            executor.map(
+                lambda pool: pool.bench_write_ops(bsize=block_size, duration=dur_write),
+                pools,
+            )
+        )
+        # the pools whose rados bench failed have no metrics
+        write_results = [result for result in write_results if result]
+        if write_results:
+            metrics.record_result(
+                "Rados_Bench",
+                "write",
+                "cluster",
+                aggregate_rados_bench_results(write_results),
+            )
+
+        read_results = list(
+            executor.map(lambda pool: pool.bench_read_ops(duration=dur_read), pools)
+        )
+        for phase in ("seq", "rand"):
+            phase_results = [
+                result[phase] for result in read_results if phase in result
+            ]
+            if phase_results:
+                metrics.record_result(
+                    "Rados_Bench",
+                    phase,
+                    "cluster",
+                    aggregate_rados_bench_results(phase_results),
+                )
+
+        # Deleting the benckmark objects created
+        if config["Rados_Bench"]["delete_bench_data"]:
+            list(executor.map(RadosIoTools.bench_cleanup, pools))
+
+
+def run_native_io(workload):
+    """
+    Runs the IO of the workload with the NativeIoEngine, on the backend selected by the "engine" param.
+    The pool and the image are created with the ceph and rbd commands, as for the tools
+    :param workload: Rados_Bench or RBD
+    :return: None
+    """
+    section = config[workload]
+    params = section.get("native_engine", {})
+    engine = section["engine"]
+    if workload == "Rados_Bench":
+        object_size = parse_size(section["Size"])
+        delete_data = section["delete_bench_data"]
+    else:
+        object_size = parse_size(section["block_size"])
+        delete_data = section["delete_file_data"]
+    queue_depth = int(params.get("queue_depth", 16))
+    working_set = int(params.get("working_set", 1024))
+    ceph_conf = params.get("ceph_conf", "/etc/ceph/ceph.conf")
+
+    if engine == "memory":
+        backend = MemoryBackend(queue_depth)
+    elif engine == "file":
+        backend = FileBackend(
+            f"native_io_{workload}_{unique_id}.img", object_size, queue_depth
+        )
+    elif engine in ("librados", "librbd"):
+        if rados is None:
+            log.error(
+                f"The python rados and rbd bindings are needed for the {engine} engine. Install the"
+                f" python3-rados and python3-rbd packages. Skipping the {workload} IO"
+            )
+            return
+        if engine == "librados":
+            try:
+                pool_name = RadosIoTools().pool_name
+            except CommandError as err:
+                log.error(
+                    f"Failed to set up the pool for the native engine. Exiting. Error : {err}"
+                )
+                return
+            backend = LibradosBackend(pool_name, ceph_conf)
+        else:
+            try:
+                rbd_obj = RbdFioTools(map_image=False)
+            except CommandError as err:
+                log.error(
+                    f"Failed to set up the rbd image for the native engine. Exiting. Error : {err}"
+                )
+                return
+            working_set = min(working_set, rbd_obj.image_size_mb * 2**20 // object_size)
+            backend = LibrbdBackend(
+                rbd_obj.pool_name, rbd_obj.image_name, object_size, ceph_conf
+            )
+    else:
+        log.error(f"Unknown engine {engine} given for {workload}. Skipping the IO")
+        return
+
+    try:
+        NativeIoEngine(
+            backend,
+            workload,
+            object_size,
+            queue_depth,
+            working_set,
+            float(params.get("read_percent", 70)),
+        ).run(params.get("seconds", 60))
+        if delete_data:
+            backend.cleanup(working_set)
+    finally:
+        backend.close()
+
+
+def run_block_io():
+    """
+    Creates object of class RbdFioTools and runs IO
+    :return: None
+    """
+    log.info(
+        f"Option present to run FIO on the given Host with config :\n\n {config['RBD']}\n\n"
+    )
+    if config["RBD"].get("engine", "fio") != "fio":
+        run_native_io("RBD")
+        return
+
+    RbdFioTools.complete_prereqs()
+    try:
+        rbd_obj = RbdFioTools()
+    except CommandError as err:
+        log.error(
+            f"Failed to set up the rbd image for running FIO. Exiting. Error : {err}"
+        )
+        return
+    rbd_obj.fio_write_ops()
+    rbd_obj.fio_read_ops()
+    rbd_obj.fio_readwrite_ops()
+
+
+def run_native_file_io(top):
+    """
+    Runs the native file engine once, or again and again while the Autotuner changes the number of processes
+    every window, when enabled in the Autotune section of the config file
+    :param top: directory the files are written in
+    :return: None
+    """
+    if not config.get("Autotune", {}).get("trigger"):
+        NativeFileEngine(top).run()
+        return
+
+    def run_window(seconds):
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            NativeFileEngine(top).run()
+
+    Autotuner(
+        "CephFS",
+        lambda workers: set_workload_param("CephFS", ("num_threads",), workers),
+    ).run(run_window)
+
+
+def run_file_io():
+    """
+    Creates object of class SmallFileTools and runs IO, with the native engine or the smallfile tool
+    :return: None
+    """
+    engine = config["CephFS"].get("engine", "native")
+    mount_path = config["CephFS"].get("mount_path")
+    if engine == "native" and mount_path:
+        run_native_file_io(mount_path)
+        return
+
+    if engine == "smallfile" and not os.path.isdir("smallfile"):
+        run_command(
+            [
+                "git",
+                "clone",
+                "https://github.com/distributed-system-analysis/smallfile.git",
+            ],
+            workload="CephFS",
+        )
+    if not SmallFileTools.complete_prereqs(check_smallfile=engine == "smallfile"):
+        log.error("Some pre-reqs for running smallfile IO not completed. Exiting.")
+        return
+    try:
+        file_obj = SmallFileTools()
+    except CommandError as err:
+        log.error(
+            f"Failed to set up CephFS for running smallfile IO. Exiting. Error : {err}"
+        )
+        return
+    if engine == "native":
+        run_native_file_io(file_obj.mnt_pnt)
+        return
+    # smallfile prints nothing till an operation completes, so there is no progress to put on the timeline
+    log.info(
+        "smallfile reports its metrics only once every operation completes, no interval metrics are recorded for it"
+    )
+    file_obj.run_file_write_ops()
+    file_obj.run_file_read_ops()
+
+
+workload_runners = {
+    "RGW": run_rgw_io,
+    "Rados_Bench": run_rados_io,
+    "RBD": run_block_io,
+    "CephFS": run_file_io,
+}
+
+# params of every workload set by the soak mode, given as paths in the workload section. The load of every step is
+# set through the "concurrency" params, and the time params are set to the given share of the step duration
+soak_params = {
+    "RGW": {
+        "concurrency": [("rgw_concurrency",), ("async_concurrency",)],
+        "time": [(("mixed_workload", "seconds"), 1)],
+    },
+    "Rados_Bench": {
+        "concurrency": [("concurrent_ios",), ("native_engine", "queue_depth")],
+        # rados bench runs the write, sequential read and random read each for "write_seconds"
+        "time": [(("write_seconds",), 1 / 3), (("native_engine", "seconds"), 1)],
+    },
+    "RBD": {
+        "concurrency": [("num_parallel_jobs",), ("native_engine", "queue_depth")],
+        # fio is run for the write, read and read/write jobs
+        "time": [(("run_time",), 1 / 3), (("native_engine", "seconds"), 1)],
+    },
+    "CephFS": {"concurrency": [("num_threads",)], "time": []},
+}
+
+
+def set_workload_param(workload, path, value):
+    """
+    Sets the param in the config section of the workload
+    :param workload: name of the workload
+    :param path: keys of the param in the section. Eg : ("native_engine", "seconds")
+    :param value: value of the param
+    :return: None
+    """
+    section = config[workload]
+    for key in path[:-1]:
+        section = section.setdefault(key, {})
+    section[path[-1]] = value
+
+
+class SoakStep:
+    """
+    Metrics of one step of a soak run, collected from the interval metrics of the workload.
+
+    Only the counters and one fixed size latency histogram are kept, so that the memory used does not grow with
+    the length of the step. The latencies of the operations timed in-process are merged from their interval
+    histograms, and the latencies reported by rados bench are recorded once for every operation of the interval.
+    """
+
+    def __init__(self, workload, concurrency):
+        """
+        :param workload: name of the workload
+        :param concurrency: load of the step
+        """
+        self.workload = workload
+        self.concurrency = concurrency
+        self.hist = LatencyHistogram()
+        self.ops = 0
+        self.bytes = 0
+        self.errors = 0
+        self.start = time.time()
+        self.lock = threading.Lock()
+
+    def observe(self, row, hist):
+        """
+        Adds the interval metrics of an operation of the workload. The admin commands are not counted
+        :param row: dictionary of the interval metrics
+        :param hist: latency histogram of the interval, None for the metrics parsed from the tools
+        :return: None
+        """
+        if row["workload"] != self.workload or row["op"].startswith("cmd "):
+            return
+        ops = row.get("ops")
+        if ops is None:
+            ops = row.get("ops_per_sec", 0) * metrics.interval_secs
+        secs = ops / row["ops_per_sec"] if row.get("ops_per_sec") else 0
+        with self.lock:
+            self.ops += ops
+            self.bytes += row.get("mb_per_sec", 0) * 2**20 * secs
+            self.errors += row.get("errors", 0)
+            if hist is not None:
+                self.hist.merge(hist)
+            elif row.get("lat_ms") is not None and ops:
+                self.hist.record(row["lat_ms"] / 1000, count=int(ops))
+
+    def summary(self):
+        """
+        Summarizes the step
+        :return: dictionary of the concurrency, ops/sec, MB/s, error percentage and latencies of the step
+        """
+        elapsed = time.time() - self.start
+        with self.lock:
+            total = self.ops + self.errors
+            return {
+                "concurrency": self.concurrency,
+                "elapsed_secs": round(elapsed, 3),
+                "ops": round(self.ops),
+                "errors": self.errors,
+                "error_percent": round(self.errors * 100 / total, 3) if total else 0,
+                "ops_per_sec": round(self.ops / elapsed, 2) if elapsed else 0,
+                "mb_per_sec": round(self.bytes / elapsed / 2**20, 2) if elapsed else 0,
+                "p50_ms": self.hist.percentile(50) / 1000,
+                "p99_ms": self.hist.percentile(99) / 1000,
+                "max_ms": self.hist.max / 1000,
+            }
+
+
+def run_soak(workload):
+    """
+    Runs the workload in soak mode, as per the Soak section of the config file.
+
+    The load is ramped up in steps, setting the concurrency params of the workload to the next value of "steps"
+    for every step, and holding the last value once all the steps are done. Within a step the workload is run
+    again and again till the step duration is over. The soak is stopped once the p99 latency or the error
+    percentage of a step breaches the SLO, or once "duration_minutes" is over. The metrics of every step are
+    recorded, along with the step with the highest throughput that met the SLO
+    :param workload: name of the workload
+    :return: None
+    """
+    soak = config["Soak"]
+    step_secs = soak.get("step_minutes", 10) * 60
+    end = time.time() + soak.get("duration_minutes", 480) * 60
+    slo_p99_ms = soak.get("slo_p99_ms")
+    max_error_percent = soak.get("max_error_percent")
+    params = soak_params[workload]
+    best = None
+    for index in itertools.count():
+        now = time.time()
+        if now >= end:
+            log.info(f"Soak duration of {workload} is over")
+            break
+        concurrency = soak["steps"][min(index, len(soak["steps"]) - 1)]
+        deadline = min(now + step_secs, end)
+        for path in params["concurrency"]:
+            set_workload_param(workload, path, concurrency)
+        for path, share in params["time"]:
+            set_workload_param(workload, path, max(1, int((deadline - now) * share)))
+        log.info(
+            f"Soak step {index + 1} of {workload} with concurrency {concurrency} for {deadline - now:.0f} secs"
+        )
+
+        step = SoakStep(workload, concurrency)
+        metrics.interval_observers.append(step.observe)
+        try:
+            while time.time() < deadline:
+                workload_runners[workload]()
+                # the resources of every run are torn down before the next run, so that they do not pile up
+                resources.teardown(workload)
+        finally:
+            metrics.interval_observers.remove(step.observe)
+        result = step.summary()
+        breaches = []
+        if slo_p99_ms is not None and result["p99_ms"] > slo_p99_ms:
+            breaches.append(f"p99 latency {result['p99_ms']} ms over {slo_p99_ms} ms")
+        if (
+            max_error_percent is not None
+            and result["error_percent"] > max_error_percent
+        ):
+            breaches.append(
+                f"errors {result['error_percent']}% over {max_error_percent}%"
+            )
+        result["slo_met"] = not breaches
+        metrics.record_result(workload, "soak", f"step {index + 1}", result)
+        if breaches:
+            log.info(
+                f"SLO breached by {workload} in step {index + 1} : {', '.join(breaches)}"
+            )
+            break
+        if best is None or result["ops_per_sec"] > best["ops_per_sec"]:
+            best = dict(result, step=index + 1)
+
+    if best:
+        metrics.record_result(workload, "soak", "max_sustainable", best)
+    else:
+        log.info(f"No step of the soak run of {workload} met the SLO")
+
+
+class Autotuner:
+    """
+    Closed loop tuner looking for the knee of the throughput / latency curve of a workload.
+
+    The workload is measured in windows, and the concurrency is changed after every window the AIMD way. It is
+    doubled while the throughput keeps growing ( slow start ), then raised by "increase" every window, and
+    multiplied by "decrease" once the p99 latency breaches the SLO or the throughput stops growing over the best
+    seen at a lower concurrency. The knee is the lowest concurrency giving the highest throughput within the SLO.
+    The windows are measured with SoakStep, from the interval metrics of the workload.
+    """
+
+    def __init__(self, workload, apply):
+        """
+        Collecting the config specified in the Autotune section
+        :param workload: name of the workload
+        :param apply: callable setting the concurrency of the workload
+        """
+        tune = config["Autotune"]
+        self.workload = workload
+        self.apply = apply
+        self.min = int(tune.get("min_concurrency", 1))
+        self.max = int(tune.get("max_concurrency", 256))
+        self.start = int(tune.get("start_concurrency", self.min))
+        self.increase = int(tune.get("increase", 4))
+        self.decrease = float(tune.get("decrease", 0.5))
+        self.window_secs = float(tune.get("window_seconds", 30))
+        self.windows = int(tune.get("windows", 20))
+        self.slo_p99_ms = tune.get("slo_p99_ms")
+        self.min_gain = float(tune.get("min_gain_percent", 5)) / 100
+        self.knee = None
+
+    def clamp(self, concurrency):
+        """
+        :param concurrency: concurrency asked for
+        :return: concurrency within the min and max concurrency
+        """
+        return max(self.min, min(self.max, int(concurrency)))
+
+    def run(self, run_window):
+        """
+        Runs all the windows, and records the knee found
+        :param run_window: callable running the workload for the given number of seconds
+        :return: dictionary of the concurrency, throughput and latencies at the knee, None if no window met the SLO
+        """
+        concurrency = self.clamp(self.start)
+        slow_start = True
+        # reporting the operations run before the tuning, so that they do not count in the first window
+        metrics.add_intervals(
+            metrics.take_intervals(self.workload, metrics.interval_secs)
+        )
+        for window in range(1, self.windows + 1):
+            self.apply(concurrency)
+            step = SoakStep(self.workload, concurrency)
+            metrics.interval_observers.append(step.observe)
+            try:
+                run_window(self.window_secs)
+                # collecting the operations of the window not yet sampled, so that they count in this window
+                metrics.add_intervals(
+                    metrics.take_intervals(self.workload, metrics.interval_secs)
+                )
+            finally:
+                metrics.interval_observers.remove(step.observe)
+            result = step.summary()
+
+            knee = self.knee
+            within_slo = self.slo_p99_ms is None or result["p99_ms"] <= self.slo_p99_ms
+            gain = knee is None or result["ops_per_sec"] > knee["ops_per_sec"] * (
+                1 + self.min_gain
+            )
+            if within_slo and (
+                gain
+                or concurrency < knee["concurrency"]
+                and result["ops_per_sec"] >= knee["ops_per_sec"] * (1 - self.min_gain)
+            ):
+                self.knee = dict(result, window=window)
+            congested = not within_slo or (
+                knee is not None and concurrency > knee["concurrency"] and not gain
+            )
+            result.update(within_slo=within_slo, congested=congested)
+            metrics.record_result(self.workload, "autotune", f"window {window}", result)
+
+            if congested:
+                slow_start = False
+                concurrency = self.clamp(concurrency * self.decrease)
+            elif slow_start:
+                concurrency = self.clamp(concurrency * 2)
+            else:
+                concurrency = self.clamp(concurrency + self.increase)
+
+        if self.knee:
+            metrics.record_result(self.workload, "autotune", "knee", self.knee)
+        else:
+            log.info(f"No window of {self.workload} met the latency SLO")
+        return self.knee
+
+
+def run_workload(name):
+    """
+    Runs the workload once, or in soak mode when enabled in the Soak section of the config file
+    :param name: name of the workload
+    :return: None
+    """
+    if config.get("Soak", {}).get("trigger"):
+        run_soak(name)
+    else:
+        workload_runners[name]()
+
+
+def stop_workload(signum, frame):
+    """
+    Signal handler used by the workload processes to stop the workload once its duration is over
+    :param signum: signal number received
+    :param frame: current stack frame
+    :return: None
+    """
+    raise SystemExit(f"Received signal {signum}, stopping the workload")
+
+
+def run_scheduled_workload(name, start_at, timeline_queue, run_start):
+    """
+    Runs the workload in a worker process started by the WorkloadScheduler.
+
+    Waits till the start time of the workload, runs it while sending the interval metrics of its
+    operations to the scheduler, and finally sends all its results to the scheduler
+    :param name: name of the workload. Eg : RGW
+    :param start_at: epoch time at which the workload should be started
+    :param timeline_queue: multiprocessing queue used to send the metrics to the scheduler
+    :param run_start: epoch time at which the run started, so that the timeline of every workload is aligned
+    :return: None
+    """
+    # own process group, so that the tools run by the workload are stopped along with it
+    os.setpgrp()
+    signal.signal(signal.SIGTERM, stop_workload)
+    metrics.persist = False
+    metrics.start_time = run_start
+    if config.get("Soak", {}).get("trigger"):
+        metrics.limit_series(int(config["Soak"].get("timeline_rows", 10000)))
+    metrics.interval_sink = lambda row: timeline_queue.put(("interval", row))
+    if config.get("Scheduler", {}).get("metrics_port"):
+        metrics.snapshot_sink = lambda workload, snapshot: timeline_queue.put(
+            ("snapshot", workload, snapshot)
+        )
+
+    time.sleep(max(0.0, start_at - time.time()))
+    log.info(f"Starting workload {name} in process {os.getpid()}")
+    try:
+        with metrics.interval_sampler(name):
+            try:
+                run_workload(name)
+            finally:
+                resources.teardown(name)
+    except SystemExit as err:
+        log.info(f"Workload {name} stopped : {err}")
+    except Exception as err:
+        log.error(f"An error occurred when running the workload {name}. Error : {err}")
+    finally:
+        timeline_queue.put(("results", name, metrics.to_dict()))
+
+
+class WorkloadScheduler:
+    """
+    Runs all the enabled workloads at the same time, each in its own worker process.
+
+    Every workload can be started after a "start_delay" and stopped after a "duration" ( in seconds ), given in
+    its section of the config file. The interval metrics of all the workloads are collected on one shared
+    timeline, which is logged as it arrives and stored in the results file.
+    """
+
+    def __init__(self):
+        """
+        Collecting the workloads enabled in the config file
+        """
+        self.workloads = [name for name in workload_runners if config[name]["trigger"]]
+        # The workloads are started from a forkserver, as forking this process would copy the locks held by its
+        # sampler and exporter threads into the workloads. The forkserver imports this script again, and is
+        # given the run ID so that the workloads log into the same file and record into the same manifest
+        os.environ["INSTANT_IO_RUN_ID"] = unique_id
+        self.context = multiprocessing.get_context("forkserver")
+        self.timeline_queue = self.context.Queue()
+
+    def handle_message(self, message, pending):
+        """
+        Handles a message sent by a workload process
+        :param message: interval metrics or the final results of a workload
+        :param pending: set of the workloads whose results are not yet received
+        :return: None
+        """
+        if message[0] == "interval":
+            metrics.add_intervals([message[1]])
+        elif message[0] == "snapshot":
+            _, name, snapshot = message
+            with metrics.lock:
+                metrics.remote_stats[name] = snapshot
+        else:
+            _, name, results = message
+            metrics.merge_results(results)
+            pending.discard(name)
+            log.info(f"Received the results of workload {name}")
+
+    def run(self):
+        """
+        Starts the workloads, stops them once their duration is over and collects their metrics
+        :return: None
+        """
+        start = time.time()
+        processes = {}
+        for name in self.workloads:
+            delay = config[name].get("start_delay", 0) or 0
+            duration = config[name].get("duration")
+            process = self.context.Process(
+                target=run_scheduled_workload,
+                args=(name, start + delay, self.timeline_queue, metrics.start_time),
+                name=f"instant-io-{name}",
+            )
+            process.start()
+            deadline = start + delay + duration if duration else None
+            processes[name] = (process, deadline)
+            log.info(
+                f"Scheduled workload {name} in process {process.pid} with start delay {delay} secs"
+                f" and duration {duration or 'till completion'}"
+            )
+
+        pending = set(processes)
+        while pending:
+            try:
+                self.handle_message(self.timeline_queue.get(timeout=1), pending)
+            except queue.Empty:
+                pass
+            for name in list(pending):
+                process, deadline = processes[name]
+                if deadline and time.time() > deadline and process.is_alive():
+                    log.info(f"Duration of workload {name} is over, stopping it")
+                    os.killpg(process.pid, signal.SIGTERM)
+                    processes[name] = (process, None)
+                elif not process.is_alive() and self.timeline_queue.empty():
+                    log.error(
+                        f"Workload {name} exited with code {process.exitcode} without sending results"
+                    )
+                    pending.discard(name)
+        for process, _ in processes.values():
+            process.join()
+        log.info(f"All the workloads completed in {time.time() - start:.2f} secs")
+
+
+def run_enabled_workloads():
+    """
+    Runs the workloads enabled in the config file, one after another, or all at the same time when
+    "parallel" is set in the Scheduler section
+    :return: None
+    """
+    if config.get("Scheduler", {}).get("parallel"):
+        WorkloadScheduler().run()
+        return
+    for workload in workload_runners:
+        if config[workload]["trigger"]:
+            with metrics.interval_sampler(workload):
+                try:
+                    run_workload(workload)
+                finally:
+                    resources.teardown(workload)
+
+
+class JsonLineChannel:
+    """
+    Newline delimited JSON messages exchanged over a TCP connection, between the coordinator and an agent
+    """
+
+    def __init__(self, sock):
+        """
+        :param sock: connected socket
+        """
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+        self.lock = threading.Lock()
+
+    def send(self, message):
+        """
+        Sends a message. Can be called from several threads
+        :param message: dictionary to be sent
+        :return: None
+        """
+        data = (json.dumps(message) + "\n").encode()
+        with self.lock:
+            self.sock.sendall(data)
+
+    def receive(self):
+        """
+        Waits for the next message
+        :return: dictionary received, None once the connection is closed
+        """
+        line = self.reader.readline()
+        return json.loads(line) if line.strip() else None
+
+    def close(self):
+        """
+        Closes the connection
+        :return: None
+        """
+        self.reader.close()
+        self.sock.close()
+
+
+def merge_client_results(clients):
+    """
+    Combines the results of the clients of a distributed run.
+
+    The latency histograms of the same operation are merged, so that the percentiles are those of all the
+    operations of the run, which can not be derived from the percentiles of every client. The clients run at
+    the same time, so their throughputs are added up. The metrics parsed from the output of the tools carry
+    no histograms, and are only kept per client
+    :param clients: dictionary of client -> workload -> phase -> operation -> stats
+    :return: dictionary of workload -> phase -> operation -> combined stats
+    """
+    grouped = collections.defaultdict(list)
+    for workloads in clients.values():
+        for workload, phases in workloads.items():
+            for phase, ops in phases.items():
+                for op, stats in ops.items():
+                    if isinstance(stats, dict) and "histogram" in stats:
+                        grouped[(workload, phase, op)].append(stats)
+    combined = collections.defaultdict(dict)
+    for (workload, phase, op), entries in grouped.items():
+        hist = LatencyHistogram()
+        for entry in entries:
+            hist.merge(LatencyHistogram.from_dict(entry["histogram"]))
+        combined[workload].setdefault(phase, {})[op] = {
+            "ops": hist.count,
+            "errors": sum(entry["errors"] for entry in entries),
+            "bytes": sum(entry["bytes"] for entry in entries),
+            "elapsed_secs": max(entry["elapsed_secs"] for entry in entries),
+            "ops_per_sec": round(sum(entry["ops_per_sec"] for entry in entries), 2),
+            "mb_per_sec": round(sum(entry["mb_per_sec"] for entry in entries), 2),
+            "clients": len(entries),
+            "latency_ms": hist.latency_ms(),
+            "histogram": hist.to_dict(),
+        }
+    return dict(combined)
+
+
+class RunContext:
+    """
+    What a client of a distributed run is given by the coordinator : the run ID, the client number, the config
+    and the start time.
+
+    The workloads of every run are run by a new process set up from the context : it is started in a folder of
+    its own holding the config of the coordinator, with the run ID of the client, so that nothing of a run is
+    left behind in the agent or carried into the next run
+    """
+
+    def __init__(self, run_id, client, run_config, start_at):
+        """
+        :param run_id: run ID of the coordinator
+        :param client: number of the client, starting from 1
+        :param run_config: config sent by the coordinator
+        :param start_at: epoch time, on the clock of this host, at which the workloads are started
+        """
+        self.run_id = run_id
+        self.client = client
+        self.config = run_config
+        self.start_at = start_at
+
+    @classmethod
+    def from_message(cls, message):
+        """
+        Creates the context of the run sent by the coordinator
+        :param message: "run" message received from the coordinator
+        :return: RunContext object
+        """
+        # the start is sent as the time left, so that the clocks of the agents need not be in sync
+        return cls(
+            message["run_id"],
+            message["client"],
+            message["config"],
+            time.time() + message["start_in"],
+        )
+
+    @property
+    def client_id(self):
+        """
+        :return: run ID of the client, used in the names of the resources and files it creates. Eg : 20200913090428-c001
+        """
+        return f"{self.run_id}-c{self.client:03d}"
+
+    def launch(self, sock, workdir):
+        """
+        Starts the process running the workloads of the run, which reports to the coordinator over the given socket
+        :param sock: socket connected to the coordinator
+        :param workdir: folder under which the folder of the run is created
+        :return: Popen object of the process
+        """
+        folder = os.path.join(workdir, f"run_{self.client_id}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "config.json"), "w") as fd:
+            json.dump(self.config, fd, indent=2)
+        argv = [
+            sys.executable,
+            os.path.abspath(__file__),
+            "client",
+            "--fd",
+            str(sock.fileno()),
+            "--start-at",
+            repr(self.start_at),
+        ]
+        log.info(
+            f"Starting run {self.run_id} as client {self.client_id} in folder {folder}"
+        )
+        env = dict(os.environ, INSTANT_IO_RUN_ID=self.client_id)
+        # the workloads have no use for the token of the agent
+        env.pop(AGENT_TOKEN_ENV, None)
+        return Popen(argv, cwd=folder, env=env, pass_fds=[sock.fileno()])
+
+
+def run_client(channel, start_at):
+    """
+    Runs the workloads of a distributed run, in the process started by the agent from the RunContext.
+
+    The workloads are started at the shared start time, their interval metrics are streamed to the coordinator,
+    and at the end all the results are sent back
+    :param channel: JsonLineChannel connected to the coordinator
+    :param start_at: epoch time at which the workloads are started
+    :return: None
+    """
+    metrics.start_time = start_at
+    metrics.interval_sink = lambda row: channel.send({"type": "interval", "row": row})
+    if config.get("Soak", {}).get("trigger"):
+        metrics.limit_series(int(config["Soak"].get("timeline_rows", 10000)))
+    log.info(
+        f"Starting the workloads of client {unique_id} in {start_at - time.time():.2f} secs"
+    )
+    time.sleep(max(0.0, start_at - time.time()))
+    try:
+        run_enabled_workloads()
+    except Exception as err:
+        log.error(f"An error occurred when running the workloads. Error : {err}")
+        channel.send({"type": "error", "message": str(err)})
+    finally:
+        metrics.save()
+        channel.send(
+            {
+                "type": "results",
+                "host": socket.gethostname(),
+                "workloads": metrics.to_dict(),
+            }
+        )
+        channel.close()
+        log.info(f"Client {unique_id} completed, results sent to the coordinator")
+
+
+# Environment variable holding the token shared by the agents and the coordinator
+AGENT_TOKEN_ENV = "INSTANT_IO_AGENT_TOKEN"
+# Seconds the agent waits for the coordinator to answer its challenge
+AGENT_HANDSHAKE_TIMEOUT = 30
+
+
+def sign_challenge(token, nonce):
+    """
+    Proves the knowledge of the shared token without sending it over the connection
+    :param token: token shared by the agents and the coordinator
+    :param nonce: random challenge sent by the agent
+    :return: HMAC-SHA256 of the challenge with the token as key, in hex
+    """
+    return hmac.new(token.encode(), nonce.encode(), hashlib.sha256).hexdigest()
+
+
+def serve_agent(bind, port, workdir, token):
+    """
+    Waits for the coordinator to connect, and runs the workloads it sends, one run at a time.
+
+    Every connection is sent a random challenge, and the run is only accepted when it carries the challenge
+    signed with the shared token, so that no one else can make the agent run a config of their own
+    :param bind: address the agent listens on
+    :param port: port the agent listens on, 0 to pick a free port
+    :param workdir: folder under which the folder of every run is created
+    :param token: token shared with the coordinator
+    :return: None
+    """
+    with socket.create_server((bind, port)) as server:
+        log.info(f"Agent listening on {bind}:{server.getsockname()[1]}")
+        while True:
+            sock, address = server.accept()
+            log.info(
+                f"Accepted a connection from the coordinator {address[0]}:{address[1]}"
+            )
+            channel = JsonLineChannel(sock)
+            try:
+                nonce = secrets.token_hex(16)
+                sock.settimeout(AGENT_HANDSHAKE_TIMEOUT)
+                channel.send({"type": "challenge", "nonce": nonce})
+                message = channel.receive()
+                sock.settimeout(None)
+                if not message or message.get("type") != "run":
+                    log.error(
+                        f"Expected a run from the coordinator, received : {message}"
+                    )
+                    continue
+                if not hmac.compare_digest(
+                    str(message.get("auth", "")), sign_challenge(token, nonce)
+                ):
+                    log.error(
+                        f"Rejected the run sent by {address[0]}:{address[1]}, the token does not match"
+                    )
+                    channel.send(
+                        {
+                            "type": "error",
+                            "message": "the token of the agent does not match",
+                        }
+                    )
+                    continue
+                process = RunContext.from_message(message).launch(sock, workdir)
+                process.wait()
+                log.info(
+                    f"Run {message['run_id']} completed with exit code {process.returncode}"
+                )
+            except (OSError, ValueError) as err:
+                log.error(
+                    f"Failed to run the workloads sent by the coordinator. Error : {err}"
+                )
+            finally:
+                channel.close()
+
+
+class Coordinator:
+    """
+    Runs the workloads of the config file on several agents at the same time, and combines their results.
+
+    Every agent is sent the config, the run ID of the coordinator and the time left till the shared start time.
+    The interval metrics streamed by the agents are collected on one timeline, labelled with the agent, and once
+    all the agents are done their latency histograms are merged into cluster wide percentiles
+    """
+
+    def __init__(self, agents, start_delay, token):
+        """
+        :param agents: list of the agents as "host:port"
+        :param start_delay: seconds between sending the run and starting the workloads, which gives the agents
+            time to receive it
+        :param token: token shared with the agents, used to answer their challenge
+        """
+        self.agents = agents
+        self.start_delay = start_delay
+        self.token = token
+        self.clients = {}
+
+    def collect(self, agent, channel):
+        """
+        Collects the messages sent by the agent till its results are received
+        :param agent: address of the agent
+        :param channel: JsonLineChannel connected to the agent
+        :return: None
+        """
+        try:
+            while True:
+                message = channel.receive()
+                if message is None:
+                    log.error(
+                        f"Agent {agent} closed the connection without sending results"
+                    )
+                    return
+                if message["type"] == "interval":
+                    metrics.add_intervals([dict(message["row"], client=agent)])
+                elif message["type"] == "error":
+                    log.error(f"Agent {agent} failed : {message['message']}")
+                else:
+                    self.clients[agent] = message["workloads"]
+                    log.info(
+                        f"Received the results of agent {agent} ( {message['host']} )"
+                    )
+                    return
+        except OSError as err:
+            log.error(f"Lost the connection to agent {agent}. Error : {err}")
+        finally:
+            channel.close()
+
+    def run(self):
+        """
+        Starts the run on all the agents, and waits for their results
+        :return: True if the results of all the agents were received, False otherwise
+        """
+        channels = {}
+        challenges = {}
+        for agent in self.agents:
+            host, _, port = agent.rpartition(":")
+            try:
+                sock = socket.create_connection((host, int(port)), timeout=30)
+                channels[agent] = JsonLineChannel(sock)
+                challenge = channels[agent].receive()
+                if not challenge or challenge.get("type") != "challenge":
+                    raise ValueError(f"expected a challenge, received : {challenge}")
+                challenges[agent] = challenge["nonce"]
+            except (OSError, ValueError) as err:
+                log.error(f"Could not connect to agent {agent}. Error : {err}")
+                for channel in channels.values():
+                    channel.close()
+                return False
+            sock.settimeout(None)
+
+        start_at = time.time() + self.start_delay
+        metrics.start_time = start_at
+        for client, (agent, channel) in enumerate(channels.items(), start=1):
+            channel.send(
+                {
+                    "type": "run",
+                    "auth": sign_challenge(self.token, challenges[agent]),
+                    "run_id": unique_id,
+                    "client": client,
+                    "config": config,
+                    "start_at": start_at,
+                    # sent as time left, so that the clocks of the agents need not be in sync
+                    "start_in": start_at - time.time(),
+                }
+            )
+        log.info(
+            f"Started run {unique_id} on {len(channels)} agent(s), the workloads start in {self.start_delay} secs"
+        )
+        collectors = [
+            threading.Thread(target=self.collect, args=(agent, channel), daemon=True)
+            for agent, channel in channels.items()
+        ]
+        for collector in collectors:
+            collector.start()
+        for collector in collectors:
+            collector.join()
+
+        combined = merge_client_results(self.clients)
+        metrics.merge_results(combined)
+        metrics.clients = self.clients
+        for workload, phases in combined.items():
+            for phase, ops in phases.items():
+                for op, stats in ops.items():
+                    lat = stats["latency_ms"]
+                    log.info(
+                        f"Combined : {workload} : {phase} : {op} : {stats['ops']} ops from {stats['clients']}"
+                        f" client(s), {stats['errors']} errors, {stats['ops_per_sec']} ops/sec,"
+                        f" {stats['mb_per_sec']} MB/s, latency(ms) p50 {lat['p50']} p90 {lat['p90']}"
+                        f" p99 {lat['p99']} p99.9 {lat['p99.9']} max {lat['max']}"
+                    )
+        return len(self.clients) == len(self.agents)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Triggers IO on the given ceph host as per the config.json file"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    compare_parser = subparsers.add_parser(
+        "compare",
+        help="Compares the results of two or more runs against the first run given",
+    )
+    compare_parser.add_argument(
+        "results", nargs="+", help="results_IO_<timestamp>.json files of the runs"
+    )
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10,
+        help="allowed throughput drop or latency increase in percentage",
+    )
+    parse_parser = subparsers.add_parser(
+        "parse",
+        help="Parses a captured output file of a tool and prints the metrics as JSON",
+    )
+    parse_parser.add_argument(
+        "tool",
+        choices=["rados_bench", "fio", "smallfile"],
+        help="tool that generated the output",
+    )
+    parse_parser.add_argument("output_file", help="file with the captured output")
+    teardown_parser = subparsers.add_parser(
+        "teardown",
+        help="Tears down the pools, images and mounts left behind by a run",
+    )
+    teardown_parser.add_argument(
+        "manifest", help="resources_IO_<timestamp>.jsonl file of the run"
+    )
+    agent_parser = subparsers.add_parser(
+        "agent",
+        help="Waits for a coordinator and runs the workloads it sends",
+    )
+    agent_parser.add_argument(
+        "--bind",
+        default="127.0.0.1",
+        help="address to listen on. Eg : 0.0.0.0 to accept coordinators on other hosts",
+    )
+    agent_parser.add_argument(
+        "--port",
+        type=int,
+        default=7070,
+        help="port to listen on, 0 to pick a free port",
+    )
+    agent_parser.add_argument(
+        "--workdir",
+        default=".",
+        help="folder under which the folder of every run is created",
+    )
+    client_parser = subparsers.add_parser(
+        "client",
+        help="Runs the workloads of a distributed run. Started by the agent",
+    )
+    client_parser.add_argument(
+        "--fd", type=int, required=True, help="socket connected to the coordinator"
+    )
+    client_parser.add_argument(
+        "--start-at",
+        type=float,
+        required=True,
+        help="epoch time at which the workloads are started",
+    )
+    coordinator_parser = subparsers.add_parser(
+        "coordinator",
+        help="Runs the workloads on several agents at the same time and combines their results",
+    )
+    coordinator_parser.add_argument("agents", nargs="+", help="host:port of the agents")
+    coordinator_parser.add_argument(
+        "--start-delay",
+        type=float,
+        default=5,
+        help="seconds between sending the run to the agents and starting the workloads",
+    )
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        if len(args.results) < 2:
+            parser.error("at least two results files are needed for comparison")
+        sys.exit(1 if compare_runs(args.results, args.threshold) else 0)
+    if args.command == "parse":
+        output_parsers = {
+            "rados_bench": parse_rados_bench_output,
+            "fio": parse_fio_json_output,
+            "smallfile": parse_smallfile_output,
+        }
+        with open(args.output_file, "r") as fd:
+            print(json.dumps(output_parsers[args.tool](fd.read()), indent=2))
+        sys.exit(0)
+    if args.command == "teardown":
+        metrics.persist = False
+        resources.manifest = args.manifest
+        leftovers = ResourceManager.load(args.manifest)
+        log.info(f"Tearing down {len(leftovers)} resources recorded in {args.manifest}")
+        sys.exit(1 if resources.remove(leftovers) else 0)
+    token = os.environ.get(AGENT_TOKEN_ENV)
+    if args.command in ("agent", "coordinator") and not token:
+        parser.error(
+            f"the token shared by the agents and the coordinator must be set in {AGENT_TOKEN_ENV}"
+        )
+    if args.command == "agent":
+        # the results of every run are written by the process running it
+        metrics.persist = False
+        serve_agent(args.bind, args.port, args.workdir, token)
+    if args.command == "client":
+        run_client(JsonLineChannel(socket.socket(fileno=args.fd)), args.start_at)
+        sys.exit(0)
 
-if __name__ == "__main__":
     log.info("Starting the script to start instant IO on the given host")
+    exporter = None
+    if config.get("Scheduler", {}).get("metrics_port"):
+        exporter = MetricsExporter(int(config["Scheduler"]["metrics_port"]))
+        exporter.start()
+    if config.get("Soak", {}).get("trigger"):
+        metrics.limit_series(int(config["Soak"].get("timeline_rows", 10000)))
+    sampler = None
+    if config.get("Scheduler", {}).get("cluster_sample_interval"):
+        sampler = ClusterSampler(float(config["Scheduler"]["cluster_sample_interval"]))
+        sampler.start()
 
-# todo: Check if RGW node is configured or not. If not, don't trigger RGW IO
-    if config["RGW"]["trigger"]:
-        run_rgw_io()
-    if config["Rados_Bench"]["trigger"]:
-        run_rados_io()
-    if config["RBD"]["trigger"]:
-        run_block_io()
-    if config["CephFS"]["trigger"]:
-        run_file_io()
+    # todo: Check if RGW node is configured or not. If not, don't trigger RGW IO
+    completed = True
+    if args.command == "coordinator":
+        completed = Coordinator(args.agents, args.start_delay, token).run()
+    else:
+        run_enabled_workloads()
+    if sampler:
+        sampler.stop()
+    metrics.save()
+    if exporter:
+        exporter.stop()
+    log.info(f"Results of the run are present in file : results_IO_{unique_id}.json")
+    if not completed:
+        sys.exit(1)
@@ -0,0 +1,42 @@
+import importlib.util
+import os
+import shutil
+import sys
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+@pytest.fixture(scope="session")
+def io(tmp_path_factory):
+    """
+    instant-io.py loaded as a module. It is run from a scratch folder holding a copy of config.json, so that
+    the log and results files it writes do not end up in the repo
+    """
+    workdir = tmp_path_factory.mktemp("run")
+    shutil.copy(os.path.join(REPO, "config.json"), workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    spec = importlib.util.spec_from_file_location(
+        "instant_io", os.path.join(REPO, "instant-io.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["instant_io"] = module
+    spec.loader.exec_module(module)
+    yield module
+    os.chdir(cwd)
+
+
+@pytest.fixture
+def fixture_text():
+    """
+    :return: function returning the content of a file under tests/fixtures
+    """
+
+    def read(name):
+        with open(os.path.join(FIXTURES, name), "r") as fd:
+            return fd.read()
+
+    return read
@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+
+async def serve_once_per_connection(handled):
+    """
+    Starts a HTTP server that answers one request per connection and then closes it, without sending
+    "connection: close", the way an idle keep-alive connection is dropped by a load balancer
+    :return: asyncio server listening on an ephemeral port
+    """
+
+    async def handle(reader, writer):
+        request = await reader.readuntil(b"\r\n\r\n")
+        handled.append(request.split(b" ")[1].decode())
+        writer.write(b"HTTP/1.1 200 OK\r\ncontent-length: 2\r\n\r\nok")
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def test_stale_connection_is_retried_once(io):
+    async def scenario():
+        handled = []
+        server = await serve_once_per_connection(handled)
+        port = server.sockets[0].getsockname()[1]
+        conn = io.AsyncS3Connection("127.0.0.1", "key", "secret", port=port)
+        try:
+            first = await conn.request("GET", "bkt", "a")
+            # giving the server time to close the connection now sitting idle in the pool
+            await asyncio.sleep(0.1)
+            second = await conn.request("GET", "bkt", "b")
+        finally:
+            await conn.close()
+            server.close()
+            await server.wait_closed()
+        return first, second, handled
+
+    first, second, handled = asyncio.run(scenario())
+    assert first[0] == 200 and first[2] == b"ok"
+    assert second[0] == 200 and second[2] == b"ok"
+    assert handled == ["/bkt/a", "/bkt/b"]
+
+
+def test_fresh_connection_failure_is_not_retried(io):
+    attempts = []
+
+    async def scenario():
+        async def handle(reader, writer):
+            attempts.append(1)
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        conn = io.AsyncS3Connection("127.0.0.1", "key", "secret", port=port)
+        try:
+            with pytest.raises(ConnectionError):
+                await conn.request("GET", "bkt", "a")
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
+    assert len(attempts) == 1
+
+
+def test_run_workers_bounds_in_flight_and_pulls_lazily(io):
+    tools = io.AsyncRgwIoTools.__new__(io.AsyncRgwIoTools)
+    tools.concurrency = 4
+    tools.errors = 0
+    in_flight = 0
+    peak = 0
+    produced = 0
+    max_ahead = 0
+    done = []
+
+    def items():
+        nonlocal produced
+        for no in range(100):
+            produced += 1
+            yield (no,)
+
+    async def handler(no):
+        nonlocal in_flight, peak, max_ahead
+        in_flight += 1
+        peak = max(peak, in_flight)
+        max_ahead = max(max_ahead, produced - len(done))
+        try:
+            await asyncio.sleep(0.001)
+            if no == 13:
+                raise RuntimeError("failed request")
+            done.append(no)
+        finally:
+            in_flight -= 1
+
+    asyncio.run(tools.run_workers(items(), handler))
+    assert peak == 4
+    # at most one queue worth of items is pulled ahead of the workers
+    assert max_ahead <= 3 * tools.concurrency
+    assert sorted(done) == [no for no in range(100) if no != 13]
+    assert tools.errors == 1
+
+
+def test_delete_bucket_sends_one_multi_delete_per_page(io):
+    tools = io.AsyncRgwIoTools.__new__(io.AsyncRgwIoTools)
+    batches = []
+    calls = []
+
+    async def list_objects(bucket):
+        for no in range(2 * io.S3_MAX_DELETE_KEYS + 500):
+            yield f"obj_{no}", 4096
+
+    async def delete_batch(bucket, keys):
+        batches.append(list(keys))
+        return len(keys)
+
+    async def call(op, description, method, bucket, key=None, **kwargs):
+        calls.append((op, method, bucket))
+        return {}, b""
+
+    tools.list_objects = list_objects
+    tools.delete_batch = delete_batch
+    tools.call = call
+    assert asyncio.run(tools.delete_bucket("bkt")) == 2500
+    assert [len(batch) for batch in batches] == [1000, 1000, 500]
+    assert batches[2][-1] == "obj_2499"
+    assert calls == [("delete_bucket", "DELETE", "bkt")]
+
+
+@pytest.mark.parametrize("part_size", ["4m", "6g"])
+def test_part_size_out_of_the_s3_range_is_rejected(io, monkeypatch, part_size):
+    monkeypatch.setitem(io.config, "RGW", dict(io.config["RGW"], part_size=part_size))
+    with pytest.raises(ValueError, match="part_size"):
+        io.get_multipart_config()
+
+
+def test_multipart_config(io, monkeypatch):
+    rgw = dict(
+        io.config["RGW"], multipart_threshold="8m", part_size="5m", part_concurrency=2
+    )
+    monkeypatch.setitem(io.config, "RGW", rgw)
+    assert io.get_multipart_config() == (8 * 2**20, 5 * 2**20, 2)
@@ -0,0 +1,212 @@
+import hashlib
+import http.server
+import math
+import threading
+import time
+
+import pytest
+
+
+class FakeWorkload:
+    """
+    Workload standing in for RGW or CephFS : it records the operations a system with the given throughput
+    curve would complete at the current concurrency, with latencies following Little's law
+    """
+
+    def __init__(self, io, workload, throughput):
+        self.io = io
+        self.workload = workload
+        self.throughput = throughput
+        self.concurrency = None
+        self.applied = []
+
+    def apply(self, concurrency):
+        self.concurrency = concurrency
+        self.applied.append(concurrency)
+
+    def run_window(self, seconds):
+        ops_per_sec = self.throughput(self.concurrency)
+        latency = self.concurrency / ops_per_sec
+        stats = self.io.metrics.op_stats(self.workload, "op")
+        start = time.time()
+        for _ in range(int(ops_per_sec * seconds)):
+            stats.record(start, start + latency)
+        time.sleep(max(0.0, start + seconds - time.time()))
+
+
+@pytest.fixture
+def autotune_config(io, monkeypatch):
+    def configure(**params):
+        tune = {
+            "start_concurrency": 1,
+            "min_concurrency": 1,
+            "max_concurrency": 64,
+            "increase": 4,
+            "decrease": 0.5,
+            "window_seconds": 0.2,
+            "windows": 14,
+            "slo_p99_ms": 100,
+            "min_gain_percent": 5,
+        }
+        tune.update(params)
+        monkeypatch.setitem(io.config, "Autotune", tune)
+
+    return configure
+
+
+def test_stops_at_the_throughput_knee(io, autotune_config):
+    # 8 workers saturate the system, more only add latency. The windows are long enough that the
+    # scheduling jitter stays well below the 5% gain needed to move the knee
+    autotune_config(slo_p99_ms=1000, window_seconds=0.4, windows=10)
+    fake = FakeWorkload(io, "FakeSaturating", lambda workers: min(workers, 8) * 100)
+    knee = io.Autotuner(fake.workload, fake.apply).run(fake.run_window)
+    assert knee["concurrency"] == 8
+    assert knee["ops_per_sec"] == pytest.approx(800, rel=0.05)
+    # slow start doubles till the throughput stops growing, then the search stays around the knee
+    assert fake.applied[:5] == [1, 2, 4, 8, 16]
+    assert all(4 <= concurrency <= 16 for concurrency in fake.applied[5:])
+    assert io.metrics.results["FakeSaturating"]["autotune"]["knee"] == knee
+
+
+def test_stops_below_the_latency_slo(io, autotune_config):
+    # the throughput keeps growing with the concurrency, but so does the latency : 5 * sqrt(workers) ms
+    autotune_config(slo_p99_ms=14.5)
+    fake = FakeWorkload(io, "FakeLatency", lambda workers: 200 * math.sqrt(workers))
+    tuner = io.Autotuner(fake.workload, fake.apply)
+    knee = tuner.run(fake.run_window)
+    assert knee["concurrency"] == 8
+    assert knee["p99_ms"] <= 14.5
+    windows = io.metrics.results["FakeLatency"]["autotune"]
+    for name, window in windows.items():
+        if name.startswith("window"):
+            assert window["within_slo"] == (window["concurrency"] <= 8)
+            # every breach cuts the concurrency
+            if not window["within_slo"]:
+                assert window["congested"]
+    assert max(fake.applied) == 16
+
+
+def test_no_knee_when_every_window_breaches(io, autotune_config):
+    autotune_config(slo_p99_ms=1, windows=3)
+    fake = FakeWorkload(io, "FakeSlow", lambda workers: 20)
+    assert io.Autotuner(fake.workload, fake.apply).run(fake.run_window) is None
+    assert fake.applied == [1, 1, 1]
+    assert "knee" not in io.metrics.results["FakeSlow"]["autotune"]
+
+
+class SlowS3Handler(http.server.BaseHTTPRequestHandler):
+    """
+    S3 stub keeping the objects in memory. Every request is held for 5 ms while at most 4 requests are in
+    flight, and for 80 ms once more are, the way a backend gets congested past its knee
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, status, body=b"", headers=()):
+        # the status line, the headers and the body are sent in one write, so that Nagle does not hold the body
+        lines = [f"HTTP/1.1 {status} {self.responses[status][0]}"]
+        lines += [f"{name}: {value}" for name, value in headers]
+        lines.append(f"Content-Length: {len(body)}")
+        self.wfile.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+
+    def handle_slowly(self, respond):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+            congested = server.in_flight > 4
+        try:
+            time.sleep(0.08 if congested else 0.005)
+            respond()
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def do_PUT(self):
+        data = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.objects[self.path] = data
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        self.handle_slowly(lambda: self.respond(200, headers=[("ETag", etag)]))
+
+    def do_GET(self):
+        data = self.server.objects.get(self.path)
+        if data is None:
+            self.handle_slowly(
+                lambda: self.respond(404, b"<Error><Code>NoSuchKey</Code></Error>")
+            )
+            return
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        self.handle_slowly(lambda: self.respond(200, data, [("ETag", etag)]))
+
+
+@pytest.fixture
+def slow_s3():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SlowS3Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.objects = {}
+    server.in_flight = 0
+    server.peak = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_rgw_mixed_workload_backs_off_and_recovers(
+    io, autotune_config, monkeypatch, slow_s3
+):
+    autotune_config(
+        max_concurrency=8, increase=1, slo_p99_ms=40, window_seconds=0.5, windows=9
+    )
+    rgw = dict(
+        io.config["RGW"],
+        rgw_host="127.0.0.1",
+        rgw_port=slow_s3.server_address[1],
+        object_size="4k",
+        mixed_workload={
+            "seconds": 0,
+            "op_mix": {"get": 70, "put": 30},
+            "working_set": 100,
+            "prefill": False,
+        },
+    )
+    monkeypatch.setitem(io.config, "RGW", rgw)
+    monkeypatch.setattr(io, "get_rgw_keys", lambda: ("key", "secret"))
+    # the peak number of requests in flight at the stub while every concurrency was applied
+    applied = []
+    set_active = io.ConcurrencyGate.set
+
+    def record(gate, active):
+        with slow_s3.lock:
+            if applied:
+                applied[-1][1] = slow_s3.peak
+            slow_s3.peak = slow_s3.in_flight
+        applied.append([active, 0])
+        set_active(gate, active)
+
+    monkeypatch.setattr(io.ConcurrencyGate, "set", record)
+    issued = io.RgwIoTools().run_mixed_workload(["bkt_a", "bkt_b"], autotune=True)
+    applied[-1][1] = slow_s3.peak
+
+    assert issued["get"] and issued["put"]
+    assert "get of missing key" not in issued
+    concurrency = [active for active, _ in applied]
+    # slow start up to the congestion past 4 requests in flight, which cuts the concurrency
+    assert concurrency[:4] == [1, 2, 4, 8]
+    windows = io.metrics.results["RGW"]["autotune"]
+    assert not windows["window 4"]["within_slo"]
+    lowest = concurrency.index(min(concurrency[4:]), 4)
+    assert concurrency[lowest] < 8
+    # and the concurrency is raised again once the latency is back within the SLO
+    assert max(concurrency[lowest:]) > concurrency[lowest]
+    # past 4 requests in flight every window breaches the SLO
+    assert windows["knee"]["concurrency"] <= 4
+    # the gate bounds the requests in flight, besides those still finishing from the previous window
+    for no, (active, peak) in enumerate(applied):
+        assert peak <= max(concurrency[max(no - 1, 0)], active)
+    assert applied[3][1] > 4
@@ -0,0 +1,33 @@
+import sys
+import time
+
+import pytest
+
+
+def test_stream_cmdline_hands_over_every_line(io):
+    lines = []
+    script = "import sys; sys.stdout.write('one\\rtwo\\r\\nthree\\nfour')"
+    output = io.stream_cmdline([sys.executable, "-c", script], lines.append)
+    assert lines == ["one", "two", "three", "four"]
+    assert output == "one\rtwo\r\nthree\nfour"
+
+
+def test_stream_cmdline_raises_with_stderr_on_failure(io):
+    lines = []
+    script = (
+        "import sys; print('partial'); sys.stderr.write('no such pool'); sys.exit(2)"
+    )
+    with pytest.raises(io.CommandError, match="exit status 2.*no such pool"):
+        io.stream_cmdline([sys.executable, "-c", script], lines.append)
+    # the lines printed before the failure are still followed
+    assert lines == ["partial"]
+
+
+def test_stream_cmdline_kills_a_hung_command(io, monkeypatch):
+    monkeypatch.setitem(io.config["Scheduler"], "command_timeout", 0.5)
+    start = time.time()
+    with pytest.raises(io.CommandError, match="timed out after 1.5 secs"):
+        io.stream_cmdline(
+            [sys.executable, "-c", "import time; time.sleep(30)"], run_time=1
+        )
+    assert time.time() - start < 10
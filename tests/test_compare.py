@@ -0,0 +1,77 @@
+import json
+
+
+def op(mean_ms, ops_per_sec):
+    return {
+        "ops": 1000,
+        "ops_per_sec": ops_per_sec,
+        "latency_ms": {"mean": mean_ms, "p99": mean_ms * 3},
+    }
+
+
+def results(path, run_id, put_ms, put_ops, cmd_ms, setup_secs):
+    document = {
+        "run_id": run_id,
+        "workloads": {
+            "RGW": {
+                "put objects": {
+                    "put": op(put_ms, put_ops),
+                    "cmd radosgw-admin user info": op(cmd_ms, 1),
+                },
+                "setup": {
+                    "pool rgw": {"seconds": setup_secs},
+                    "cmd ceph osd pool create": op(cmd_ms, 1),
+                },
+                "teardown": {"cmd ceph osd pool delete": op(cmd_ms, 1)},
+            }
+        },
+    }
+    with open(path, "w") as fd:
+        json.dump(document, fd)
+    return str(path)
+
+
+def test_admin_timings_are_not_regressions(io, tmp_path):
+    baseline = results(tmp_path / "a.json", "a", 10, 500, 100, 2)
+    # the commands got much slower, the IO did not
+    run = results(tmp_path / "b.json", "b", 10.5, 490, 900, 20)
+    assert io.compare_runs([baseline, run], 10) == []
+
+
+def test_workload_op_regressions_are_flagged(io, tmp_path):
+    baseline = results(tmp_path / "a.json", "a", 10, 500, 100, 2)
+    run = results(tmp_path / "b.json", "b", 15, 400, 100, 2)
+    flagged = {path for _, path, _, _, _ in io.compare_runs([baseline, run], 10)}
+    assert flagged == {
+        "RGW/put objects/put/ops_per_sec",
+        "RGW/put objects/put/latency_ms/mean",
+        "RGW/put objects/put/latency_ms/p99",
+    }
+
+
+def test_missing_metrics_are_flagged(io, tmp_path):
+    baseline = results(tmp_path / "a.json", "a", 10, 500, 100, 2)
+    run = results(tmp_path / "b.json", "b", 10, 500, 100, 2)
+    with open(run) as fd:
+        document = json.load(fd)
+    # the put operation failed in the run, and so did the admin command timed along with it
+    del document["workloads"]["RGW"]["put objects"]["put"]
+    del document["workloads"]["RGW"]["put objects"]["cmd radosgw-admin user info"]
+    with open(run, "w") as fd:
+        json.dump(document, fd)
+    flagged = io.compare_runs([baseline, run], 10)
+    assert {path for _, path, _, _, _ in flagged} == {
+        "RGW/put objects/put/ops_per_sec",
+        "RGW/put objects/put/latency_ms/mean",
+        "RGW/put objects/put/latency_ms/p99",
+    }
+    assert all(value is None and change is None for _, _, _, value, change in flagged)
+
+
+def test_is_admin_metric(io):
+    assert io.is_admin_metric(("RGW", "setup", "pool rgw", "seconds"))
+    assert io.is_admin_metric(("RBD", "teardown", "unmap", "seconds"))
+    assert io.is_admin_metric(
+        ("CephFS", "default", "cmd ceph fs ls", "latency_ms", "p99")
+    )
+    assert not io.is_admin_metric(("RGW", "put objects", "put", "latency_ms", "p99"))
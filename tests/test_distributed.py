@@ -0,0 +1,184 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import REPO
+
+SCRIPT = os.path.join(REPO, "instant-io.py")
+TOKEN = "shared-secret"
+
+
+def token_env(token=TOKEN):
+    return dict(os.environ, INSTANT_IO_AGENT_TOKEN=token)
+
+
+@pytest.fixture
+def run_config(tmp_path):
+    """
+    Config running the workloads that need no cluster : the Rados_Bench native engine on memory and the
+    CephFS native engine on a local folder
+    """
+    with open(os.path.join(REPO, "config.json"), "r") as fd:
+        run_config = json.load(fd)
+    for section in ("RGW", "RBD", "Soak", "Autotune"):
+        run_config[section]["trigger"] = False
+    run_config["Scheduler"].update(
+        parallel=False,
+        timeline_interval=1,
+        metrics_port=None,
+        cluster_sample_interval=None,
+    )
+    run_config["Rados_Bench"].update(trigger=True, engine="memory")
+    run_config["Rados_Bench"]["native_engine"].update(
+        queue_depth=4, working_set=64, seconds=2
+    )
+    fs_dir = tmp_path / "fs"
+    fs_dir.mkdir()
+    run_config["CephFS"].update(
+        trigger=True,
+        engine="native",
+        mount_path=str(fs_dir),
+        num_threads=2,
+        num_files=40,
+        file_size=4,
+    )
+    return run_config
+
+
+def start_folder(path, run_config):
+    path.mkdir()
+    with open(path / "config.json", "w") as fd:
+        json.dump(run_config, fd)
+    return path
+
+
+@pytest.fixture
+def agents(tmp_path, run_config):
+    """
+    Two agents listening on localhost on ephemeral ports
+    :return: list of tuples of the address and the folder of every agent
+    """
+    started = []
+    for name in ("agent1", "agent2"):
+        folder = start_folder(tmp_path / name, run_config)
+        process = subprocess.Popen(
+            [sys.executable, SCRIPT, "agent", "--bind", "127.0.0.1", "--port", "0"],
+            cwd=folder,
+            env=token_env(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        for line in process.stdout:
+            if line.startswith("Agent listening on"):
+                started.append((process, line.split()[-1], folder))
+                break
+        else:
+            pytest.fail(f"Agent {name} did not start")
+    yield [(address, folder) for _, address, folder in started]
+    for process, _, _ in started:
+        process.terminate()
+        process.wait(timeout=10)
+        process.stdout.close()
+
+
+def test_two_agents_on_localhost(tmp_path, run_config, agents):
+    coordinator = start_folder(tmp_path / "coordinator", run_config)
+    addresses = [address for address, _ in agents]
+    completed = subprocess.run(
+        [sys.executable, SCRIPT, "coordinator", *addresses, "--start-delay", "1"],
+        cwd=coordinator,
+        env=token_env(),
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert completed.returncode == 0, completed.stdout + completed.stderr
+
+    (results_file,) = glob.glob(str(coordinator / "results_IO_*.json"))
+    with open(results_file, "r") as fd:
+        document = json.load(fd)
+    run_id = document["run_id"]
+
+    # the results of every client are kept, and their histograms merged into the combined results
+    assert sorted(document["clients"]) == sorted(addresses)
+    for phase, op in (("native write", "write"), ("native mixed", "read")):
+        combined = document["workloads"]["Rados_Bench"][phase][op]
+        per_client = [
+            client["Rados_Bench"][phase][op] for client in document["clients"].values()
+        ]
+        assert combined["clients"] == 2
+        assert combined["ops"] == sum(stats["ops"] for stats in per_client)
+        assert combined["histogram"]["count"] == combined["ops"]
+        assert combined["latency_ms"]["max"] == max(
+            stats["latency_ms"]["max"] for stats in per_client
+        )
+    create = document["workloads"]["CephFS"]["create"]["create"]
+    # every client runs "num_threads" workers, each creating "num_files" files
+    fs = run_config["CephFS"]
+    assert create["ops"] == 2 * fs["num_threads"] * fs["num_files"]
+
+    # the interval metrics of both clients are on the timeline of the coordinator
+    clients = {row["client"] for row in document["timeline"] if "client" in row}
+    assert clients == set(addresses)
+    for address in addresses:
+        rows = [row for row in document["timeline"] if row.get("client") == address]
+        assert {row["phase"] for row in rows} >= {"native mixed"}
+
+    # every client ran in a folder of its own, named after the shared run ID
+    for client, (_, folder) in enumerate(agents, start=1):
+        client_id = f"{run_id}-c{client:03d}"
+        client_folder = folder / f"run_{client_id}"
+        assert (client_folder / f"results_IO_{client_id}.json").exists()
+        assert (client_folder / f"log_IO_{client_id}.txt").exists()
+
+
+def test_unreachable_agent(tmp_path, run_config):
+    coordinator = start_folder(tmp_path / "coordinator", run_config)
+    completed = subprocess.run(
+        [sys.executable, SCRIPT, "coordinator", "127.0.0.1:1"],
+        cwd=coordinator,
+        env=token_env(),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert completed.returncode == 1
+    assert "Could not connect to agent 127.0.0.1:1" in completed.stdout
+
+
+def test_run_with_a_wrong_token_is_rejected(tmp_path, run_config, agents):
+    coordinator = start_folder(tmp_path / "coordinator", run_config)
+    address, folder = agents[0]
+    completed = subprocess.run(
+        [sys.executable, SCRIPT, "coordinator", address, "--start-delay", "1"],
+        cwd=coordinator,
+        env=token_env("wrong-secret"),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert completed.returncode == 1
+    assert "the token of the agent does not match" in completed.stdout
+    # the agent started no run
+    assert not glob.glob(str(folder / "run_*"))
+
+
+def test_agent_needs_a_token(tmp_path, run_config):
+    folder = start_folder(tmp_path / "agent", run_config)
+    env = dict(os.environ)
+    env.pop("INSTANT_IO_AGENT_TOKEN", None)
+    completed = subprocess.run(
+        [sys.executable, SCRIPT, "agent", "--port", "0"],
+        cwd=folder,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert completed.returncode == 2
+    assert "INSTANT_IO_AGENT_TOKEN" in completed.stderr
@@ -0,0 +1,113 @@
+import re
+import urllib.error
+import urllib.request
+
+import pytest
+
+SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(.*)\})? (\S+)$")
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"(,|$)')
+
+
+def parse_prometheus(text):
+    """
+    Parses the Prometheus text exposition format, checking that every sample belongs to a declared family
+    :return: tuple of the family types, and the list of samples as ( name, labels, value )
+    """
+    types = {}
+    samples = []
+    assert text.endswith("\n")
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert kind in ("counter", "gauge", "histogram")
+            assert name not in types, f"{name} declared twice"
+            types[name] = kind
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"invalid sample line : {line}"
+        name, _, label_text, value = match.groups()
+        labels = {}
+        if label_text:
+            pairs = LABEL.findall(label_text)
+            assert "".join(f'{k}="{v}"{sep}' for k, v, sep in pairs) == label_text
+            labels = {key: value for key, value, _ in pairs}
+        family = re.sub(r"_(bucket|sum|count)$", "", name)
+        assert name in types or family in types, f"{name} has no TYPE"
+        samples.append((name, labels, float(value)))
+    return types, samples
+
+
+@pytest.fixture
+def exporter(io):
+    exporter = io.MetricsExporter(0)
+    exporter.start()
+    yield f"http://127.0.0.1:{exporter.server.server_port}"
+    exporter.stop()
+
+
+def scrape(url):
+    with urllib.request.urlopen(url, timeout=10) as resp:
+        assert resp.status == 200
+        assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        return resp.read().decode()
+
+
+def test_scrape_metrics(io, exporter):
+    stats = io.metrics.op_stats("ExporterTest", 'get "hot" key')
+    for latency in (0.0004, 0.002, 0.002, 0.03, 3):
+        stats.record(100.0, 100.0 + latency, nbytes=4096)
+    stats.record(100.0, 100.5, error=True)
+    io.metrics.interval(
+        "ExporterTest", "default", "bench", ops_per_sec=1234.5, mb_per_sec=4.8
+    )
+
+    types, samples = parse_prometheus(scrape(f"{exporter}/metrics"))
+    assert types["instant_io_ops_total"] == "counter"
+    assert types["instant_io_latency_seconds"] == "histogram"
+    assert types["instant_io_interval_ops_per_sec"] == "gauge"
+
+    def values(name):
+        return {
+            labels.get("le"): value
+            for sample, labels, value in samples
+            if sample == name and labels.get("workload") == "ExporterTest"
+        }
+
+    (info,) = [labels for name, labels, _ in samples if name == "instant_io_run_info"]
+    assert info["run_id"] == io.unique_id
+    # the quotes of the op name are escaped
+    ops = [
+        labels
+        for name, labels, _ in samples
+        if name == "instant_io_ops_total" and labels.get("workload") == "ExporterTest"
+    ]
+    assert ops == [
+        {"workload": "ExporterTest", "phase": "default", "op": 'get \\"hot\\" key'}
+    ]
+    assert values("instant_io_ops_total") == {None: 5}
+    assert values("instant_io_errors_total") == {None: 1}
+    assert values("instant_io_bytes_total") == {None: 5 * 4096}
+
+    buckets = values("instant_io_latency_seconds_bucket")
+    bounds = [str(bound) for bound in io.MetricsExporter.latency_buckets] + ["+Inf"]
+    assert list(buckets) == bounds
+    counts = list(buckets.values())
+    assert counts == sorted(counts), "the buckets must be cumulative"
+    assert buckets["0.0005"] == 1
+    assert buckets["0.0025"] == 3
+    assert buckets["0.05"] == 4
+    assert buckets["2.5"] == 4
+    assert buckets["+Inf"] == values("instant_io_latency_seconds_count")[None] == 5
+    assert values("instant_io_latency_seconds_sum")[None] == pytest.approx(
+        3.0344, rel=0.02
+    )
+    assert values("instant_io_interval_ops_per_sec") == {None: 1234.5}
+    assert values("instant_io_interval_mb_per_sec") == {None: 4.8}
+
+
+def test_unknown_path(exporter):
+    with pytest.raises(urllib.error.HTTPError) as err:
+        urllib.request.urlopen(f"{exporter}/other", timeout=10)
+    assert err.value.code == 404
@@ -0,0 +1,128 @@
+import json
+import math
+import os
+
+import pytest
+
+from conftest import FIXTURES
+
+
+def fio_document(fixture_text):
+    text = fixture_text("fio_randrw.json")
+    return json.loads(text[text.index("{") :])
+
+
+def exact_percentile(bins, percent):
+    """
+    :return: value in ns at the given percentile of the fio histogram bins
+    """
+    values = sorted((int(value), count) for value, count in bins.items())
+    rank = math.ceil(percent / 100 * sum(count for _, count in values))
+    seen = 0
+    for value, count in values:
+        seen += count
+        if seen >= rank:
+            return value
+
+
+def test_jobs_of_the_same_name_are_combined(io, fixture_text):
+    document = fio_document(fixture_text)
+    result = io.parse_fio_json_output(fixture_text("fio_randrw.json"))
+    assert result["fio_version"] == "fio-3.35"
+    assert set(result["jobs"]) == {"randrw", "seqwrite"}
+    randrw = result["jobs"]["randrw"]
+    assert [job["job"] for job in randrw["per_job"]] == [0, 1]
+    for direction in ("read", "write"):
+        stats = [job[direction] for job in document["jobs"][:2]]
+        combined = randrw[direction]
+        assert combined["ops_per_sec"] == pytest.approx(
+            sum(item["iops"] for item in stats), abs=0.01
+        )
+        assert combined["mb_per_sec"] == pytest.approx(
+            sum(item["bw"] for item in stats) / 1024, abs=0.01
+        )
+        assert combined["histogram"]["count"] == sum(
+            item["total_ios"] for item in stats
+        )
+
+
+@pytest.mark.parametrize("direction", ["read", "write"])
+@pytest.mark.parametrize("percent, name", [(50, "p50"), (90, "p90"), (99, "p99")])
+def test_merged_bins_give_the_percentiles_of_all_the_jobs(
+    io, fixture_text, direction, percent, name
+):
+    document = fio_document(fixture_text)
+    bins = {}
+    for job in document["jobs"][:2]:
+        for value, count in job[direction]["clat_ns"]["bins"].items():
+            bins[value] = bins.get(value, 0) + count
+    expected_ms = exact_percentile(bins, percent) / 1e6
+    latency = io.parse_fio_json_output(fixture_text("fio_randrw.json"))["jobs"][
+        "randrw"
+    ][direction]["latency_ms"]
+    # the histogram keeps every percentile within 1 / 2^(significant_bits - 1) of the value
+    tolerance = 1 / 2 ** (io.LatencyHistogram.significant_bits - 1)
+    assert latency[name] == pytest.approx(expected_ms, rel=tolerance)
+    assert latency["max"] == pytest.approx(
+        max(int(value) for value in bins) / 1e6, rel=tolerance
+    )
+
+
+def test_combined_tail_is_not_an_average_of_the_jobs(io, fixture_text):
+    result = io.parse_fio_json_output(fixture_text("fio_randrw.json"))["jobs"]["randrw"]
+    per_job_p99 = [
+        job["read"]["clat_percentiles_ms"]["99"] for job in result["per_job"]
+    ]
+    # the slow tail of the second job puts its p99 far above the p99 of all the reads
+    assert result["read"]["latency_ms"]["p99"] < 0.5 * sum(per_job_p99) / len(
+        per_job_p99
+    )
+
+
+def test_per_job_metrics(io, fixture_text):
+    document = fio_document(fixture_text)
+    result = io.parse_fio_json_output(fixture_text("fio_randrw.json"))
+    first = result["jobs"]["randrw"]["per_job"][0]
+    assert first["elapsed_secs"] == 31
+    clat = document["jobs"][0]["read"]["clat_ns"]["percentile"]
+    assert first["read"]["clat_percentiles_ms"]["99.9"] == round(
+        clat["99.900000"] / 1e6, 3
+    )
+    assert first["read"]["clat_percentiles_ms"]["50"] == round(
+        clat["50.000000"] / 1e6, 3
+    )
+    # directions without any IO are left out
+    seqwrite = result["jobs"]["seqwrite"]
+    assert "read" not in seqwrite and "read" not in seqwrite["per_job"][0]
+    assert seqwrite["write"]["histogram"]["count"] == 3000
+
+
+def test_eta_lines(io, fixture_text):
+    parsed = [
+        io.parse_fio_eta_line(line) for line in fixture_text("fio_eta.txt").splitlines()
+    ]
+    progress = [item for item in parsed if item]
+    assert len(progress) == 5
+    assert progress[0] == {
+        "read": {"mb_per_sec": 1.54, "ops_per_sec": 394},
+        "write": {"mb_per_sec": 7.93, "ops_per_sec": 331},
+    }
+    assert progress[2]["read"]["mb_per_sec"] == 1.37
+    assert progress[3] == {
+        "read": {"mb_per_sec": 2068.48, "ops_per_sec": 529000},
+        "write": {"mb_per_sec": 1536.0, "ops_per_sec": 12300},
+    }
+    assert progress[4] == {"write": {"mb_per_sec": 6.25, "ops_per_sec": 100}}
+    # the job banner and the final line with no rates are not progress lines
+    assert parsed[0] is None
+    assert parsed[-1] is None
+
+
+def test_bw_and_clat_logs(io):
+    series = io.parse_fio_logs(os.path.join(FIXTURES, "fio_randrw"))
+    # the bandwidth of the jobs is added, in MB/s
+    assert series["bw_mb_per_sec"]["read"][0] == [1, round((401 + 271) / 1024, 3)]
+    assert series["bw_mb_per_sec"]["write"][4] == [5, round((397 + 271) / 1024, 3)]
+    # the latency of the jobs is averaged, in ms
+    assert series["clat_ms"]["read"][0] == [1, round((813000 + 1311000) / 2 / 1e6, 3)]
+    assert [second for second, _ in series["clat_ms"]["write"]] == [1, 2, 3, 4, 5]
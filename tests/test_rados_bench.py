@@ -0,0 +1,110 @@
+import pytest
+
+
+def test_write_summary(io, fixture_text):
+    result = io.parse_rados_bench_output(fixture_text("rados_bench_write.txt"))
+    summary = result["summary"]
+    assert summary["elapsed_secs"] == 25.0041
+    assert summary["ops"] == 71311
+    assert summary["op_size"] == 4096
+    assert summary["object_size"] == 4096
+    assert summary["mb_per_sec"] == 11.1405
+    assert summary["stddev_mb_per_sec"] == 1.52654
+    assert summary["max_mb_per_sec"] == 12.4648
+    assert summary["min_mb_per_sec"] == 4.16797
+    assert summary["ops_per_sec"] == 2852
+    assert summary["min_iops"] == 1067
+    assert summary["latency_ms"] == {
+        "mean": 5.71,
+        "stddev": 1.735,
+        "max": 56.781,
+        "min": 0.86,
+    }
+
+
+def test_write_series(io, fixture_text):
+    series = io.parse_rados_bench_output(fixture_text("rados_bench_write.txt"))[
+        "series"
+    ]
+    # the repeated headers and the min / max / avg lat lines printed every 20 secs are skipped
+    assert [row["sec"] for row in series] == list(range(0, 26))
+    assert series[0] == {
+        "sec": 0,
+        "cur_ops": 0,
+        "started": 0,
+        "finished": 0,
+        "avg_mb_per_sec": 0.0,
+        "cur_mb_per_sec": 0.0,
+        "last_lat_ms": None,
+        "avg_lat_ms": 0.0,
+    }
+    stall = series[13]
+    assert stall["finished"] == 36410
+    assert stall["cur_mb_per_sec"] == 4.16797
+    assert stall["last_lat_ms"] == 13.849
+    assert series[21]["started"] == 59797
+
+
+@pytest.mark.parametrize(
+    "name, ops, mb_per_sec, mean_ms, rows",
+    [
+        ("rados_bench_seq.txt", 72946, 15.8147, 3.862, 19),
+        ("rados_bench_rand.txt", 113518, 14.7604, 4.253, 31),
+    ],
+)
+def test_read_output(io, fixture_text, name, ops, mb_per_sec, mean_ms, rows):
+    result = io.parse_rados_bench_output(fixture_text(name))
+    summary = result["summary"]
+    assert summary["ops"] == ops
+    assert summary["mb_per_sec"] == mb_per_sec
+    assert summary["latency_ms"]["mean"] == mean_ms
+    # the reads print no bandwidth deviation nor latency deviation
+    assert "stddev_mb_per_sec" not in summary
+    assert "stddev" not in summary["latency_ms"]
+    assert len(result["series"]) == rows
+
+
+def test_row_parser_skips_other_lines(io):
+    assert io.parse_rados_bench_row("hints = 1") is None
+    assert (
+        io.parse_rados_bench_row(
+            "  sec Cur ops   started  finished  avg MB/s  cur MB/s last lat(s)  avg lat(s)"
+        )
+        is None
+    )
+    assert io.parse_rados_bench_row("Total time run:         25.0041") is None
+
+
+def test_aggregate_pools(io, fixture_text):
+    results = [
+        io.parse_rados_bench_output(fixture_text(name))
+        for name in ("rados_bench_write.txt", "rados_bench_write_pool2.txt")
+    ]
+    first, second = (result["summary"] for result in results)
+    combined = io.aggregate_rados_bench_results(results)
+    summary = combined["summary"]
+    assert summary["pools"] == 2
+    assert summary["ops"] == first["ops"] + second["ops"]
+    assert summary["mb_per_sec"] == round(first["mb_per_sec"] + second["mb_per_sec"], 3)
+    assert summary["ops_per_sec"] == first["ops_per_sec"] + second["ops_per_sec"]
+    assert summary["elapsed_secs"] == max(first["elapsed_secs"], second["elapsed_secs"])
+    # the mean latency is weighted by the ops of every pool
+    expected_mean = (
+        first["ops"] * first["latency_ms"]["mean"]
+        + second["ops"] * second["latency_ms"]["mean"]
+    ) / (first["ops"] + second["ops"])
+    assert summary["latency_ms"]["mean"] == round(expected_mean, 3)
+    assert summary["latency_ms"]["max"] == max(
+        first["latency_ms"]["max"], second["latency_ms"]["max"]
+    )
+    assert summary["latency_ms"]["min"] == min(
+        first["latency_ms"]["min"], second["latency_ms"]["min"]
+    )
+    # the per second rows are added by second
+    rows = {row["sec"]: row for row in combined["series"]}
+    assert rows[13]["cur_ops"] == 32
+    assert rows[13]["cur_mb_per_sec"] == round(
+        results[0]["series"][13]["cur_mb_per_sec"]
+        + results[1]["series"][13]["cur_mb_per_sec"],
+        3,
+    )